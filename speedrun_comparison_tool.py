@@ -1,19 +1,19 @@
+from startup_timing import startup_timer
+
 import os
+import sys
 os.environ["OMP_NUM_THREADS"] = "1"
 os.environ["OPENBLAS_NUM_THREADS"] = "1"
 
 import tkinter as tk
-from tkinter import ttk, filedialog, messagebox
-import cv2
-import numpy as np
-from PIL import Image, ImageTk
+from tkinter import ttk, filedialog, messagebox, simpledialog
 import threading
 import time
 import json
+from concurrent.futures import ThreadPoolExecutor
 
-from video_player import VideoPlayer
-from video_generator import VideoGenerator
 from ui_theme import UITheme
+from speedrun_core.log_sink import LogSink
 
 class SpeedrunComparisonTool:
     def __init__(self, root):
@@ -30,24 +30,81 @@ class SpeedrunComparisonTool:
         self._setup_dark_title_bar()
 
         self.settings_file = ".\\app_settings.json"
+        self.timer_templates_file = "timer_templates.npz"
 
         self.compression_settings = {
             'fps': 60,  
             'scale': 0.5,
-            'codec': 'auto'
+            'codec': 'auto',
+            'layout': 'auto',
+            'cache_compression': 'jpeg',
+            'cache_memory_mb': 256,
+            'segment_cache': False,
+            'segment_cache_mb': 4096,
+            'threads': 'auto',
+            'readers': 'threads',
+            'load_detection': 'off',
+            'load_image': None,
+            'load_scan': 'full',
+            'skip_loads': False,
+            'dedupe_frames': False,
+            'pretrim': False
         }
 
         self.load_settings()
-        self.gpu_available = self.check_gpu_capabilities()
+        self._load_executor = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1),
+                                                 thread_name_prefix="video-load")
+        # Searches over whole videos run here so they never hold up a video being opened
+        self._analysis_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="video-analysis")
+        self.gpu_available = False
+        self.video_generator = None
+        self.render_queue = None
+        self._render_queue_window = None
+
+        self.log_sink = LogSink(capacity=2000, level="info")
+        self.log_drain_interval_ms = 100
+        self.log_max_lines = 5000
+
+        self._core_ready = threading.Event()
+        self._core_error = None
+        threading.Thread(target=self._preload_core_modules, daemon=True).start()
 
         self.theme = UITheme()
-        self.video_generator = VideoGenerator(self._log_operation, self._update_generation_progress)
 
         self.setup_gui()
         self.theme.setup_dark_theme(self.root)
+        startup_timer.mark('gui_built')
+
+        self.root.after(10, self._finish_startup)
+
+    def _preload_core_modules(self):
+        """Import OpenCV/NumPy/PIL and probe capabilities off the Tk thread"""
+        try:
+            import speedrun_core.video_player
+            import speedrun_core.video_generator
+            from PIL import ImageTk
+            startup_timer.mark('core_modules_imported')
 
-        self.add_video()
-        self.add_video()
+            self.gpu_available = self.check_gpu_capabilities()
+            startup_timer.mark('capabilities_ready')
+        except Exception as e:
+            self._core_error = e
+        finally:
+            self._core_ready.set()
+
+    def _finish_startup(self):
+        if not self._core_ready.is_set():
+            self.root.after(10, self._finish_startup)
+            return
+
+        if self._core_error:
+            messagebox.showerror("Error", f"Failed to load video libraries: {self._core_error}")
+            return
+
+        while len(self.videos) < 2:
+            self.add_video()
+        startup_timer.mark('panels_ready')
+        print(startup_timer.format_report())
 
     def _setup_dark_title_bar(self):
         try:
@@ -86,7 +143,8 @@ class SpeedrunComparisonTool:
 
     def check_gpu_capabilities(self):
         try:
-            gpu_count = cv2.cuda.getCudaEnabledDeviceCount()
+            from speedrun_core import get_capabilities
+            gpu_count = get_capabilities()['cuda_devices']
             if gpu_count > 0:
                 print(f"✓ GPU acceleration available: {gpu_count} CUDA device(s)")
                 return True
@@ -120,6 +178,19 @@ class SpeedrunComparisonTool:
         self.fps_var = tk.StringVar(value=str(int(self.compression_settings['fps'])))
         self.scale_var = tk.StringVar(value=str(self.compression_settings['scale']))
         self.codec_var = tk.StringVar(value=self.compression_settings.get('codec', 'auto'))
+        self.layout_var = tk.StringVar(value=self.compression_settings.get('layout', 'auto'))
+        self.cache_var = tk.StringVar(value=self.compression_settings.get('cache_compression') or 'off')
+        self.segment_cache_var = tk.StringVar(value="on" if self.compression_settings.get('segment_cache') else "off")
+        self.segment_cache_mb_var = tk.StringVar(value=str(self.compression_settings.get('segment_cache_mb', 4096)))
+        self.threads_var = tk.StringVar(value=self.compression_settings.get('threads', 'auto'))
+        self.readers_var = tk.StringVar(value=self.compression_settings.get('readers', 'threads'))
+        self.load_detection_var = tk.StringVar(value=self.compression_settings.get('load_detection', 'off'))
+        self.load_scan_var = tk.StringVar(value=self.compression_settings.get('load_scan', 'full'))
+        self.skip_loads_var = tk.StringVar(value="on" if self.compression_settings.get('skip_loads') else "off")
+        self.dedupe_var = tk.StringVar(value="on" if self.compression_settings.get('dedupe_frames') else "off")
+        self.pretrim_var = tk.StringVar(value="on" if self.compression_settings.get('pretrim') else "off")
+        self.timer_region_var = tk.StringVar(value=", ".join(
+            f"{value:g}" for value in self.compression_settings.get('timer_region') or (0.75, 0.0, 0.25, 0.1)))
 
         main_frame = ttk.Frame(self.root, padding="10", style="Dark.TFrame")
         main_frame.pack(fill=tk.BOTH, expand=True)
@@ -179,9 +250,21 @@ class SpeedrunComparisonTool:
         ttk.Button(button_frame, text="Calculate Difference", 
                 command=self.calculate_difference).pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(button_frame, text="Align by Audio", 
+                command=self.align_by_audio).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(button_frame, text="Find Timer", 
+                command=self.find_timer).pack(side=tk.LEFT, padx=5)
+
         ttk.Button(button_frame, text="Generate Comparison Video", 
                 command=self.generate_comparison_video).pack(side=tk.LEFT, padx=5)
 
+        ttk.Button(button_frame, text="Add to Render Queue", 
+                command=self.add_to_render_queue).pack(side=tk.LEFT, padx=5)
+
+        ttk.Button(button_frame, text="Render Queue", 
+                command=self._open_render_queue_window).pack(side=tk.LEFT, padx=5)
+
         self.results_text = tk.Text(results_frame, height=6, width=80,
                                 bg="#1a1a1a", fg="#e0e0e0", 
                                 insertbackground="#e0e0e0",
@@ -195,10 +278,11 @@ class SpeedrunComparisonTool:
         """Open the settings configuration window"""
         settings_window = tk.Toplevel(self.root)
         settings_window.title("Export Settings")
-        settings_window.geometry("500x400")
+        settings_window.geometry(f"500x{min(720, settings_window.winfo_screenheight() - 120)}")
+        settings_window.minsize(500, 300)
         settings_window.transient(self.root)
         settings_window.grab_set()
-        settings_window.resizable(False, False)
+        settings_window.resizable(False, True)
 
         try:
             import ctypes as ct
@@ -221,8 +305,34 @@ class SpeedrunComparisonTool:
 
         self.theme.apply_dark_theme_to_window(settings_window)
 
-        main_frame = ttk.Frame(settings_window, padding="20", style="Dark.TFrame")
-        main_frame.pack(fill=tk.BOTH, expand=True)
+        # The sections scroll and the buttons stay below them, however short the screen is
+        button_frame = ttk.Frame(settings_window, padding=(20, 10, 20, 20), style="Dark.TFrame")
+        button_frame.pack(side=tk.BOTTOM, fill=tk.X)
+
+        settings_scroll_frame = ttk.Frame(settings_window, style="Dark.TFrame")
+        settings_scroll_frame.pack(fill=tk.BOTH, expand=True)
+
+        settings_canvas = tk.Canvas(settings_scroll_frame, bg=self.theme.dark_bg, highlightthickness=0)
+        settings_scrollbar = ttk.Scrollbar(settings_scroll_frame, orient="vertical", command=settings_canvas.yview)
+        main_frame = ttk.Frame(settings_canvas, padding="20", style="Dark.TFrame")
+
+        main_frame.bind(
+            "<Configure>",
+            lambda e: settings_canvas.configure(scrollregion=settings_canvas.bbox("all"))
+        )
+        main_frame_window = settings_canvas.create_window((0, 0), window=main_frame, anchor="nw")
+        settings_canvas.bind('<Configure>', lambda e: settings_canvas.itemconfigure(main_frame_window, width=e.width))
+        settings_canvas.configure(yscrollcommand=settings_scrollbar.set)
+
+        settings_canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        settings_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        def _on_settings_mousewheel(event):
+            settings_canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+            # Keeps the main window's bind_all handler from scrolling the video list underneath
+            return "break"
+
+        settings_window.bind("<MouseWheel>", _on_settings_mousewheel)
 
         title_label = ttk.Label(main_frame, text="Export Settings", 
                                font=("Arial", 14, "bold"), style="Dark.TLabel")
@@ -276,6 +386,19 @@ class SpeedrunComparisonTool:
         ttk.Label(codec_frame, text="MP4 Codec", 
                  font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
 
+        layout_frame = ttk.Frame(video_frame, style="Dark.TFrame")
+        layout_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(layout_frame, text="Layout:", style="Dark.TLabel").pack(side=tk.LEFT)
+        layout_combo = ttk.Combobox(layout_frame, textvariable=self.layout_var, 
+                                   values=["auto", "grid", "16:9"], 
+                                   width=15, state="readonly")
+        layout_combo.pack(side=tk.RIGHT)
+        layout_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(layout_frame, text="Smallest canvas / uniform grid", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
         perf_frame = ttk.LabelFrame(main_frame, text="Performance", padding="15", style="Dark.TLabelframe")
         perf_frame.pack(fill=tk.X, pady=(0, 20))
 
@@ -283,8 +406,188 @@ class SpeedrunComparisonTool:
         ttk.Label(perf_frame, text=f"Hardware: {gpu_status}", 
                  font=("Arial", 9), style="Dark.TLabel").pack(anchor=tk.W)
 
-        button_frame = ttk.Frame(main_frame, style="Dark.TFrame")
-        button_frame.pack(fill=tk.X)
+        cache_frame = ttk.Frame(perf_frame, style="Dark.TFrame")
+        cache_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(cache_frame, text="Preview cache:", style="Dark.TLabel").pack(side=tk.LEFT)
+        cache_combo = ttk.Combobox(cache_frame, textvariable=self.cache_var, 
+                                  values=["jpeg", "png", "off"], 
+                                  width=15, state="readonly")
+        cache_combo.pack(side=tk.RIGHT)
+        cache_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(cache_frame, text=f"Compressed frames, {self.compression_settings.get('cache_memory_mb', 256)} MB per video", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        segment_cache_frame = ttk.Frame(perf_frame, style="Dark.TFrame")
+        segment_cache_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(segment_cache_frame, text="Render cache:", style="Dark.TLabel").pack(side=tk.LEFT)
+        segment_cache_combo = ttk.Combobox(segment_cache_frame, textvariable=self.segment_cache_var, 
+                                          values=["on", "off"], 
+                                          width=15, state="readonly")
+        segment_cache_combo.pack(side=tk.RIGHT)
+        segment_cache_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(segment_cache_frame, text="Decoded ranges on disk, compressed losslessly", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        segment_cache_size_frame = ttk.Frame(perf_frame, style="Dark.TFrame")
+        segment_cache_size_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(segment_cache_size_frame, text="Render cache size (MB):", style="Dark.TLabel").pack(side=tk.LEFT)
+        segment_cache_size_combo = ttk.Combobox(segment_cache_size_frame, textvariable=self.segment_cache_mb_var, 
+                                               values=["1024", "4096", "16384", "65536"], 
+                                               width=15, state="readonly")
+        segment_cache_size_combo.pack(side=tk.RIGHT)
+        segment_cache_size_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(segment_cache_size_frame, text="One range may take up to half", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        threads_frame = ttk.Frame(perf_frame, style="Dark.TFrame")
+        threads_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(threads_frame, text="Threads:", style="Dark.TLabel").pack(side=tk.LEFT)
+        threads_combo = ttk.Combobox(threads_frame, textvariable=self.threads_var, 
+                                    values=["auto", "tune", "off"], 
+                                    width=15, state="readonly")
+        threads_combo.pack(side=tk.RIGHT)
+        threads_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(threads_frame, text="Split cores across decode/resize/encode", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        readers_frame = ttk.Frame(perf_frame, style="Dark.TFrame")
+        readers_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(readers_frame, text="Readers:", style="Dark.TLabel").pack(side=tk.LEFT)
+        readers_combo = ttk.Combobox(readers_frame, textvariable=self.readers_var, 
+                                    values=["threads", "processes"], 
+                                    width=15, state="readonly")
+        readers_combo.pack(side=tk.RIGHT)
+        readers_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(readers_frame, text="Decode each video in its own process", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        dedupe_frame = ttk.Frame(perf_frame, style="Dark.TFrame")
+        dedupe_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(dedupe_frame, text="Duplicate frames:", style="Dark.TLabel").pack(side=tk.LEFT)
+        dedupe_combo = ttk.Combobox(dedupe_frame, textvariable=self.dedupe_var, 
+                                   values=["on", "off"], 
+                                   width=15, state="readonly")
+        dedupe_combo.pack(side=tk.RIGHT)
+        dedupe_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(dedupe_frame, text="Count unique frames, reuse repeats", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        pretrim_frame = ttk.Frame(perf_frame, style="Dark.TFrame")
+        pretrim_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(pretrim_frame, text="Pre-trim:", style="Dark.TLabel").pack(side=tk.LEFT)
+        pretrim_combo = ttk.Combobox(pretrim_frame, textvariable=self.pretrim_var, 
+                                    values=["on", "off"], 
+                                    width=15, state="readonly")
+        pretrim_combo.pack(side=tk.RIGHT)
+        pretrim_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(pretrim_frame, text="Copy marked ranges out of long VODs first", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        loads_frame = ttk.LabelFrame(main_frame, text="Load Removal", padding="15", style="Dark.TLabelframe")
+        loads_frame.pack(fill=tk.X, pady=(0, 20))
+
+        load_detection_frame = ttk.Frame(loads_frame, style="Dark.TFrame")
+        load_detection_frame.pack(fill=tk.X)
+
+        ttk.Label(load_detection_frame, text="Loads:", style="Dark.TLabel").pack(side=tk.LEFT)
+        load_detection_combo = ttk.Combobox(load_detection_frame, textvariable=self.load_detection_var, 
+                                           values=["off", "black", "template", "region"], 
+                                           width=15, state="readonly")
+        load_detection_combo.pack(side=tk.RIGHT)
+        load_detection_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(load_detection_frame, text="Black frames / image match / strip color", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        load_image_frame = ttk.Frame(loads_frame, style="Dark.TFrame")
+        load_image_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(load_image_frame, text="Load screen:", style="Dark.TLabel").pack(side=tk.LEFT)
+        load_image = self.compression_settings.get('load_image')
+        load_image_label = ttk.Label(load_image_frame, text=os.path.basename(load_image) if load_image else "none", 
+                                    font=("Arial", 8), foreground="gray", style="Dark.TLabel")
+
+        def choose_load_image():
+            path = filedialog.askopenfilename(parent=settings_window, title="Loading Screen Image",
+                                              filetypes=[("Images", "*.png *.jpg *.jpeg *.bmp"), ("All files", "*.*")])
+            if path:
+                self.compression_settings['load_image'] = path
+                load_image_label.configure(text=os.path.basename(path))
+                self.save_settings()
+
+        ttk.Button(load_image_frame, text="Browse...", 
+                  command=choose_load_image).pack(side=tk.RIGHT)
+        load_image_label.pack(side=tk.RIGHT, padx=(0, 10))
+
+        load_scan_frame = ttk.Frame(loads_frame, style="Dark.TFrame")
+        load_scan_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(load_scan_frame, text="Load scan:", style="Dark.TLabel").pack(side=tk.LEFT)
+        load_scan_combo = ttk.Combobox(load_scan_frame, textvariable=self.load_scan_var, 
+                                      values=["full", "keyframes"], 
+                                      width=15, state="readonly")
+        load_scan_combo.pack(side=tk.RIGHT)
+        load_scan_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        ttk.Label(load_scan_frame, text="Keyframes: much faster, may miss very short loads", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        skip_loads_frame = ttk.Frame(loads_frame, style="Dark.TFrame")
+        skip_loads_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(skip_loads_frame, text="Skip loads in video:", style="Dark.TLabel").pack(side=tk.LEFT)
+        skip_loads_combo = ttk.Combobox(skip_loads_frame, textvariable=self.skip_loads_var, 
+                                       values=["on", "off"], 
+                                       width=15, state="readonly")
+        skip_loads_combo.pack(side=tk.RIGHT)
+        skip_loads_combo.bind('<<ComboboxSelected>>', self._update_settings)
+
+        timer_frame = ttk.LabelFrame(main_frame, text="In-Game Timer", padding="15", style="Dark.TLabelframe")
+        timer_frame.pack(fill=tk.X, pady=(0, 20))
+
+        timer_region_frame = ttk.Frame(timer_frame, style="Dark.TFrame")
+        timer_region_frame.pack(fill=tk.X)
+
+        ttk.Label(timer_region_frame, text="Timer region:", style="Dark.TLabel").pack(side=tk.LEFT)
+        timer_region_entry = ttk.Entry(timer_region_frame, textvariable=self.timer_region_var, width=18)
+        timer_region_entry.pack(side=tk.RIGHT)
+        timer_region_entry.bind('<Return>', self._update_settings)
+        timer_region_entry.bind('<FocusOut>', self._update_settings)
+
+        ttk.Label(timer_region_frame, text="x, y, width, height (fractions)", 
+                 font=("Arial", 8), foreground="gray", style="Dark.TLabel").pack(side=tk.RIGHT, padx=(0, 10))
+
+        timer_digits_frame = ttk.Frame(timer_frame, style="Dark.TFrame")
+        timer_digits_frame.pack(fill=tk.X, pady=(10, 0))
+
+        from speedrun_core.timer_read import load_templates
+        learned = ''.join(sorted(load_templates(self.timer_templates_file)))
+        ttk.Label(timer_digits_frame, text="Learned:", style="Dark.TLabel").pack(side=tk.LEFT)
+        timer_digits_label = ttk.Label(timer_digits_frame, text=learned or "none", 
+                                      font=("Courier", 9), style="Dark.TLabel")
+
+        def forget_timer_digits():
+            if os.path.exists(self.timer_templates_file):
+                os.remove(self.timer_templates_file)
+            timer_digits_label.configure(text="none")
+
+        ttk.Button(timer_digits_frame, text="Forget", 
+                  command=forget_timer_digits).pack(side=tk.RIGHT)
+        timer_digits_label.pack(side=tk.RIGHT, padx=(0, 10))
 
         ttk.Button(button_frame, text="Reset to Defaults", 
                   command=self._reset_settings).pack(side=tk.LEFT)
@@ -297,6 +600,18 @@ class SpeedrunComparisonTool:
         self.fps_var.set("60")
         self.scale_var.set("0.5")
         self.codec_var.set("auto")
+        self.layout_var.set("auto")
+        self.cache_var.set("jpeg")
+        self.segment_cache_var.set("off")
+        self.segment_cache_mb_var.set("4096")
+        self.threads_var.set("auto")
+        self.readers_var.set("threads")
+        self.load_detection_var.set("off")
+        self.load_scan_var.set("full")
+        self.skip_loads_var.set("off")
+        self.dedupe_var.set("off")
+        self.pretrim_var.set("off")
+        self.timer_region_var.set("0.75, 0, 0.25, 0.1")
         self._update_settings()
 
     def _on_canvas_configure(self, event):
@@ -351,47 +666,124 @@ class SpeedrunComparisonTool:
             self.videos[video_id]['custom_name'] = new_name
 
     def load_video(self, video_id):
-        if video_id not in self.videos:
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
             return
 
-        file_path = filedialog.askopenfilename(
-            title=f"Select Video {video_id}",
+        file_paths = filedialog.askopenfilenames(
+            title=f"Select Video {video_id} (multiple files fill the next free panels)",
             filetypes=[("Video files", "*.mp4 *.avi *.mov *.mkv")]
         )
 
-        if file_path:
-            video_data = self.videos[video_id]
-            player = video_data['player']
+        if not file_paths:
+            return
 
-            if player.load_video(file_path):
-                seek_scale = getattr(self, f'seek_scale_{video_id}')
-                seek_scale.configure(to=player.total_frames - 1)
+        targets = [video_id]
+        for vid, data in self.videos.items():
+            if len(targets) >= len(file_paths):
+                break
+            if vid != video_id and not data['player'].video_capture and not data.get('_loading'):
+                targets.append(vid)
 
-                filename = os.path.basename(file_path)
-                filename_no_ext = os.path.splitext(filename)[0]
+        while len(targets) < len(file_paths) and len(self.videos) < self.max_videos:
+            targets.append(self.add_video())
 
-                panel = getattr(self, f'video_panel_{video_id}')
-                panel.configure(text=f"Video {video_id}: {filename_no_ext}")
-                rename_entry = getattr(self, f'rename_entry_{video_id}')
-                rename_entry.delete(0, tk.END)
-                rename_entry.insert(0, filename_no_ext)
-                rename_entry.configure(foreground='#ffffff')
-                video_data['custom_name'] = filename_no_ext
+        skipped = file_paths[len(targets):]
+        if skipped:
+            messagebox.showwarning("Limit Reached",
+                f"Maximum of {self.max_videos} videos allowed. Skipped: {', '.join(os.path.basename(p) for p in skipped)}")
+
+        for target_id, file_path in zip(targets, file_paths):
+            self._start_video_load(target_id, file_path)
 
-                skip_ratio = max(1, int(player.fps / 60)) if player.fps > 0 else 1
-                info = f"FPS: {player.fps:.1f} | Frames: {player.total_frames} | Skip: {skip_ratio}:1"
-                getattr(self, f'video_info_{video_id}').configure(text=info)
+    def _start_video_load(self, video_id, file_path):
+        """Show a loading placeholder and open the video on the background load pool"""
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        video_data['_loading'] = True
+        if video_data.get('scene_index'):
+            video_data['scene_index'].cancel()
+            video_data['scene_index'] = None
+        if video_data.get('waveform'):
+            video_data['waveform'].cancel()
+            video_data['waveform'] = None
+        # A crop detected on the previous file does not apply to this one
+        video_data['crop'] = None
+        getattr(self, f'crop_btn_{video_id}').configure(text="Auto Crop", state="normal")
 
+        if player.is_playing:
+            player.stop_playback()
+            getattr(self, f'play_btn_{video_id}').configure(text="▶")
+
+        filename_no_ext = os.path.splitext(os.path.basename(file_path))[0]
+        getattr(self, f'video_label_{video_id}').configure(image="", text=f"Loading {filename_no_ext}...")
+        getattr(self, f'video_label_{video_id}').image = None
+        getattr(self, f'video_info_{video_id}').configure(text="Probing video...")
+
+        def on_probe():
+            self.root.after(0, lambda: self._on_video_probed(video_id, player, file_path))
+
+        def load_task():
+            import cv2
+            first_frame = None
+            if player.load_video(file_path, on_probe=on_probe):
                 first_frame = player.get_frame_fast(0)
                 if first_frame is not None:
-                    frame_rgb = cv2.cvtColor(first_frame, cv2.COLOR_BGR2RGB)
-                    self.display_frame(video_id, 0, frame_rgb)
+                    first_frame = cv2.cvtColor(first_frame, cv2.COLOR_BGR2RGB)
+            self.root.after(0, lambda: self._on_video_loaded(video_id, player, file_path, first_frame))
+
+        self._load_executor.submit(load_task)
 
-                self.update_frame_display(video_id, 0)
-                getattr(self, f'seek_var_{video_id}').set(0)
+    def _on_video_probed(self, video_id, player, file_path):
+        if video_id not in self.videos or self.videos[video_id]['player'] is not player:
+            return
+
+        video_data = self.videos[video_id]
+        seek_scale = getattr(self, f'seek_scale_{video_id}')
+        seek_scale.configure(to=max(0, player.total_frames - 1))
+
+        filename = os.path.basename(file_path)
+        filename_no_ext = os.path.splitext(filename)[0]
+
+        panel = getattr(self, f'video_panel_{video_id}')
+        panel.configure(text=f"Video {video_id}: {filename_no_ext}")
+        rename_entry = getattr(self, f'rename_entry_{video_id}')
+        rename_entry.delete(0, tk.END)
+        rename_entry.insert(0, filename_no_ext)
+        rename_entry.configure(foreground='#ffffff')
+        video_data['custom_name'] = filename_no_ext
+
+        skip_ratio = max(1, int(player.fps / 60)) if player.fps > 0 else 1
+        info = f"FPS: {player.fps:.1f} | Frames: {player.total_frames} | Skip: {skip_ratio}:1"
+        getattr(self, f'video_info_{video_id}').configure(text=info)
+
+    def _on_video_loaded(self, video_id, player, file_path, first_frame):
+        if video_id not in self.videos or self.videos[video_id]['player'] is not player:
+            player.close()
+            return
+
+        video_data = self.videos[video_id]
+        video_data['_loading'] = False
+
+        if not player.video_capture:
+            getattr(self, f'video_label_{video_id}').configure(text="Load a video to see preview")
+            getattr(self, f'video_info_{video_id}').configure(text="No video loaded")
+            messagebox.showerror("Error", f"Failed to load video: {player.load_error}")
+            return
+
+        skip_ratio = max(1, int(player.fps / 60)) if player.fps > 0 else 1
+        seek_method = player.get_seek_stats()['method']
+        info = f"FPS: {player.fps:.1f} | Frames: {player.total_frames} | Skip: {skip_ratio}:1 | Seek: {seek_method}"
+        getattr(self, f'video_info_{video_id}').configure(text=info)
+
+        if first_frame is not None:
+            self.display_frame(video_id, 0, first_frame)
+
+        self.update_frame_display(video_id, 0)
+        getattr(self, f'seek_var_{video_id}').set(0)
+        self._start_waveform(video_id)
 
     def toggle_play(self, video_id):
-        if video_id not in self.videos:
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
             return
 
         video_data = self.videos[video_id]
@@ -415,6 +807,7 @@ class SpeedrunComparisonTool:
             video_data['_last_info_update'] = 0
 
             def update_callback(frame_num, frame_bgr):
+                import cv2
                 frame_rgb = cv2.cvtColor(frame_bgr, cv2.COLOR_BGR2RGB)
 
                 try:
@@ -429,6 +822,9 @@ class SpeedrunComparisonTool:
         if video_id not in self.videos:
             return
 
+        import cv2
+        from PIL import Image, ImageTk
+
         try:
             video_data = self.videos[video_id]
             if video_data['_displaying']:
@@ -473,11 +869,14 @@ class SpeedrunComparisonTool:
 
         time_text = f"Time: {timestamp:.2f}s"
         getattr(self, f'time_info_{video_id}').configure(text=time_text)
+        self._update_waveform_overlay(video_id, frame_number)
 
     def seek_frame(self, video_id, delta):
-        if video_id not in self.videos:
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
             return
 
+        import cv2
+
         video_data = self.videos[video_id]
         player = video_data['player']
 
@@ -504,10 +903,183 @@ class SpeedrunComparisonTool:
             play_btn = getattr(self, f'play_btn_{video_id}')
             play_btn.configure(text="⏸")
 
-    def on_seek(self, video_id, val):
+    def jump_to_event(self, video_id, direction):
+        """Seek to the previous/next scene change, indexing the video in the background on first use"""
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
+            return
+
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        if not player.video_capture:
+            return
+
+        scene_index = video_data.get('scene_index')
+        if scene_index is None or scene_index.video_path != player.video_path:
+            from speedrun_core import SceneIndex
+            scene_index = SceneIndex(player.video_path)
+            video_data['scene_index'] = scene_index
+            if not scene_index.load():
+                scene_index.start()
+
+        if scene_index.error:
+            messagebox.showerror("Error", f"Scene indexing failed: {scene_index.error}")
+            video_data['scene_index'] = None
+            return
+
+        current_frame = player.current_frame
+        if direction > 0:
+            target = scene_index.next_event(current_frame)
+        else:
+            target = scene_index.previous_event(current_frame)
+
+        if target is not None:
+            self.seek_frame(video_id, target - current_frame)
+        elif not scene_index.complete:
+            messagebox.showinfo("Scene Events", f"Still indexing scene changes ({scene_index.progress * 100:.0f}% scanned). "
+                                               f"No event found {'after' if direction > 0 else 'before'} this frame yet.")
+        else:
+            messagebox.showinfo("Scene Events", f"No scene change {'after' if direction > 0 else 'before'} this frame.")
+
+    def _start_waveform(self, video_id):
+        """Show the cached audio envelope, or build it in the background"""
+        from speedrun_core import WaveformEnvelope
+
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        duration = player.total_frames / player.fps if player.fps > 0 else None
+        waveform = WaveformEnvelope(player.video_path, duration)
+        video_data['waveform'] = waveform
+        video_data['waveform_view'] = None
+
+        if not waveform.load():
+            def on_progress(envelope):
+                self.root.after(0, lambda: self._on_waveform_progress(video_id, envelope))
+            waveform.start(on_progress)
+        self.draw_waveform(video_id)
+
+    def _on_waveform_progress(self, video_id, waveform):
+        if video_id in self.videos and self.videos[video_id].get('waveform') is waveform:
+            self.draw_waveform(video_id)
+
+    def _waveform_window(self, video_id):
+        """(start, span) in seconds of the part of the video the waveform shows"""
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        duration = player.total_frames / player.fps if player.fps > 0 else 0.0
+        return video_data['waveform_view'] or (0.0, duration)
+
+    def draw_waveform(self, video_id, frame_number=None):
         if video_id not in self.videos:
             return
 
+        import numpy as np
+        from PIL import Image, ImageTk
+
+        canvas = getattr(self, f'waveform_canvas_{video_id}')
+        canvas.delete("all")
+        waveform = self.videos[video_id].get('waveform')
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        if waveform is None or width <= 1:
+            return
+
+        if waveform.error:
+            canvas.create_text(width // 2, height // 2, text=f"No waveform: {waveform.error}"[:120],
+                               fill="#666666", font=("Arial", 8))
+            return
+
+        start, span = self._waveform_window(video_id)
+        if span > 0:
+            mins, maxs = waveform.view(start, start + span, width)
+            # Column-wise fill between min and max, rendered as one image rather than a canvas item per column
+            middle = (height - 1) / 2
+            tops = np.nan_to_num(middle - maxs * middle, nan=middle + 1)
+            bottoms = np.nan_to_num(middle - mins * middle, nan=middle - 1)
+            rows = np.arange(height)[:, None]
+            image = np.full((height, width, 3), 15, dtype=np.uint8)
+            image[(rows >= np.floor(tops)) & (rows <= np.ceil(bottoms))] = (90, 140, 190)
+            photo = ImageTk.PhotoImage(Image.fromarray(image))
+            canvas.create_image(0, 0, image=photo, anchor="nw")
+            canvas.image = photo
+
+        if not waveform.complete:
+            canvas.create_text(4, 2, text=f"Reading audio... {waveform.progress * 100:.0f}%",
+                               fill="#888888", font=("Arial", 7), anchor="nw")
+        elif self.videos[video_id]['waveform_view']:
+            canvas.create_text(4, 2, text=f"{span:.1f}s", fill="#888888", font=("Arial", 7), anchor="nw")
+
+        self._update_waveform_overlay(video_id, frame_number)
+
+    def _update_waveform_overlay(self, video_id, frame_number=None):
+        """Move the playhead and mark lines, scrolling a zoomed waveform to follow the playhead"""
+        if video_id not in self.videos or not hasattr(self, f'waveform_canvas_{video_id}'):
+            return
+
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        if video_data.get('waveform') is None or player.fps <= 0:
+            return
+
+        canvas = getattr(self, f'waveform_canvas_{video_id}')
+        width, height = canvas.winfo_width(), canvas.winfo_height()
+        frame_number = player.current_frame if frame_number is None else frame_number
+        start, span = self._waveform_window(video_id)
+        if span <= 0:
+            return
+
+        playhead_time = frame_number / player.fps
+        if video_data['waveform_view'] and not start <= playhead_time < start + span:
+            duration = player.total_frames / player.fps
+            view = (min(max(0.0, playhead_time - span / 2), duration - span), span)
+            if view != video_data['waveform_view']:
+                video_data['waveform_view'] = view
+                self.draw_waveform(video_id, frame_number)
+                return
+
+        canvas.delete("overlay")
+        for mark, color in ((video_data['start_frame'], "#4caf50"), (video_data['end_frame'], "#f44336")):
+            if mark:
+                x = (mark / player.fps - start) / span * width
+                canvas.create_line(x, 0, x, height, fill=color, tags="overlay")
+        x = (playhead_time - start) / span * width
+        canvas.create_line(x, 0, x, height, fill="#ffffff", tags="overlay")
+
+    def _zoom_waveform(self, video_id, x, factor):
+        """Zoom the waveform in or out around the time under the mouse"""
+        if video_id not in self.videos or self.videos[video_id].get('waveform') is None:
+            return
+
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        duration = player.total_frames / player.fps if player.fps > 0 else 0.0
+        width = max(1, getattr(self, f'waveform_canvas_{video_id}').winfo_width())
+        start, span = self._waveform_window(video_id)
+
+        anchor = start + x / width * span
+        span = min(duration, max(1.0, span * factor))
+        start = min(max(0.0, anchor - x / width * span), duration - span)
+        video_data['waveform_view'] = None if span >= duration else (start, span)
+        self.draw_waveform(video_id)
+
+    def _on_waveform_click(self, video_id, event):
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
+            return
+
+        player = self.videos[video_id]['player']
+        if not player.video_capture or player.fps <= 0:
+            return
+
+        width = max(1, event.widget.winfo_width())
+        start, span = self._waveform_window(video_id)
+        target = int((start + event.x / width * span) * player.fps)
+        target = max(0, min(target, player.total_frames - 1))
+        self.seek_frame(video_id, target - player.current_frame)
+
+    def on_seek(self, video_id, val):
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
+            return
+
+        import cv2
+
         video_data = self.videos[video_id]
         player = video_data['player']
 
@@ -543,11 +1115,14 @@ class SpeedrunComparisonTool:
         video_data['start_frame'] = 0
         video_data['end_frame'] = 0
         getattr(self, f'marked_info_{video_id}').configure(text="Start:      - | End:      -")
+        self._update_waveform_overlay(video_id)
 
     def jump_to_mark(self, video_id, mark_type):
-        if video_id not in self.videos:
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
             return
 
+        import cv2
+
         video_data = self.videos[video_id]
         mark = video_data['start_frame'] if mark_type == 'start' else video_data['end_frame']
         player = video_data['player']
@@ -573,7 +1148,7 @@ class SpeedrunComparisonTool:
             messagebox.showwarning("Warning", f"Invalid {mark_type} frame: {mark}")
 
     def mark_frame(self, video_id, mark_type):
-        if video_id not in self.videos:
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
             return
 
         video_data = self.videos[video_id]
@@ -589,9 +1164,355 @@ class SpeedrunComparisonTool:
         end_frame = video_data['end_frame']
         info_text = f"Start: {start_frame:>6} | End: {end_frame:>6}"
         getattr(self, f'marked_info_{video_id}').configure(text=info_text)
+        self._update_waveform_overlay(video_id)
+
+    def toggle_crop(self, video_id):
+        """Detect the game area over the marked range, or clear an existing crop"""
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
+            return
+
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        crop_btn = getattr(self, f'crop_btn_{video_id}')
+
+        if video_data['crop']:
+            video_data['crop'] = None
+            crop_btn.configure(text="Auto Crop")
+            return
+
+        if not player.video_capture:
+            messagebox.showwarning("Warning", "No video loaded.")
+            return
+
+        start_frame = video_data['start_frame']
+        end_frame = video_data['end_frame'] if video_data['end_frame'] > start_frame else player.total_frames
+        crop_btn.configure(text="Detecting...", state="disabled")
+
+        video_path = player.video_path
+
+        def detect_task():
+            from speedrun_core import detect_crop
+            try:
+                crop, error = detect_crop(video_path, start_frame, end_frame), None
+            except Exception as e:
+                crop, error = None, e
+            self.root.after(0, lambda: self._on_crop_detected(video_id, video_path, crop, error))
+
+        self._analysis_executor.submit(detect_task)
+
+    def _on_crop_detected(self, video_id, video_path, crop, error):
+        if video_id not in self.videos or self.videos[video_id]['player'].video_path != video_path:
+            return
+
+        crop_btn = getattr(self, f'crop_btn_{video_id}')
+        crop_btn.configure(state="normal")
+        self.videos[video_id]['crop'] = crop
+
+        if error:
+            crop_btn.configure(text="Auto Crop")
+            messagebox.showerror("Error", f"Crop detection failed: {error}")
+        elif crop:
+            x, y, w, h = crop
+            crop_btn.configure(text=f"Crop {w}x{h} ✕")
+        else:
+            crop_btn.configure(text="Auto Crop")
+            messagebox.showinfo("Auto Crop", "No borders or letterboxing detected.")
+
+    def match_mark(self, video_id, mark_type):
+        """Mark the current frame here and find the matching frame in every other loaded video"""
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
+            return
+
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        if not player.video_capture:
+            messagebox.showwarning("Warning", "No video loaded.")
+            return
+
+        others = {vid: data for vid, data in self.videos.items()
+                  if vid != video_id and data['player'].video_capture and not data.get('_loading')}
+        if not others:
+            messagebox.showwarning("Warning", "Load at least one other video to match against.")
+            return
+
+        from speedrun_core.mark_detect import make_template
+
+        self.mark_frame(video_id, mark_type)
+        reference = player.get_frame_fast(player.current_frame)
+        if reference is None:
+            messagebox.showerror("Error", "Could not read the current frame.")
+            return
+        try:
+            template = make_template(reference, video_data['crop'])
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+
+        searches = {}
+        for vid, data in others.items():
+            other_player = data['player']
+            if mark_type == 'start':
+                start_frame = 0
+                end_frame = data['end_frame'] if data['end_frame'] > 0 else other_player.total_frames
+            else:
+                start_frame = data['start_frame'] + 1 if data['start_frame'] > 0 else 0
+                end_frame = other_player.total_frames
+            searches[vid] = {
+                'video_path': other_player.video_path,
+                'start_frame': start_frame,
+                'end_frame': end_frame,
+                'fps': other_player.fps or 30,
+                'crop': data['crop']
+            }
+
+        self.results_text.insert(tk.END, f"Matching {mark_type} frame in {len(searches)} video(s)...\n")
+        self.results_text.see(tk.END)
+
+        def match_task():
+            from speedrun_core.mark_detect import find_in_videos
+            results = find_in_videos(template, searches)
+            self.root.after(0, lambda: self._on_marks_matched(mark_type, results))
+
+        self._analysis_executor.submit(match_task)
+
+    def _on_marks_matched(self, mark_type, results):
+        for vid, result in results.items():
+            if vid not in self.videos:
+                continue
+            video_data = self.videos[vid]
+            name = os.path.basename(video_data['player'].video_path or vid)
+
+            if isinstance(result, Exception):
+                line = f"{name}: match failed: {result}"
+            elif result is None:
+                line = f"{name}: no matching {mark_type} frame found"
+            else:
+                video_data[f'{mark_type}_frame'] = result['frame']
+                info_text = f"Start: {video_data['start_frame']:>6} | End: {video_data['end_frame']:>6}"
+                getattr(self, f'marked_info_{vid}').configure(text=info_text)
+                self._update_waveform_overlay(vid)
+                line = f"{name}: {mark_type} = frame {result['frame']} (score {result['score']:.2f})"
+            self.results_text.insert(tk.END, line + "\n")
+        self.results_text.see(tk.END)
+
+    def align_by_audio(self):
+        """Propose start marks that line every video's audio up with the first video's start mark"""
+        loaded_videos = {vid: data for vid, data in self.videos.items()
+                         if data['player'].video_capture and not data.get('_loading')}
+
+        if len(loaded_videos) < 2:
+            messagebox.showerror("Error", "Please load at least 2 videos first.")
+            return
+
+        reference_id = next(iter(loaded_videos))
+        reference_data = loaded_videos[reference_id]
+        reference_player = reference_data['player']
+
+        def duration(player):
+            return player.total_frames / player.fps if player.fps > 0 else None
+
+        reference = {
+            'video_path': reference_player.video_path,
+            'start_time': reference_data['start_frame'] / reference_player.fps if reference_player.fps > 0 else 0,
+            'duration': duration(reference_player)
+        }
+        others = {vid: {'video_path': data['player'].video_path,
+                        'fps': data['player'].fps or 30,
+                        'duration': duration(data['player'])}
+                  for vid, data in loaded_videos.items() if vid != reference_id}
+
+        self.results_text.insert(tk.END, f"Aligning audio to {os.path.basename(reference_player.video_path)} "
+                                         f"from {reference['start_time']:.2f}s: ")
+        self.results_text.mark_set('audio_progress', 'end-1c')
+        self.results_text.mark_gravity('audio_progress', tk.LEFT)
+        self.results_text.insert(tk.END, "starting\n")
+        self.results_text.see(tk.END)
+
+        fractions = {}
+        last_shown = [0]
+
+        def on_progress(stage, video_id, fraction):
+            # Extraction counts for the first half of each track's share, correlation for the second
+            fractions[(stage, video_id)] = fraction
+            done = sum(fractions.values()) / (2 * len(others) + 1)
+            if done - last_shown[0] >= 0.02 or done >= 1:
+                last_shown[0] = done
+                self.root.after(0, lambda: self._show_audio_progress(f"{done * 100:.0f}%"))
+
+        def align_task():
+            from speedrun_core.audio_align import align_videos
+            try:
+                results, error = align_videos(reference, others, progress=on_progress), None
+            except Exception as e:
+                results, error = {}, e
+            self.root.after(0, lambda: self._on_audio_aligned(results, error))
+
+        self._analysis_executor.submit(align_task)
+
+    def _show_audio_progress(self, text):
+        try:
+            self.results_text.delete('audio_progress', 'audio_progress lineend')
+            self.results_text.insert('audio_progress', text)
+        except tk.TclError:
+            pass
+
+    def _on_audio_aligned(self, results, error):
+        if error:
+            self._show_audio_progress("failed")
+            messagebox.showerror("Error", f"Audio alignment failed: {error}")
+            return
+        self._show_audio_progress("done")
+
+        proposals = {}
+        lines = []
+        for vid, result in results.items():
+            if vid not in self.videos:
+                continue
+            name = os.path.basename(self.videos[vid]['player'].video_path or vid)
+            if isinstance(result, Exception):
+                lines.append(f"{name}: alignment failed: {result}")
+            elif result is None:
+                lines.append(f"{name}: no confident audio match")
+            else:
+                proposals[vid] = result['frame']
+                lines.append(f"{name}: start = frame {result['frame']} "
+                             f"({result['time']:.2f}s, score {result['score']:.2f})")
+
+        self.results_text.insert(tk.END, "\n".join(lines) + "\n")
+        self.results_text.see(tk.END)
+
+        if proposals and messagebox.askyesno("Align by Audio", "\n".join(lines) + "\n\nApply these start marks?"):
+            for vid, frame in proposals.items():
+                video_data = self.videos[vid]
+                video_data['start_frame'] = frame
+                info_text = f"Start: {video_data['start_frame']:>6} | End: {video_data['end_frame']:>6}"
+                getattr(self, f'marked_info_{vid}').configure(text=info_text)
+                self._update_waveform_overlay(vid)
+
+    @staticmethod
+    def _parse_timer_region(text):
+        """[x, y, w, h] fractions from 'x, y, w, h', or None if the text is not a region inside the frame"""
+        try:
+            region = [float(value) for value in text.split(',')]
+        except ValueError:
+            return None
+        if len(region) != 4 or not all(0 <= value <= 1 for value in region) or region[2] <= 0 or region[3] <= 0:
+            return None
+        return region
+
+    def _timer_region(self):
+        from speedrun_core.timer_read import DEFAULT_TIMER_REGION
+        return self.compression_settings.get('timer_region') or list(DEFAULT_TIMER_REGION)
+
+    def learn_timer_digits(self, video_id):
+        """Learn the timer's characters from the current frame, given the value it shows"""
+        if video_id not in self.videos or self.videos[video_id].get('_loading'):
+            return
+
+        video_data = self.videos[video_id]
+        player = video_data['player']
+        if not player.video_capture:
+            messagebox.showwarning("Warning", "No video loaded.")
+            return
+
+        frame = player.get_frame_fast(player.current_frame)
+        if frame is None:
+            messagebox.showerror("Error", "Could not read the current frame.")
+            return
+
+        text = simpledialog.askstring("Learn Timer", "Timer value shown in this frame (e.g. 1:23.45):",
+                                      parent=self.root)
+        if not text:
+            return
+
+        from speedrun_core.timer_read import learn_glyphs, load_templates, save_templates
+        templates = load_templates(self.timer_templates_file)
+        try:
+            learn_glyphs(templates, frame, text, self._timer_region(), video_data['crop'])
+            save_templates(templates, self.timer_templates_file)
+        except (ValueError, OSError) as e:
+            messagebox.showwarning("Warning", f"Could not learn the timer: {e}")
+            return
+
+        missing = [digit for digit in "0123456789" if digit not in templates]
+        line = f"Timer characters learned: {''.join(sorted(templates))}"
+        if missing:
+            line += f" (still missing {''.join(missing)}; learn from frames that show them)"
+        self.results_text.insert(tk.END, line + "\n")
+        self.results_text.see(tk.END)
+
+    def find_timer(self):
+        """Find the frame where each video's in-game timer reaches a value and offer to seek there"""
+        loaded_videos = {vid: data for vid, data in self.videos.items()
+                         if data['player'].video_capture and not data.get('_loading')}
+        if not loaded_videos:
+            messagebox.showwarning("Warning", "No video loaded.")
+            return
+
+        from speedrun_core.timer_read import load_templates, parse_timer
+        templates = load_templates(self.timer_templates_file)
+        if not templates:
+            messagebox.showwarning("Warning", "Teach the timer's digits first: pause on a frame with the timer "
+                                              "visible and click \"Learn Timer\".")
+            return
+
+        text = simpledialog.askstring("Find Timer", "Timer value to find (e.g. 12:34.56):", parent=self.root)
+        if not text:
+            return
+        try:
+            target_seconds = parse_timer(text)
+        except ValueError as e:
+            messagebox.showwarning("Warning", str(e))
+            return
+
+        searches = {}
+        for vid, data in loaded_videos.items():
+            player = data['player']
+            searches[vid] = {
+                'video_path': player.video_path,
+                'start_frame': data['start_frame'],
+                'end_frame': data['end_frame'] if data['end_frame'] > data['start_frame'] else player.total_frames,
+                'crop': data['crop']
+            }
+
+        missing = [digit for digit in "0123456789" if digit not in templates]
+        self.results_text.insert(tk.END, f"Finding timer {text.strip()} in {len(searches)} video(s)..."
+                                         + (f" (digits {''.join(missing)} not learned yet)" if missing else "") + "\n")
+        self.results_text.see(tk.END)
+        region = self._timer_region()
+
+        def find_task():
+            from speedrun_core.timer_read import find_in_videos
+            results = find_in_videos(templates, region, target_seconds, searches)
+            self.root.after(0, lambda: self._on_timer_found(text.strip(), results))
+
+        self._analysis_executor.submit(find_task)
+
+    def _on_timer_found(self, text, results):
+        targets = {}
+        lines = []
+        for vid, result in results.items():
+            if vid not in self.videos:
+                continue
+            name = os.path.basename(self.videos[vid]['player'].video_path or vid)
+            if isinstance(result, Exception):
+                lines.append(f"{name}: timer search failed: {result}")
+            elif result is None:
+                lines.append(f"{name}: timer never reads {text}")
+            else:
+                targets[vid] = result['frame']
+                lines.append(f"{name}: {text} at frame {result['frame']} (reads {result['reading']})")
+
+        self.results_text.insert(tk.END, "\n".join(lines) + "\n")
+        self.results_text.see(tk.END)
+
+        if targets and messagebox.askyesno("Find Timer", "\n".join(lines) + "\n\nSeek the videos to these frames?"):
+            for vid, frame in targets.items():
+                self.seek_frame(vid, frame - self.videos[vid]['player'].current_frame)
 
     def calculate_difference(self):
-        loaded_videos = {vid: data for vid, data in self.videos.items() if data['player'].video_capture}
+        loaded_videos = {vid: data for vid, data in self.videos.items()
+                         if data['player'].video_capture and not data.get('_loading')}
 
         if len(loaded_videos) < 2:
             messagebox.showerror("Error", "Please load at least 2 videos first.")
@@ -605,14 +1526,66 @@ class SpeedrunComparisonTool:
                 return
             durations[video_id] = duration
 
+        detect_loads = self.compression_settings.get('load_detection', 'off') != 'off'
+        detect_duplicates = self.compression_settings.get('dedupe_frames', False)
+        if not detect_loads and not detect_duplicates:
+            self._show_comparison(loaded_videos, durations)
+            return
+
+        searches = {video_id: {
+            'video_path': video_data['player'].video_path,
+            'start_frame': video_data['start_frame'],
+            'end_frame': video_data['end_frame'],
+            'crop': video_data.get('crop')
+        } for video_id, video_data in loaded_videos.items()}
+        settings = dict(self.compression_settings)
+
+        scanning = " and ".join(name for name, enabled in (("loads", detect_loads),
+                                                          ("duplicate frames", detect_duplicates)) if enabled)
+        self.results_text.delete(1.0, tk.END)
+        self.results_text.insert(tk.END, f"Scanning {len(searches)} marked ranges for {scanning}...\n")
+
+        def scan(scan_videos, *args):
+            try:
+                return scan_videos(searches, *args)
+            except Exception as e:
+                return {video_id: e for video_id in searches}
+
+        def scan_task():
+            from speedrun_core import duplicate_detect, load_detect
+            load_scans = scan(load_detect.scan_videos, load_detect.load_predicate_from_settings(settings)) \
+                if detect_loads else None
+            duplicate_scans = scan(duplicate_detect.scan_videos) if detect_duplicates else None
+            self.root.after(0, lambda: self._show_comparison(loaded_videos, durations, load_scans, duplicate_scans))
+
+        self._analysis_executor.submit(scan_task)
+
+    def _show_comparison(self, loaded_videos, durations, load_scans=None, duplicate_scans=None):
         results = "=== COMPARISON RESULTS ===\n\n"
 
+        load_removed = {}
         video_list = list(durations.keys())
         for i, video_id in enumerate(video_list):
             video_name = loaded_videos[video_id]['custom_name']
             start_frame = loaded_videos[video_id]['start_frame']
             end_frame = loaded_videos[video_id]['end_frame']
-            results += f"{video_name}: {durations[video_id]:.3f}s ({start_frame} → {end_frame})\n"
+            results += f"{video_name}: {durations[video_id]:.3f}s ({start_frame} → {end_frame})"
+
+            scan = (load_scans or {}).get(video_id)
+            if isinstance(scan, Exception):
+                results += f" | load detection failed: {scan}"
+            elif scan is not None:
+                load_time = scan['load_frames'] / loaded_videos[video_id]['player'].fps
+                load_removed[video_id] = durations[video_id] - load_time
+                results += f" | without loads: {load_removed[video_id]:.3f}s ({len(scan['loads'])} loads, {load_time:.3f}s)"
+
+            scan = (duplicate_scans or {}).get(video_id)
+            if isinstance(scan, Exception):
+                results += f" | duplicate detection failed: {scan}"
+            elif scan is not None and durations[video_id] > 0:
+                game_fps = scan['unique_frames'] / durations[video_id]
+                results += f" | {scan['unique_frames']} unique frames (~{game_fps:.1f} game fps, ±{1 / max(game_fps, 1e-6):.3f}s)"
+            results += "\n"
 
         results += "\nDIFFERENCES:\n"
         base_video = video_list[0]
@@ -625,6 +1598,16 @@ class SpeedrunComparisonTool:
             status = "SLOWER" if time_diff > 0 else "FASTER" if time_diff < 0 else "SAME TIME"
             results += f"{video_name} vs {base_name}: {time_diff:.3f}s ({status})\n"
 
+        if base_video in load_removed and len(load_removed) > 1:
+            results += "\nDIFFERENCES (LOAD-REMOVED):\n"
+            for video_id in video_list[1:]:
+                if video_id not in load_removed:
+                    continue
+                video_name = loaded_videos[video_id]['custom_name']
+                time_diff = load_removed[video_id] - load_removed[base_video]
+                status = "SLOWER" if time_diff > 0 else "FASTER" if time_diff < 0 else "SAME TIME"
+                results += f"{video_name} vs {base_name}: {time_diff:.3f}s ({status})\n"
+
         self.results_text.delete(1.0, tk.END)
         self.results_text.insert(tk.END, results)
 
@@ -644,12 +1627,14 @@ class SpeedrunComparisonTool:
         end_time = player.get_timestamp(end_frame)
         return end_time - start_time
 
-    def generate_comparison_video(self):
-        loaded_videos = {vid: data for vid, data in self.videos.items() if data['player'].video_capture}
+    def _get_marked_videos(self):
+        """Loaded videos with valid marks, or None after telling the user what is missing"""
+        loaded_videos = {vid: data for vid, data in self.videos.items()
+                         if data['player'].video_capture and not data.get('_loading')}
 
         if len(loaded_videos) < 2:
             messagebox.showerror("Error", "Please load at least 2 videos first.")
-            return
+            return None
 
         invalid_videos = []
         for video_id, video_data in loaded_videos.items():
@@ -659,6 +1644,12 @@ class SpeedrunComparisonTool:
         if invalid_videos:
             video_names = [loaded_videos[vid]['custom_name'] for vid in invalid_videos]
             messagebox.showerror("Error", f"Please mark valid start and end frames for: {', '.join(video_names)}.")
+            return None
+
+        return loaded_videos
+
+    def generate_comparison_video(self):
+        if self._get_marked_videos() is None:
             return
 
         output_path = filedialog.asksaveasfilename(
@@ -672,6 +1663,136 @@ class SpeedrunComparisonTool:
 
         self._create_detailed_progress_window(output_path, self.compression_settings)
 
+    def _get_render_queue(self):
+        if self.render_queue is None:
+            from speedrun_core import RenderQueue
+            self.render_queue = RenderQueue("render_queue.json", log_callback=self._log_operation)
+            self.render_queue.subscribe(self._on_render_queue_update)
+            self.render_queue.start()
+        return self.render_queue
+
+    def add_to_render_queue(self):
+        """Queue the current marks and export settings as a background render job"""
+        loaded_videos = self._get_marked_videos()
+        if loaded_videos is None:
+            return
+
+        output_path = filedialog.asksaveasfilename(
+            title="Queue Comparison Video",
+            defaultextension=".mp4",
+            filetypes=[("MP4 files", "*.mp4"), ("All files", "*.*")]
+        )
+
+        if not output_path:
+            return
+
+        spec = {
+            'output': output_path,
+            'videos': [{
+                'path': video_data['player'].video_path,
+                'start_frame': video_data['start_frame'],
+                'end_frame': video_data['end_frame'],
+                'name': video_data['custom_name'],
+                'audio': video_data.get('audio_enabled', False),
+                'crop': list(video_data['crop']) if video_data.get('crop') else None,
+                'size': list(video_data['player'].frame_size or ()) or None
+            } for video_data in loaded_videos.values()],
+            'settings': dict(self.compression_settings)
+        }
+
+        job = self._get_render_queue().add_job(spec)
+        self.results_text.insert(tk.END, f"Queued render {job['id']}: {os.path.basename(output_path)}\n")
+        self.results_text.see(tk.END)
+
+    def _on_render_queue_update(self, job):
+        # Called from the queue's background threads
+        try:
+            self.root.after(0, self._refresh_render_queue_window)
+        except RuntimeError:
+            pass
+
+    def _open_render_queue_window(self):
+        """Show queued, running and finished render jobs"""
+        if self._render_queue_window is not None and self._render_queue_window.winfo_exists():
+            self._render_queue_window.lift()
+            return
+
+        render_queue = self._get_render_queue()
+
+        queue_window = tk.Toplevel(self.root)
+        queue_window.title("Render Queue")
+        queue_window.geometry("700x400")
+        queue_window.transient(self.root)
+
+        self.theme.apply_dark_theme_to_window(queue_window)
+
+        main_frame = ttk.Frame(queue_window, padding="10", style="Dark.TFrame")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        self.render_queue_summary = ttk.Label(main_frame, text="", style="Dark.TLabel")
+        self.render_queue_summary.pack(anchor=tk.W, pady=(0, 5))
+
+        self.render_queue_list = tk.Listbox(main_frame, selectmode=tk.EXTENDED, font=("Courier", 9),
+                                            bg="#1a1a1a", fg="#e0e0e0",
+                                            selectbackground="#2a2a2a", selectforeground="#e0e0e0")
+        self.render_queue_list.pack(fill=tk.BOTH, expand=True, pady=(0, 10))
+
+        def selected_job_ids():
+            return [render_queue.jobs[index]['id'] for index in self.render_queue_list.curselection()
+                    if index < len(render_queue.jobs)]
+
+        def add_job_files():
+            paths = filedialog.askopenfilenames(title="Add Render Jobs",
+                                                filetypes=[("Job files", "*.json"), ("All files", "*.*")])
+            for path in paths:
+                try:
+                    render_queue.add_job_file(path)
+                except (OSError, ValueError) as e:
+                    messagebox.showerror("Error", f"Could not add jobs from {os.path.basename(path)}:\n{e}")
+            self._refresh_render_queue_window()
+
+        def apply_to_selected(action):
+            for job_id in selected_job_ids():
+                action(job_id)
+            self._refresh_render_queue_window()
+
+        button_frame = ttk.Frame(main_frame, style="Dark.TFrame")
+        button_frame.pack(fill=tk.X)
+
+        ttk.Button(button_frame, text="Add Job Files...", command=add_job_files).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(button_frame, text="Cancel Selected", 
+                  command=lambda: apply_to_selected(render_queue.cancel)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Retry Selected", 
+                  command=lambda: apply_to_selected(render_queue.retry)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Remove Selected", 
+                  command=lambda: apply_to_selected(render_queue.remove)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Clear Finished", 
+                  command=lambda: [render_queue.clear_finished(), self._refresh_render_queue_window()]).pack(side=tk.RIGHT)
+
+        self._render_queue_window = queue_window
+        self._refresh_render_queue_window()
+
+    def _refresh_render_queue_window(self):
+        if self._render_queue_window is None or not self._render_queue_window.winfo_exists():
+            return
+
+        render_queue = self.render_queue
+        selection = self.render_queue_list.curselection()
+        self.render_queue_list.delete(0, tk.END)
+        for job in list(render_queue.jobs):
+            eta = f" ETA {job['eta_seconds']:.0f}s" if job['status'] == 'running' and job.get('eta_seconds') else ""
+            error = f" - {job['error']}" if job.get('error') else ""
+            self.render_queue_list.insert(tk.END, f"{job['id']}  {job['status']:<9} {job['progress'] * 100:5.1f}%{eta:<10} "
+                                                  f"{os.path.basename(job['spec']['output'])}{error}")
+        for index in selection:
+            self.render_queue_list.selection_set(index)
+
+        summary = render_queue.get_summary()
+        self.render_queue_summary.configure(
+            text=f"{summary['running']} running, {summary['queued']} queued, {summary['done']} done, "
+                 f"{summary['failed']} failed - up to {render_queue.max_workers} at once, "
+                 f"{render_queue.memory_limit // (1024 * 1024)} MB budget")
+
     def _create_detailed_progress_window(self, output_path, compression_settings):
         progress_window = tk.Toplevel(self.root)
         progress_window.title("Video Generation - Detailed View")
@@ -679,6 +1800,11 @@ class SpeedrunComparisonTool:
         progress_window.transient(self.root)
         progress_window.grab_set()
 
+        if self.video_generator is None:
+            from speedrun_core import VideoGenerator
+            self.video_generator = VideoGenerator(self._log_operation, self._update_generation_progress)
+            self.video_generator.add_progress_listener(self._on_generation_event)
+
         self.video_generator.set_cancel_flag(False)
         self.video_generator.set_pause_flag(False)
 
@@ -737,7 +1863,7 @@ class SpeedrunComparisonTool:
         self.gen_speed_label = ttk.Label(speed_frame, text="Speed: - fps")
         self.gen_speed_label.pack(side=tk.LEFT)
 
-        self.gen_memory_label = ttk.Label(speed_frame, text="Memory: -")
+        self.gen_memory_label = ttk.Label(speed_frame, text="Buffers: -")
         self.gen_memory_label.pack(side=tk.RIGHT)
 
         log_frame = ttk.LabelFrame(main_frame, text="Detailed Operations Log", padding="10", style="Dark.TLabelframe")
@@ -759,6 +1885,16 @@ class SpeedrunComparisonTool:
         self.gen_log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
+        log_colors = {
+            "info": "black",
+            "success": "dark green", 
+            "warning": "orange",
+            "error": "red",
+            "debug": "blue"
+        }
+        for level, color in log_colors.items():
+            self.gen_log_text.tag_config(level, foreground=color)
+
         button_frame = ttk.Frame(main_frame, style="Dark.TFrame")
         button_frame.pack(fill=tk.X)
 
@@ -777,11 +1913,18 @@ class SpeedrunComparisonTool:
         ttk.Checkbutton(button_frame, text="Auto-scroll", 
                        variable=self.auto_scroll_var).pack(side=tk.RIGHT)
 
-        self._generation_start_time = time.time()
+        self.debug_log_var = tk.BooleanVar(value=self.log_sink.is_enabled("debug"))
+        ttk.Checkbutton(button_frame, text="Debug log", variable=self.debug_log_var,
+                       command=lambda: self.log_sink.set_level("debug" if self.debug_log_var.get() else "info")
+                       ).pack(side=tk.RIGHT, padx=(0, 10))
+
+        self.log_sink.drain()
+        self.root.after(self.log_drain_interval_ms, self._drain_log_sink)
 
         def generate_thread():
             try:
-                loaded_videos = {vid: data for vid, data in self.videos.items() if data['player'].video_capture}
+                loaded_videos = {vid: data for vid, data in self.videos.items()
+                                 if data['player'].video_capture and not data.get('_loading')}
                 self.video_generator.generate_comparison_video(output_path, loaded_videos, compression_settings)
             except Exception as e:
                 self._log_operation(f"ERROR: {str(e)}", "error")
@@ -804,33 +1947,35 @@ class SpeedrunComparisonTool:
             self._log_operation("Generation RESUMED by user", "info")
 
     def _log_operation(self, message, level="info"):
-        timestamp = time.strftime("%H:%M:%S")
+        self.log_sink.emit(message, level)
 
-        colors = {
-            "info": "black",
-            "success": "dark green", 
-            "warning": "orange",
-            "error": "red",
-            "debug": "blue"
-        }
+    def _drain_log_sink(self):
+        """Flush buffered log lines into the log widget in one insert, at a fixed rate"""
+        if not hasattr(self, 'gen_log_text') or not self.gen_log_text.winfo_exists():
+            return
 
-        log_entry = f"[{timestamp}] {message}\n"
+        entries, dropped = self.log_sink.drain()
+        if dropped:
+            entries.insert(0, (time.time(), "warning", f"... {dropped} log lines dropped ..."))
 
-        def update_log():
-            if hasattr(self, 'gen_log_text'):
-                self.gen_log_text.insert(tk.END, log_entry)
-                self.gen_log_text.tag_add(level, f"end-{len(log_entry)}c", "end-1c")
-                self.gen_log_text.tag_config(level, foreground=colors.get(level, "black"))
+        if entries:
+            insert_args = []
+            for timestamp, level, message in entries:
+                insert_args.extend((f"[{time.strftime('%H:%M:%S', time.localtime(timestamp))}] {message}\n", level))
+            self.gen_log_text.insert(tk.END, *insert_args)
 
-                if hasattr(self, 'auto_scroll_var') and self.auto_scroll_var.get():
-                    self.gen_log_text.see(tk.END)
+            line_count = int(self.gen_log_text.index('end-1c').split('.')[0])
+            if line_count > self.log_max_lines:
+                self.gen_log_text.delete(1.0, f"{line_count - self.log_max_lines}.0")
 
-        self.root.after(0, update_log)
+            if hasattr(self, 'auto_scroll_var') and self.auto_scroll_var.get():
+                self.gen_log_text.see(tk.END)
+
+        self.root.after(self.log_drain_interval_ms, self._drain_log_sink)
 
     def _update_generation_progress(self, current, total, operation="", extra_info=""):
         if total > 0:
             progress = (current / total) * 100
-            elapsed = time.time() - self._generation_start_time
 
             def update_ui():
                 try:
@@ -844,22 +1989,37 @@ class SpeedrunComparisonTool:
                             if extra_info:
                                 status_text += f" | {extra_info}"
                             self.gen_status_label.configure(text=status_text)
-
-                        if current > 0 and progress > 0:
-                            eta_seconds = (elapsed / current) * (total - current)
-                            eta_text = f"ETA: {int(eta_seconds//60)}m {int(eta_seconds%60)}s"
-                        else:
-                            eta_text = "ETA: Calculating..."
-                        self.gen_eta_label.configure(text=eta_text)
-
-                        if elapsed > 0:
-                            fps = current / elapsed
-                            self.gen_speed_label.configure(text=f"Speed: {fps:.1f} fps")
                 except:
                     pass 
 
             self.root.after(0, update_ui)
 
+    def _on_generation_event(self, event):
+        """Show ETA, speed and buffer occupancy from the generator's progress events"""
+        if event.get('event') not in ('progress', 'complete'):
+            return
+
+        eta_seconds = event.get('eta_seconds')
+        if event['event'] == 'complete':
+            eta_text = "ETA: Done"
+        elif eta_seconds is not None:
+            eta_text = f"ETA: {int(eta_seconds//60)}m {int(eta_seconds%60)}s"
+        else:
+            eta_text = "ETA: Calculating..."
+        speed_text = f"Speed: {event['fps_smoothed']:.1f} fps (now {event['fps_instant']:.1f})"
+        buffer_text = f"Buffers: compose {event['composition_buffer']}/{event['composition_buffer_size']}"
+
+        def update_ui():
+            try:
+                if hasattr(self, 'gen_eta_label'):
+                    self.gen_eta_label.configure(text=eta_text)
+                    self.gen_speed_label.configure(text=speed_text)
+                    self.gen_memory_label.configure(text=buffer_text)
+            except:
+                pass
+
+        self.root.after(0, update_ui)
+
     def _cancel_generation(self):
         """Cancel the generation and close window if generation is complete"""
         self.video_generator.set_cancel_flag(True)
@@ -884,6 +2044,8 @@ class SpeedrunComparisonTool:
             messagebox.showwarning("Limit Reached", f"Maximum of {self.max_videos} videos allowed.")
             return
 
+        from speedrun_core import VideoPlayer
+
         self.video_counter += 1
         video_id = self.video_counter
 
@@ -894,11 +2056,17 @@ class SpeedrunComparisonTool:
             'current_frame': tk.IntVar(value=0),
             '_displaying': False,
             '_last_info_update': 0,
+            '_loading': False,
+            'crop': None,
+            'scene_index': None,
+            'waveform': None,
+            'waveform_view': None,
             'custom_name': f'Video {video_id}',
             'audio_enabled': False
         }
 
         self.videos[video_id] = video_data
+        self._apply_cache_settings(video_data['player'])
 
         self.create_video_panel(video_id)
         self.update_video_count()
@@ -907,10 +2075,17 @@ class SpeedrunComparisonTool:
         if len(self.videos) >= self.max_videos:
             self.add_video_btn.configure(state="disabled")
 
+        return video_id
+
     def remove_video(self, video_id):
         if video_id in self.videos:
             video_data = self.videos[video_id]
-            video_data['player'].close()
+            if not video_data.get('_loading'):
+                video_data['player'].close()
+            if video_data.get('scene_index'):
+                video_data['scene_index'].cancel()
+            if video_data.get('waveform'):
+                video_data['waveform'].cancel()
 
             if hasattr(self, f'video_panel_{video_id}'):
                 panel = getattr(self, f'video_panel_{video_id}')
@@ -1030,9 +2205,20 @@ class SpeedrunComparisonTool:
         frame_info.pack(side=tk.RIGHT)
         setattr(self, f'frame_info_{video_id}', frame_info)
 
+        waveform_canvas = tk.Canvas(panel, height=36, bg="#0f0f0f", highlightthickness=0)
+        waveform_canvas.pack(fill=tk.X, pady=(0, 10))
+        waveform_canvas.bind('<Configure>', lambda e: self.draw_waveform(video_id))
+        waveform_canvas.bind('<Button-1>', lambda e: self._on_waveform_click(video_id, e))
+        waveform_canvas.bind('<MouseWheel>', lambda e: self._zoom_waveform(video_id, e.x, 0.5 if e.delta > 0 else 2.0))
+        waveform_canvas.bind('<Button-4>', lambda e: self._zoom_waveform(video_id, e.x, 0.5))
+        waveform_canvas.bind('<Button-5>', lambda e: self._zoom_waveform(video_id, e.x, 2.0))
+        setattr(self, f'waveform_canvas_{video_id}', waveform_canvas)
+
         controls = ttk.Frame(panel, style="Dark.TFrame")
         controls.pack(fill=tk.X, pady=(0, 10))
 
+        ttk.Button(controls, text="⏮", width=3,
+                command=lambda: self.jump_to_event(video_id, -1)).pack(side=tk.LEFT, padx=1)
         ttk.Button(controls, text="<<", width=3,
                 command=lambda: self.seek_frame(video_id, -10)).pack(side=tk.LEFT, padx=1)
         ttk.Button(controls, text="<", width=3,
@@ -1045,6 +2231,17 @@ class SpeedrunComparisonTool:
                 command=lambda: self.seek_frame(video_id, 1)).pack(side=tk.LEFT, padx=1)
         ttk.Button(controls, text=">>", width=3,
                 command=lambda: self.seek_frame(video_id, 10)).pack(side=tk.LEFT, padx=1)
+        ttk.Button(controls, text="⏭", width=3,
+                command=lambda: self.jump_to_event(video_id, 1)).pack(side=tk.LEFT, padx=1)
+
+        crop_btn = ttk.Button(controls, text="Auto Crop", width=10,
+                            command=lambda: self.toggle_crop(video_id))
+        crop_btn.pack(side=tk.RIGHT, padx=1)
+        setattr(self, f'crop_btn_{video_id}', crop_btn)
+        ttk.Button(controls, text="Match End", width=10,
+                command=lambda: self.match_mark(video_id, 'end')).pack(side=tk.RIGHT, padx=1)
+        ttk.Button(controls, text="Match Start", width=11,
+                command=lambda: self.match_mark(video_id, 'start')).pack(side=tk.RIGHT, padx=1)
 
         mark_frame = ttk.Frame(panel, style="Dark.TFrame")
         mark_frame.pack(fill=tk.X, pady=(0, 10))  
@@ -1058,6 +2255,8 @@ class SpeedrunComparisonTool:
                 command=lambda: self.jump_to_mark(video_id, 'start')).pack(side=tk.LEFT, padx=2)
         ttk.Button(mark_frame, text="Jump End", width=12,
                 command=lambda: self.jump_to_mark(video_id, 'end')).pack(side=tk.LEFT, padx=2)
+        ttk.Button(mark_frame, text="Learn Timer", width=12,
+                command=lambda: self.learn_timer_digits(video_id)).pack(side=tk.LEFT, padx=2)
 
         marked_info = ttk.Label(mark_frame, text="Start: 0 | End: 0", font=("Courier", 8), width=32)
         marked_info.pack(side=tk.RIGHT)
@@ -1069,14 +2268,24 @@ class SpeedrunComparisonTool:
 
     def on_closing(self):
         self.save_settings()
+        self._load_executor.shutdown(wait=False)
+        self._analysis_executor.shutdown(wait=False, cancel_futures=True)
+        if self.render_queue is not None:
+            self.render_queue.shutdown()
 
-        if hasattr(self.video_generator, '_cancel_generation'):
+        if self.video_generator is not None:
             self.video_generator.set_cancel_flag(True)
             self.video_generator.set_pause_flag(False)
 
         for video_id, video_data in self.videos.items():
+            if video_data.get('scene_index'):
+                video_data['scene_index'].cancel()
+            if video_data.get('waveform'):
+                video_data['waveform'].cancel()
             if 'player' in video_data and video_data['player']:
                 video_data['player'].close()
+        if 'speedrun_core.capture_pool' in sys.modules:
+            sys.modules['speedrun_core.capture_pool'].capture_pool.close_all()
 
         self.root.destroy()
 
@@ -1103,6 +2312,35 @@ class SpeedrunComparisonTool:
             self.compression_settings['scale'] = float(self.scale_var.get())
             if hasattr(self, 'codec_var'):
                 self.compression_settings['codec'] = self.codec_var.get()
+            if hasattr(self, 'layout_var'):
+                self.compression_settings['layout'] = self.layout_var.get()
+            if hasattr(self, 'cache_var'):
+                cache_mode = self.cache_var.get()
+                self.compression_settings['cache_compression'] = None if cache_mode == 'off' else cache_mode
+                for video_data in self.videos.values():
+                    self._apply_cache_settings(video_data['player'])
+            if hasattr(self, 'segment_cache_var'):
+                self.compression_settings['segment_cache'] = self.segment_cache_var.get() == "on"
+            if hasattr(self, 'segment_cache_mb_var'):
+                self.compression_settings['segment_cache_mb'] = int(self.segment_cache_mb_var.get())
+            if hasattr(self, 'threads_var'):
+                self.compression_settings['threads'] = self.threads_var.get()
+            if hasattr(self, 'readers_var'):
+                self.compression_settings['readers'] = self.readers_var.get()
+            if hasattr(self, 'load_detection_var'):
+                self.compression_settings['load_detection'] = self.load_detection_var.get()
+            if hasattr(self, 'load_scan_var'):
+                self.compression_settings['load_scan'] = self.load_scan_var.get()
+            if hasattr(self, 'skip_loads_var'):
+                self.compression_settings['skip_loads'] = self.skip_loads_var.get() == "on"
+            if hasattr(self, 'dedupe_var'):
+                self.compression_settings['dedupe_frames'] = self.dedupe_var.get() == "on"
+            if hasattr(self, 'pretrim_var'):
+                self.compression_settings['pretrim'] = self.pretrim_var.get() == "on"
+            if hasattr(self, 'timer_region_var'):
+                region = self._parse_timer_region(self.timer_region_var.get())
+                if region:
+                    self.compression_settings['timer_region'] = region
             self.save_settings()
             scale_text = {0.25: "Quarter", 0.5: "Half", 1.0: "Full"}[self.compression_settings['scale']]
             fps_text = f"{int(self.compression_settings['fps'])}fps"
@@ -1115,14 +2353,24 @@ class SpeedrunComparisonTool:
 
     def on_closing(self):
         self.save_settings()
+        self._load_executor.shutdown(wait=False)
+        self._analysis_executor.shutdown(wait=False, cancel_futures=True)
+        if self.render_queue is not None:
+            self.render_queue.shutdown()
 
-        if hasattr(self.video_generator, '_cancel_generation'):
+        if self.video_generator is not None:
             self.video_generator.set_cancel_flag(True)
             self.video_generator.set_pause_flag(False)
 
         for video_id, video_data in self.videos.items():
+            if video_data.get('scene_index'):
+                video_data['scene_index'].cancel()
+            if video_data.get('waveform'):
+                video_data['waveform'].cancel()
             if 'player' in video_data and video_data['player']:
                 video_data['player'].close()
+        if 'speedrun_core.capture_pool' in sys.modules:
+            sys.modules['speedrun_core.capture_pool'].capture_pool.close_all()
 
         self.root.destroy()
 
@@ -1149,6 +2397,35 @@ class SpeedrunComparisonTool:
             self.compression_settings['scale'] = float(self.scale_var.get())
             if hasattr(self, 'codec_var'):
                 self.compression_settings['codec'] = self.codec_var.get()
+            if hasattr(self, 'layout_var'):
+                self.compression_settings['layout'] = self.layout_var.get()
+            if hasattr(self, 'cache_var'):
+                cache_mode = self.cache_var.get()
+                self.compression_settings['cache_compression'] = None if cache_mode == 'off' else cache_mode
+                for video_data in self.videos.values():
+                    self._apply_cache_settings(video_data['player'])
+            if hasattr(self, 'segment_cache_var'):
+                self.compression_settings['segment_cache'] = self.segment_cache_var.get() == "on"
+            if hasattr(self, 'segment_cache_mb_var'):
+                self.compression_settings['segment_cache_mb'] = int(self.segment_cache_mb_var.get())
+            if hasattr(self, 'threads_var'):
+                self.compression_settings['threads'] = self.threads_var.get()
+            if hasattr(self, 'readers_var'):
+                self.compression_settings['readers'] = self.readers_var.get()
+            if hasattr(self, 'load_detection_var'):
+                self.compression_settings['load_detection'] = self.load_detection_var.get()
+            if hasattr(self, 'load_scan_var'):
+                self.compression_settings['load_scan'] = self.load_scan_var.get()
+            if hasattr(self, 'skip_loads_var'):
+                self.compression_settings['skip_loads'] = self.skip_loads_var.get() == "on"
+            if hasattr(self, 'dedupe_var'):
+                self.compression_settings['dedupe_frames'] = self.dedupe_var.get() == "on"
+            if hasattr(self, 'pretrim_var'):
+                self.compression_settings['pretrim'] = self.pretrim_var.get() == "on"
+            if hasattr(self, 'timer_region_var'):
+                region = self._parse_timer_region(self.timer_region_var.get())
+                if region:
+                    self.compression_settings['timer_region'] = region
             self.save_settings()
             scale_text = {0.25: "Quarter", 0.5: "Half", 1.0: "Full"}[self.compression_settings['scale']]
             fps_text = f"{int(self.compression_settings['fps'])}fps"
@@ -1159,8 +2436,17 @@ class SpeedrunComparisonTool:
         except (ValueError, KeyError):
             pass
 
+    def _apply_cache_settings(self, player):
+        """Apply the preview frame cache settings to a player"""
+        compression = self.compression_settings.get('cache_compression', 'jpeg')
+        memory_mb = self.compression_settings.get('cache_memory_mb', 256)
+        if player.cache_compression != compression or player.cache_memory_limit != int(memory_mb * 1024 * 1024):
+            player.configure_cache(compression=compression, memory_limit_mb=memory_mb)
+
 if __name__ == "__main__":
     root = tk.Tk()
+    startup_timer.mark('tk_root_created')
     app = SpeedrunComparisonTool(root)
     root.protocol("WM_DELETE_WINDOW", app.on_closing)
+    root.after_idle(lambda: startup_timer.mark('first_interactive_window'))
     root.mainloop()
\ No newline at end of file
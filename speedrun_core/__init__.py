@@ -0,0 +1,38 @@
+"""UI-free decoding, seeking, timing and generation core, importable without tkinter or a display"""
+
+import importlib
+
+_EXPORTS = {
+    'get_capabilities': 'capabilities',
+    'CapturePool': 'capture_pool',
+    'default_capture_pool': 'capture_pool',
+    'plan_layout': 'layout_planner',
+    'detect_crop': 'crop_detect',
+    'make_template': 'mark_detect',
+    'find_in_videos': 'mark_detect',
+    'align_videos': 'audio_align',
+    'scan_loads': 'load_detect',
+    'scan_duplicates': 'duplicate_detect',
+    'SceneIndex': 'scene_index',
+    'FrameScanner': 'frame_scan',
+    'WaveformEnvelope': 'waveform',
+    'TimerReader': 'timer_read',
+    'LogSink': 'log_sink',
+    'ProgressPublisher': 'progress_events',
+    'JsonLinesWriter': 'progress_events',
+    'SegmentCache': 'segment_cache',
+    'RenderQueue': 'render_queue',
+    'plan_thread_budget': 'thread_budget',
+    'VideoPlayer': 'video_player',
+    'VideoLoadError': 'video_player',
+    'VideoGenerator': 'video_generator',
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name):
+    # Resolved lazily so light modules (log_sink) don't pull in OpenCV/NumPy
+    if name in _EXPORTS:
+        module = importlib.import_module(f".{_EXPORTS[name]}", __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
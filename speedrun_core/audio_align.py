@@ -0,0 +1,175 @@
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+AUDIO_RATE = 2000
+CHUNK_SAMPLES = 1 << 20
+
+# Decoded tracks are kept for re-alignment, least recently used first out past this size
+MAX_CACHED_AUDIO_MB = 256
+
+_tracks = OrderedDict()
+_tracks_lock = threading.Lock()
+
+def stream_audio(video_path, sample_rate=AUDIO_RATE, block_bytes=1 << 18):
+    """Yield a video's audio as mono float32 blocks decoded by FFmpeg, without holding the whole track.
+
+    Closing the generator early stops FFmpeg.
+    """
+    if shutil.which('ffmpeg') is None:
+        raise ValueError("FFmpeg is required to read audio but was not found on PATH")
+
+    # FFmpeg's resampler low-passes before decimating, so nothing above the new Nyquist folds back in
+    cmd = [
+        'ffmpeg', '-nostdin', '-v', 'error',
+        '-i', video_path,
+        '-vn', '-ac', '1', '-ar', str(sample_rate),
+        '-f', 'f32le', '-'
+    ]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    pending = b''
+    try:
+        while True:
+            data = process.stdout.read(block_bytes)
+            if not data:
+                break
+            data = pending + data
+            usable = len(data) - len(data) % 4
+            pending = data[usable:]
+            if usable:
+                yield np.frombuffer(data[:usable], dtype=np.float32)
+        stderr = process.stderr.read().decode('utf-8', errors='replace')
+    finally:
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.stderr.close()
+        process.wait()
+
+    if process.returncode != 0:
+        raise ValueError(f"FFmpeg could not extract audio from {video_path}: {stderr.strip()}")
+
+def extract_audio(video_path, sample_rate=AUDIO_RATE, duration=None, progress=None):
+    """Decimated mono float32 track of a video, decoded by FFmpeg once per file and sample rate"""
+    stat = os.stat(video_path)
+    key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns, sample_rate)
+    with _tracks_lock:
+        if key in _tracks:
+            _tracks.move_to_end(key)
+            return _tracks[key]
+
+    blocks = []
+    received = 0
+    expected = duration * sample_rate if duration else None
+    for block in stream_audio(video_path, sample_rate):
+        blocks.append(block)
+        received += block.size
+        if progress and expected:
+            progress(min(1.0, received / expected))
+
+    samples = np.concatenate(blocks) if blocks else np.zeros(0, dtype=np.float32)
+    if samples.size == 0:
+        raise ValueError(f"No audio track found in {video_path}")
+
+    with _tracks_lock:
+        _tracks[key] = samples
+        cached_bytes = sum(track.nbytes for track in _tracks.values())
+        while len(_tracks) > 1 and cached_bytes > MAX_CACHED_AUDIO_MB * 1024 * 1024:
+            cached_bytes -= _tracks.popitem(last=False)[1].nbytes
+    return samples
+
+def clear_audio_cache():
+    with _tracks_lock:
+        _tracks.clear()
+
+def correlate(signal, template, chunk_samples=CHUNK_SAMPLES, progress=None):
+    """Normalised cross-correlation of a short template at every lag of a long signal.
+
+    Uses overlap-save FFT blocks so memory stays bounded however long the signal is.
+    """
+    signal = np.asarray(signal, dtype=np.float32)
+    template = np.asarray(template, dtype=np.float64)
+    m = template.size
+    lags = signal.size - m + 1
+    if m == 0 or lags <= 0:
+        return np.zeros(0, dtype=np.float32)
+
+    template = template - template.mean()
+    template_norm = np.sqrt(np.sum(template ** 2))
+    if template_norm == 0:
+        raise ValueError("The audio cue is silent")
+
+    fft_size = 1 << int(np.ceil(np.log2(max(chunk_samples, 2 * m))))
+    block = fft_size - m + 1
+    template_fft = np.conj(np.fft.rfft(template, fft_size))
+
+    scores = np.empty(lags, dtype=np.float32)
+    for start in range(0, lags, block):
+        segment = signal[start:start + fft_size]
+        raw = np.fft.irfft(np.fft.rfft(segment, fft_size) * template_fft, fft_size)
+        count = min(block, lags - start)
+        scores[start:start + count] = raw[:count]
+        if progress:
+            progress(min(1.0, (start + count) / lags))
+
+    # Dividing by each window's energy keeps loud passages from outscoring the real cue
+    squares = np.concatenate(([0.0], np.cumsum(signal.astype(np.float64) ** 2)))
+    sums = np.concatenate(([0.0], np.cumsum(signal, dtype=np.float64)))
+    window_energy = squares[m:] - squares[:-m] - (sums[m:] - sums[:-m]) ** 2 / m
+    denominator = np.sqrt(np.maximum(window_energy, 1e-12)) * template_norm
+    return (scores / denominator).astype(np.float32)
+
+def find_audio_offset(reference, other, cue_start, cue_seconds=10.0, sample_rate=AUDIO_RATE, progress=None):
+    """Where the reference's audio cue starting at cue_start seconds occurs in the other track, as {'time', 'score'}"""
+    first = int(round(cue_start * sample_rate))
+    cue = reference[first:first + int(round(cue_seconds * sample_rate))]
+    if cue.size < sample_rate:
+        raise ValueError("The reference audio ends before the cue; mark an earlier start")
+
+    scores = correlate(other, cue, progress=progress)
+    if scores.size == 0:
+        return None
+    best = int(np.argmax(scores))
+    return {'time': best / sample_rate, 'score': float(scores[best])}
+
+def align_videos(reference, others, cue_seconds=10.0, sample_rate=AUDIO_RATE, min_score=0.3,
+                 progress=None, max_workers=None):
+    """Propose start frames that line each video's audio up with the reference's start mark.
+
+    reference is {'video_path', 'start_time', 'duration'}; others maps video ids to
+    {'video_path', 'fps', 'duration'}. Returns {video_id: {'frame', 'time', 'score'}, None or exception}.
+    progress(stage, video_id, fraction) is called from worker threads.
+    """
+    def report(stage, video_id):
+        if progress is None:
+            return None
+        return lambda fraction: progress(stage, video_id, fraction)
+
+    reference_track = extract_audio(reference['video_path'], sample_rate, reference.get('duration'),
+                                    report('extract', None))
+
+    def align_one(video_id, video):
+        track = extract_audio(video['video_path'], sample_rate, video.get('duration'), report('extract', video_id))
+        match = find_audio_offset(reference_track, track, reference['start_time'], cue_seconds,
+                                  sample_rate, report('correlate', video_id))
+        if match is None or match['score'] < min_score:
+            return None
+        match['frame'] = int(round(match['time'] * video['fps']))
+        return match
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(others) or 1,
+                            thread_name_prefix="audio-align") as executor:
+        futures = {video_id: executor.submit(align_one, video_id, video) for video_id, video in others.items()}
+        for video_id, future in futures.items():
+            try:
+                results[video_id] = future.result()
+            except Exception as e:
+                results[video_id] = e
+    return results
@@ -0,0 +1,96 @@
+import json
+import os
+import platform
+import shutil
+import threading
+import time
+
+CACHE_FILE = "capabilities_cache.json"
+
+_capabilities = None
+_lock = threading.Lock()
+
+def get_capabilities(cache_file=CACHE_FILE, refresh=False):
+    """Return backend/acceleration capabilities, probed once per process and cached on disk"""
+    global _capabilities
+
+    with _lock:
+        if _capabilities is not None and not refresh:
+            return _capabilities
+
+        import cv2
+
+        cache_key = {
+            'cv2_version': cv2.__version__,
+            'platform': platform.platform(),
+            'python': platform.python_version()
+        }
+
+        if not refresh:
+            cached = _read_cache(cache_file)
+            if cached and cached.get('key') == cache_key:
+                _capabilities = cached['capabilities']
+                return _capabilities
+
+        _capabilities = _probe_capabilities(cv2)
+        _write_cache(cache_file, cache_key, _capabilities)
+        return _capabilities
+
+def _probe_capabilities(cv2):
+    probe_start = time.perf_counter()
+    capabilities = {
+        'cuda_devices': 0,
+        'hw_acceleration': False,
+        'hw_backend': None,
+        'backends': [],
+        'ffmpeg_binary': shutil.which('ffmpeg') is not None
+    }
+
+    try:
+        capabilities['cuda_devices'] = int(cv2.cuda.getCudaEnabledDeviceCount())
+    except Exception:
+        pass
+
+    try:
+        capabilities['backends'] = [cv2.videoio_registry.getBackendName(b)
+                                    for b in cv2.videoio_registry.getStreamBackends()]
+    except Exception:
+        pass
+
+    try:
+        backends = [
+            (cv2.CAP_DSHOW, "DirectShow"),
+            (cv2.CAP_MSMF, "Media Foundation"),
+            (cv2.CAP_FFMPEG, "FFmpeg"),
+        ]
+
+        for backend, name in backends:
+            test_cap = cv2.VideoCapture()
+            test_cap.set(cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY)
+            if test_cap.isOpened():
+                capabilities['hw_acceleration'] = True
+                capabilities['hw_backend'] = name
+                test_cap.release()
+                break
+            test_cap.release()
+    except Exception:
+        pass
+
+    capabilities['probe_seconds'] = time.perf_counter() - probe_start
+    return capabilities
+
+def _read_cache(cache_file):
+    try:
+        if os.path.exists(cache_file):
+            with open(cache_file, 'r') as f:
+                return json.load(f)
+    except Exception as e:
+        print(f"Could not read capability cache: {e}")
+    return None
+
+def _write_cache(cache_file, cache_key, capabilities):
+    try:
+        with open(cache_file, 'w') as f:
+            json.dump({'key': cache_key, 'capabilities': capabilities}, f, indent=2)
+    except Exception as e:
+        print(f"Could not write capability cache: {e}")
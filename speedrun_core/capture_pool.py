@@ -0,0 +1,177 @@
+import cv2
+import os
+import threading
+import time
+
+DEFAULT_BACKENDS = [
+    (cv2.CAP_FFMPEG, "FFmpeg"),
+    (cv2.CAP_ANY, "Default"),
+    (cv2.CAP_MSMF, "Media Foundation")
+]
+
+class CapturePool:
+    """Keeps warm cv2.VideoCapture handles keyed by (path, backend, decoder threads) so readers can borrow instead of re-opening"""
+
+    def __init__(self, max_idle_per_key=2, max_idle_total=24, max_idle_age=600.0):
+        self.max_idle_per_key = max_idle_per_key
+        self.max_idle_total = max_idle_total
+        self.max_idle_age = max_idle_age
+
+        self._idle = {}
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.reused = 0
+        self.discarded = 0
+
+    def acquire(self, video_path, backends=None, threads=None):
+        """Borrow a healthy capture, returning (capture, backend) or (None, None)"""
+        # threads fixes the FFmpeg decoder thread count; it can only be set when a capture is opened
+        backends = backends or DEFAULT_BACKENDS
+
+        with self._lock:
+            self._prune_locked()
+            for backend, _ in backends:
+                handles = self._idle.get((video_path, backend, threads), [])
+                while handles:
+                    cap, _ = handles.pop()
+                    if self._is_healthy(cap):
+                        self.reused += 1
+                        return cap, backend
+                    self._close(cap)
+
+        for backend, backend_name in backends:
+            cap = self._open(video_path, backend, threads)
+            if cap is not None:
+                return cap, backend
+
+        return None, None
+
+    def release(self, video_path, backend, cap, threads=None):
+        """Return a borrowed capture to the pool, closing it if unhealthy or over the idle limits"""
+        if cap is None:
+            return
+
+        if backend is None or not self._is_healthy(cap):
+            self._close(cap)
+            return
+
+        with self._lock:
+            handles = self._idle.setdefault((video_path, backend, threads), [])
+            if len(handles) >= self.max_idle_per_key:
+                self._close(cap)
+                return
+            handles.append((cap, time.monotonic()))
+
+            while self._idle_count_locked() > self.max_idle_total:
+                self._evict_oldest_locked()
+
+    def discard(self, cap):
+        """Close a capture that failed a read instead of returning it to the pool"""
+        if cap is not None:
+            self._close(cap)
+
+    def warm(self, video_path, backend, count=1, threads=None):
+        """Open spare handles ahead of time so recovery and generation skip the open cost.
+
+        threads must match what the borrower will pass to acquire: the generator's readers ask
+        for their decoder thread budget, players for the default.
+        """
+        with self._lock:
+            missing = count - len(self._idle.get((video_path, backend, threads), []))
+
+        for _ in range(max(0, missing)):
+            cap = self._open(video_path, backend, threads)
+            if cap is None:
+                break
+            self.release(video_path, backend, cap, threads)
+
+    def warm_async(self, video_path, backend, count=1, threads=None):
+        thread = threading.Thread(target=self.warm, args=(video_path, backend, count, threads))
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def close_path(self, video_path):
+        with self._lock:
+            for key in [key for key in self._idle if key[0] == video_path]:
+                for cap, _ in self._idle.pop(key):
+                    self._close(cap)
+
+    def close_all(self):
+        with self._lock:
+            for handles in self._idle.values():
+                for cap, _ in handles:
+                    self._close(cap)
+            self._idle.clear()
+
+    def _after_fork_in_child(self):
+        # A forked worker shares file offsets with the parent's open handles, so using or
+        # closing them would corrupt both sides; keep them referenced but never touch them
+        self._inherited = getattr(self, '_inherited', []) + [cap for handles in self._idle.values() for cap, _ in handles]
+        self._idle = {}
+        self._lock = threading.Lock()
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'idle': self._idle_count_locked(),
+                'opened': self.opened,
+                'reused': self.reused,
+                'discarded': self.discarded
+            }
+
+    def _open(self, video_path, backend, threads=None):
+        try:
+            if threads:
+                cap = cv2.VideoCapture(video_path, backend, [cv2.CAP_PROP_N_THREADS, int(threads)])
+            else:
+                cap = cv2.VideoCapture(video_path, backend)
+            if cap.isOpened():
+                cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+                self.opened += 1
+                return cap
+            cap.release()
+        except Exception:
+            pass
+        return None
+
+    def _is_healthy(self, cap):
+        try:
+            return cap.isOpened() and cap.get(cv2.CAP_PROP_FRAME_COUNT) >= 0
+        except Exception:
+            return False
+
+    def _close(self, cap):
+        self.discarded += 1
+        try:
+            cap.release()
+        except Exception:
+            pass
+
+    def _idle_count_locked(self):
+        return sum(len(handles) for handles in self._idle.values())
+
+    def _evict_oldest_locked(self):
+        oldest_key = min((key for key, handles in self._idle.items() if handles),
+                         key=lambda key: self._idle[key][0][1])
+        cap, _ = self._idle[oldest_key].pop(0)
+        self._close(cap)
+
+    def _prune_locked(self):
+        now = time.monotonic()
+        for key, handles in self._idle.items():
+            fresh = []
+            for cap, idle_since in handles:
+                if now - idle_since > self.max_idle_age:
+                    self._close(cap)
+                else:
+                    fresh.append((cap, idle_since))
+            self._idle[key] = fresh
+
+
+capture_pool = CapturePool()
+# The package exports the pool under this name; `capture_pool` there would be shadowed by this module
+default_capture_pool = capture_pool
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=capture_pool._after_fork_in_child)
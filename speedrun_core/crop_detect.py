@@ -0,0 +1,74 @@
+import cv2
+import numpy as np
+
+from .capture_pool import capture_pool, DEFAULT_BACKENDS
+
+def detect_crop(video_path, start_frame, end_frame, samples=16, analysis_width=320,
+                black_threshold=20, motion_threshold=8.0, min_activity=0.02):
+    """Find the game area by trimming letterbox bars and static borders, returning (x, y, w, h) or None"""
+    cap, backend = capture_pool.acquire(video_path, DEFAULT_BACKENDS[:2])
+    if cap is None:
+        raise ValueError(f"Could not open video for crop detection: {video_path}")
+
+    try:
+        end_frame = max(start_frame + 1, end_frame)
+        positions = np.linspace(start_frame, end_frame - 1, num=samples).astype(int)
+
+        stack = []
+        full_size = None
+        for position in np.unique(positions):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+            ret, frame = cap.read()
+            if not ret or frame is None:
+                continue
+            full_size = frame.shape[1], frame.shape[0]
+            analysis_height = max(1, int(frame.shape[0] * analysis_width / frame.shape[1]))
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+            stack.append(cv2.resize(gray, (analysis_width, analysis_height), interpolation=cv2.INTER_AREA))
+    finally:
+        capture_pool.release(video_path, backend, cap)
+
+    if not stack:
+        return None
+
+    return crop_from_samples(np.stack(stack), full_size, black_threshold, motion_threshold, min_activity)
+
+def crop_from_samples(stack, full_size, black_threshold=20, motion_threshold=8.0, min_activity=0.02,
+                      min_area_fraction=0.25):
+    """Compute the crop from an (N, h, w) stack of downsampled grayscale samples"""
+    _, height, width = stack.shape
+    stack = stack.astype(np.float32)
+
+    brightest = stack.max(axis=0)
+    content_rows = np.flatnonzero(brightest.max(axis=1) > black_threshold)
+    content_cols = np.flatnonzero(brightest.max(axis=0) > black_threshold)
+    if content_rows.size == 0 or content_cols.size == 0:
+        return None
+    top, bottom = content_rows[0], content_rows[-1] + 1
+    left, right = content_cols[0], content_cols[-1] + 1
+
+    if stack.shape[0] >= 3:
+        content = stack[:, top:bottom, left:right]
+        active = (content.max(axis=0) - content.min(axis=0)) > motion_threshold
+        active_rows = np.flatnonzero(active.mean(axis=1) > min_activity)
+        active_cols = np.flatnonzero(active.mean(axis=0) > min_activity)
+        # A low-motion range would shrink the crop to whatever moved, so only trim
+        # static borders when the moving area is still a sizeable part of the picture
+        if active_rows.size and active_cols.size:
+            active_area = (active_rows[-1] + 1 - active_rows[0]) * (active_cols[-1] + 1 - active_cols[0])
+            if active_area >= min_area_fraction * active.size:
+                top, bottom = top + active_rows[0], top + active_rows[-1] + 1
+                left, right = left + active_cols[0], left + active_cols[-1] + 1
+
+    if (bottom - top) * (right - left) >= 0.98 * height * width:
+        return None
+
+    full_width, full_height = full_size
+    sx, sy = full_width / width, full_height / height
+    x = int(left * sx) & ~1
+    y = int(top * sy) & ~1
+    w = min(full_width - x, int(np.ceil(right * sx)) - x) & ~1
+    h = min(full_height - y, int(np.ceil(bottom * sy)) - y) & ~1
+    if w <= 0 or h <= 0:
+        return None
+    return x, y, w, h
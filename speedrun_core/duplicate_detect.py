@@ -0,0 +1,75 @@
+import cv2
+import numpy as np
+
+from .capture_pool import capture_pool, DEFAULT_BACKENDS
+from .range_scan import scan_ranges
+
+ANALYSIS_SIZE = (128, 72)
+DEFAULT_DUPLICATE_OPTIONS = {'mean_threshold': 1.0, 'max_threshold': 10}
+
+def scan_duplicates(video_path, start_frame, end_frame, options=None, crop=None, batch_size=64):
+    """Index the frames in [start_frame, end_frame) that repeat the frame before them.
+
+    A frame is a duplicate when its downsampled grayscale differs from the previous frame's by
+    at most mean_threshold on average and max_threshold anywhere; the max keeps a ticking timer
+    on an otherwise static screen from counting as a repeat. Returns {'start_frame', 'frames',
+    'unique_frames', 'duplicate', 'options'}, where duplicate is a boolean array over the range and
+    options are the thresholds it was found with.
+    """
+    options = {**DEFAULT_DUPLICATE_OPTIONS, **(options or {})}
+    cap, backend = capture_pool.acquire(video_path, DEFAULT_BACKENDS[:2])
+    if cap is None:
+        raise ValueError(f"Could not open video for duplicate detection: {video_path}")
+
+    width, height = ANALYSIS_SIZE
+    # Row 0 carries the previous batch's last frame so every frame has a predecessor to compare with
+    batch = np.empty((batch_size + 1, height, width), dtype=np.uint8)
+    flags = []
+    have_previous = False
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        remaining = end_frame - start_frame
+        while remaining > 0:
+            wanted = min(batch_size, remaining)
+            count = 0
+            while count < wanted:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if crop:
+                    x, y, w, h = crop
+                    frame = frame[y:y + h, x:x + w]
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                cv2.resize(gray, ANALYSIS_SIZE, dst=batch[count + 1], interpolation=cv2.INTER_AREA)
+                count += 1
+            if count == 0:
+                break
+
+            frames = batch[:count + 1].astype(np.int16)
+            differences = np.abs(np.diff(frames, axis=0)).reshape(count, -1)
+            duplicate = (differences.mean(axis=1) <= options['mean_threshold']) & \
+                        (differences.max(axis=1) <= options['max_threshold'])
+            if not have_previous:
+                duplicate[0] = False
+                have_previous = True
+            flags.append(duplicate)
+            batch[0] = batch[count]
+
+            remaining -= count
+            if count < wanted:
+                break
+    finally:
+        capture_pool.release(video_path, backend, cap)
+
+    duplicate = np.concatenate(flags) if flags else np.zeros(0, dtype=bool)
+    return {
+        'start_frame': start_frame,
+        'frames': int(duplicate.size),
+        'unique_frames': int(duplicate.size - duplicate.sum()),
+        'duplicate': duplicate,
+        'options': options
+    }
+
+def scan_videos(searches, options=None, max_workers=None):
+    """Run scan_duplicates for {video_id: {'video_path', 'start_frame', 'end_frame', 'crop'}} across processes"""
+    return scan_ranges(scan_duplicates, searches, options or {}, max_workers)
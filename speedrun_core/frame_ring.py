@@ -0,0 +1,211 @@
+import collections
+import multiprocessing
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+RING_SLOTS = 32
+
+class FrameRing:
+    """Decoded frames handed from a reader process to the composer through shared memory.
+
+    The reader copies each new frame into the next of `slots` frame-sized slots and only sends
+    (frame_index, sequence) over a queue, so frames are never pickled; the composer reads the
+    slots as NumPy views. A slot is written again only after the composer has released every
+    frame that was in it (release_before). A repeated frame is sent with the sequence of the
+    frame it repeats and comes out as the same array, as with the threaded readers.
+
+    This side lives in the rendering process and is read like the readers' queue.Queue (put by
+    the reader, get_nowait/empty/qsize by the composer); writer() is the side to hand to the
+    reader process.
+    """
+
+    def __init__(self, slots, width, height, video_id=None, processing_state=None, log_callback=None,
+                 context=None):
+        context = context or multiprocessing.get_context()
+        self.slots = int(slots)
+        self.shape = (self.slots, int(height), int(width), 3)
+        self.video_id = video_id
+        self.processing_state = processing_state
+        self.log_callback = log_callback or (lambda message, level="info": None)
+        self.process = None
+
+        self._memory = shared_memory.SharedMemory(create=True, size=int(np.prod(self.shape)))
+        self._frames = np.ndarray(self.shape, dtype=np.uint8, buffer=self._memory.buf)
+        self._messages = context.Queue()
+        self._released = context.Value('q', 0, lock=False)
+        # A plain flag rather than an Event: setting an Event waits on waiters that may have exited
+        self._cancelled = context.Value('b', 0, lock=False)
+
+        self._received = collections.deque()
+        self._pending = collections.deque()
+        self._next_sequence = 0
+        self._last = (None, None)
+        self._ended = False
+
+    def writer(self, batch_size=10):
+        return FrameRingWriter(self._memory.name, self.shape, self._messages, self._released, self._cancelled,
+                               batch_size)
+
+    def _receive(self):
+        while not self._ended:
+            try:
+                message = self._messages.get_nowait()
+            except queue.Empty:
+                if self.process is not None and not self.process.is_alive():
+                    self.log_callback(f"Reader process for video {self.video_id} exited with code "
+                                      f"{self.process.exitcode}", "error")
+                    self._end()
+                break
+
+            kind = message[0]
+            if kind == 'frames':
+                for frame_idx, sequence in message[1]:
+                    if sequence != self._last[0]:
+                        self._last = (sequence, self._frames[sequence % self.slots])
+                    self._received.append((frame_idx, sequence, self._last[1]))
+                    self._next_sequence = sequence + 1
+                if self.processing_state is not None and message[1]:
+                    self.processing_state[f'frames_read_{self.video_id}'] = message[1][-1][0] + 1
+            elif kind == 'log':
+                self.log_callback(message[1], message[2])
+            elif kind == 'end':
+                self._end()
+
+    def _end(self):
+        self._ended = True
+        self._received.append(None)
+        if self.processing_state is not None:
+            self.processing_state[f'reading_complete_{self.video_id}'] = True
+
+    def empty(self):
+        if not self._received:
+            self._receive()
+        return not self._received
+
+    def get_nowait(self):
+        if not self._received:
+            self._receive()
+        if not self._received:
+            raise queue.Empty
+        item = self._received.popleft()
+        if item is None:
+            return None
+        frame_idx, sequence, frame = item
+        self._pending.append((frame_idx, sequence))
+        return frame_idx, frame
+
+    def qsize(self):
+        return len(self._received)
+
+    def release_before(self, frame_idx, cache_dict):
+        """Drop frames before frame_idx (all of them if it is negative) from cache_dict and let the reader reuse their slots"""
+        while self._pending and (frame_idx < 0 or self._pending[0][0] < frame_idx):
+            cache_dict.pop(self._pending.popleft()[0], None)
+        if frame_idx < 0:
+            cache_dict.clear()
+        # Frames received but not yet taken by the composer hold their slots as well
+        if self._pending:
+            self._released.value = self._pending[0][1]
+        elif self._received and self._received[0] is not None:
+            self._released.value = self._received[0][1]
+        else:
+            self._released.value = self._next_sequence
+
+    def cancel(self):
+        """Tell the reader to stop; a reader waiting for a free slot gives up"""
+        self._cancelled.value = 1
+
+    def close(self):
+        """Pass on the reader's remaining log messages and free the shared memory"""
+        self.cancel()
+        while True:
+            try:
+                message = self._messages.get_nowait()
+            except (queue.Empty, OSError, ValueError):
+                break
+            if message[0] == 'log':
+                self.log_callback(message[1], message[2])
+        self._messages.close()
+
+        self._received.clear()
+        self._pending.clear()
+        self._last = (None, None)
+        self._frames = None
+        try:
+            self._memory.close()
+        except BufferError:
+            # A composer that did not stop in time still holds views; the mapping goes with them
+            pass
+        self._memory.unlink()
+
+class FrameRingWriter:
+    """The reader process's side of a FrameRing, used like the queue.Queue the threaded readers put into"""
+
+    def __init__(self, name, shape, messages, released, cancelled, batch_size=10):
+        self.name = name
+        self.shape = shape
+        self.batch_size = batch_size
+        self._messages = messages
+        self._released = released
+        self._cancelled = cancelled
+        self._memory = None
+        self._frames = None
+        self._batch = []
+        self._sequence = 0
+        self._last_frame = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.update(_memory=None, _frames=None, _batch=[], _last_frame=None)
+        return state
+
+    def put(self, item):
+        """Take (frame_idx, frame) or the None that ends the stream; waits while every slot is still in use"""
+        if item is None:
+            self.flush()
+            self._messages.put(('end',))
+            return
+
+        frame_idx, frame = item
+        if frame is not self._last_frame or not self._sequence:
+            slots = self.shape[0]
+            if self._sequence - self._released.value >= slots:
+                # The composer is behind; send what it has not seen yet before waiting for it
+                self.flush()
+                while self._sequence - self._released.value >= slots:
+                    if self.cancelled:
+                        return
+                    time.sleep(0.001)
+            if self._frames is None:
+                self._memory = shared_memory.SharedMemory(name=self.name)
+                self._frames = np.ndarray(self.shape, dtype=np.uint8, buffer=self._memory.buf)
+            self._frames[self._sequence % slots] = frame
+            self._last_frame = frame
+            self._sequence += 1
+
+        self._batch.append((frame_idx, self._sequence - 1))
+        if len(self._batch) >= self.batch_size:
+            self.flush()
+
+    @property
+    def cancelled(self):
+        return bool(self._cancelled.value)
+
+    def flush(self):
+        if self._batch:
+            self._messages.put(('frames', self._batch))
+            self._batch = []
+
+    def log(self, message, level="info"):
+        self._messages.put(('log', message, level))
+
+    def close(self):
+        self.flush()
+        self._frames = None
+        self._last_frame = None
+        if self._memory is not None:
+            self._memory.close()
+            self._memory = None
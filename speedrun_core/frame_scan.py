@@ -0,0 +1,194 @@
+import os
+import shutil
+import subprocess
+import threading
+
+from .video_player import VideoPlayer
+
+_keyframes = {}
+_keyframes_lock = threading.Lock()
+
+def find_keyframes(video_path, fps):
+    """Frame numbers of the video's keyframes from ffprobe's packet flags, or None if ffprobe is unavailable.
+
+    Only the container is read (no decoding), so this takes a second or two even for long files.
+    """
+    stat = os.stat(video_path)
+    key = (os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns, fps)
+    with _keyframes_lock:
+        if key in _keyframes:
+            return _keyframes[key]
+
+    if shutil.which('ffprobe') is None or fps <= 0:
+        return None
+
+    cmd = [
+        'ffprobe', '-v', 'error', '-select_streams', 'v:0',
+        '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0',
+        video_path
+    ]
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, timeout=120)
+    except (OSError, subprocess.TimeoutExpired):
+        return None
+    if result.returncode != 0:
+        return None
+
+    times = []
+    keyframe_times = []
+    for line in result.stdout.splitlines():
+        pts_time, _, flags = line.partition(',')
+        try:
+            pts_time = float(pts_time)
+        except ValueError:
+            continue
+        times.append(pts_time)
+        if 'K' in flags:
+            keyframe_times.append(pts_time)
+
+    if not keyframe_times:
+        return None
+
+    start_time = min(times)
+    keyframes = sorted({int(round((t - start_time) * fps)) for t in keyframe_times})
+    with _keyframes_lock:
+        _keyframes[key] = keyframes
+    return keyframes
+
+class FrameScanner:
+    """Coarse-then-exact searches over a video through its own VideoPlayer.
+
+    The coarse pass only decodes sample frames: keyframes when ffprobe can list them (a seek to a
+    keyframe decodes a single frame), topped up so samples are never more than max_gap_seconds
+    apart, or every step_seconds otherwise. Changes between two samples are then bisected with
+    exact decodes, so an hour-long file needs a few thousand decodes instead of a few hundred
+    thousand. Anything that starts and ends between two samples is missed.
+
+    Predicates take a BGR frame and return a value (usually a bool); searches look for frames
+    where that value changes.
+    """
+
+    def __init__(self, player, keyframes=True, step_seconds=1.0, max_gap_seconds=2.0):
+        self.player = player
+        self.use_keyframes = keyframes
+        self.step_seconds = step_seconds
+        self.max_gap_seconds = max_gap_seconds
+        self.decodes = 0
+        self._owns_player = False
+
+    @classmethod
+    def open(cls, video_path, **kwargs):
+        """A scanner with a private player, so scans never move the seek position of a player on screen"""
+        player = VideoPlayer()
+        player.warm_spare_capture = False
+        player.configure_cache(compression=None, raw_frames=8)
+        if not player.load_video(video_path):
+            raise ValueError(f"Could not open video for scanning: {player.load_error}")
+        scanner = cls(player, **kwargs)
+        scanner._owns_player = True
+        return scanner
+
+    def close(self):
+        if self._owns_player:
+            self.player.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def sample_positions(self, start_frame=0, end_frame=None):
+        """Coarse sample frames in [start_frame, end_frame), always including both ends of the range"""
+        fps = self.player.fps if self.player.fps > 0 else 30.0
+        end_frame = self.player.total_frames if end_frame is None else min(end_frame, self.player.total_frames)
+        if end_frame <= start_frame:
+            return []
+
+        keyframes = find_keyframes(self.player.video_path, fps) if self.use_keyframes else None
+        if keyframes:
+            max_gap = max(1, int(fps * self.max_gap_seconds))
+            positions = [start_frame] + [k for k in keyframes if start_frame < k < end_frame] + [end_frame - 1]
+            filled = []
+            for current, following in zip(positions, positions[1:]):
+                filled.extend(range(current, following, max_gap))
+            filled.append(positions[-1])
+            return sorted(set(filled))
+
+        step = max(1, int(fps * self.step_seconds))
+        return sorted(set(range(start_frame, end_frame, step)) | {end_frame - 1})
+
+    def evaluate(self, predicate, frame_number):
+        frame = self.player.get_frame_fast(frame_number)
+        if frame is None:
+            raise ValueError(f"Could not decode frame {frame_number} of {self.player.video_path}")
+        self.decodes += 1
+        return predicate(frame)
+
+    def coarse_scan(self, predicate, start_frame=0, end_frame=None, stop_when=None):
+        """[(frame, value)] at the sample positions; stops early at the first value equal to stop_when"""
+        samples = []
+        for position in self.sample_positions(start_frame, end_frame):
+            value = self.evaluate(predicate, position)
+            samples.append((position, value))
+            if stop_when is not None and value == stop_when:
+                break
+        return samples
+
+    def bisect(self, predicate, low, high, low_value=None, high_value=None):
+        """First frame in (low, high] whose value differs from frame low's, assuming a single change between them"""
+        low_value = self.evaluate(predicate, low) if low_value is None else low_value
+        while high - low > 1:
+            middle = (low + high) // 2
+            if self.evaluate(predicate, middle) == low_value:
+                low = middle
+            else:
+                high = middle
+        return high
+
+    def find_first(self, predicate, start_frame=0, end_frame=None):
+        """First frame in the range where the predicate is truthy, or None"""
+        samples = self.coarse_scan(lambda frame: bool(predicate(frame)), start_frame, end_frame, stop_when=True)
+        if not samples or not samples[-1][1]:
+            return None
+        if len(samples) == 1:
+            return samples[0][0]
+        (low, _), (high, _) = samples[-2], samples[-1]
+        return self.bisect(lambda frame: bool(predicate(frame)), low, high, False, True)
+
+    def find_transitions(self, predicate, start_frame=0, end_frame=None):
+        """[(frame, value)] for every frame where the predicate's value changes, starting with the first frame"""
+        samples = self.coarse_scan(predicate, start_frame, end_frame)
+        if not samples:
+            return []
+
+        transitions = [samples[0]]
+        for (low, low_value), (high, high_value) in zip(samples, samples[1:]):
+            if high_value == low_value:
+                continue
+            # Several changes can hide between two samples; peel them off one bisection at a time
+            while low_value != high_value:
+                change = self.bisect(predicate, low, high, low_value, high_value)
+                if change >= high:
+                    # Also reached when re-reading high disagrees with its coarse sample (an inexact
+                    # seek); the sample decides so the pair is finished either way
+                    transitions.append((high, high_value))
+                    break
+                low, low_value = change, self.evaluate(predicate, change)
+                transitions.append((low, low_value))
+        return transitions
+
+    def find_ranges(self, predicate, start_frame=0, end_frame=None):
+        """[[start, end)] frame ranges where the predicate is truthy"""
+        end_frame = self.player.total_frames if end_frame is None else min(end_frame, self.player.total_frames)
+        ranges = []
+        range_start = None
+        for frame, value in self.find_transitions(lambda frame: bool(predicate(frame)), start_frame, end_frame):
+            if value and range_start is None:
+                range_start = frame
+            elif not value and range_start is not None:
+                ranges.append([range_start, frame])
+                range_start = None
+        if range_start is not None:
+            ranges.append([range_start, end_frame])
+        return ranges
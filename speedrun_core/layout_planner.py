@@ -0,0 +1,155 @@
+import itertools
+import math
+
+LAYOUT_MODES = ('auto', 'grid', '16:9')
+
+def plan_layout(tiles, scale, spacing=None, mode='auto', target_aspect=None, aspect_range=(0.9, 4.0)):
+    """Pick the arrangement of {video_id: (w, h)} tiles with the smallest canvas, reporting savings vs the sqrt(n) grid"""
+    # Layouts outside aspect_range (tall strips, very wide single rows) are skipped unless a target aspect is set
+    if not tiles:
+        raise ValueError("At least one tile is required for a layout")
+
+    if mode == '16:9':
+        target_aspect = target_aspect or 16 / 9
+    spacing = int(20 * scale) if spacing is None else spacing
+
+    baseline = _pad_to_aspect(_grid_layout(tiles, scale, spacing), target_aspect, scale)
+    candidates = [baseline]
+
+    if mode != 'grid':
+        orders = [list(tiles.keys())]
+        by_height = sorted(tiles.keys(), key=lambda vid: -tiles[vid][1])
+        if by_height != orders[0]:
+            orders.append(by_height)
+
+        min_aspect, max_aspect = aspect_range
+        for order in orders:
+            for groups in _partitions(order):
+                for layout in (_row_layout(tiles, groups, scale, spacing), _column_layout(tiles, groups, scale, spacing)):
+                    layout = _pad_to_aspect(layout, target_aspect, scale)
+                    if target_aspect or min_aspect <= layout['width'] / layout['height'] <= max_aspect:
+                        candidates.append(layout)
+
+    best = dict(min(enumerate(candidates), key=lambda item: (item[1]['width'] * item[1]['height'], item[0]))[1])
+
+    best['area'] = best['width'] * best['height']
+    best['baseline_area'] = baseline['width'] * baseline['height']
+    best['pixels_saved'] = best['baseline_area'] - best['area']
+    best['savings'] = best['pixels_saved'] / best['baseline_area'] if best['baseline_area'] else 0.0
+    best['candidates_evaluated'] = len(candidates)
+    return best
+
+def _partitions(order):
+    """Every split of the ordered tiles into consecutive groups"""
+    n = len(order)
+    for group_count in range(1, n + 1):
+        for cuts in itertools.combinations(range(1, n), group_count - 1):
+            bounds = (0,) + cuts + (n,)
+            yield [order[bounds[i]:bounds[i + 1]] for i in range(group_count)]
+
+def _grid_layout(tiles, scale, spacing):
+    """The original layout: ceil(sqrt(n)) columns of max_width x max_height cells"""
+    num_videos = len(tiles)
+    cols = math.ceil(math.sqrt(num_videos))
+    rows = math.ceil(num_videos / cols)
+    max_width = max(w for w, h in tiles.values())
+    max_height = max(h for w, h in tiles.values())
+
+    placements = {}
+    for i, (video_id, (w, h)) in enumerate(tiles.items()):
+        grid_row = i // cols
+        grid_col = i % cols
+        placements[video_id] = {
+            'x': grid_col * (max_width + spacing) + (max_width - w) // 2,
+            'y': int(40 * scale) + grid_row * (max_height + spacing) + (max_height - h) // 2,
+            'w': w,
+            'h': h,
+            'name_x': grid_col * (max_width + spacing) + int(10 * scale),
+            'name_y': int(30 * scale) + grid_row * (max_height + spacing + int(25 * scale))
+        }
+
+    return {
+        'name': f"grid {rows}x{cols}",
+        'width': cols * max_width + (cols - 1) * spacing,
+        'height': rows * max_height + (rows - 1) * spacing + int(100 * scale),
+        'tiles': placements
+    }
+
+def _row_layout(tiles, groups, scale, spacing):
+    label_height = int(40 * scale)
+    row_widths = [sum(tiles[vid][0] for vid in group) + (len(group) - 1) * spacing for group in groups]
+    width = max(row_widths)
+
+    placements = {}
+    y = 0
+    for group, row_width in zip(groups, row_widths):
+        row_height = max(tiles[vid][1] for vid in group)
+        x = (width - row_width) // 2
+        for video_id in group:
+            w, h = tiles[video_id]
+            placements[video_id] = {
+                'x': x, 'y': y + label_height + (row_height - h) // 2, 'w': w, 'h': h,
+                'name_x': x + int(10 * scale), 'name_y': y + int(30 * scale)
+            }
+            x += w + spacing
+        y += label_height + row_height + spacing
+
+    return {
+        'name': "rows " + "+".join(str(len(group)) for group in groups),
+        'width': width,
+        'height': y - spacing + int(60 * scale),
+        'tiles': placements
+    }
+
+def _column_layout(tiles, groups, scale, spacing):
+    label_height = int(40 * scale)
+    col_heights = [sum(label_height + tiles[vid][1] for vid in group) + (len(group) - 1) * spacing
+                   for group in groups]
+    height = max(col_heights)
+
+    placements = {}
+    x = 0
+    for group, col_height in zip(groups, col_heights):
+        col_width = max(tiles[vid][0] for vid in group)
+        y = (height - col_height) // 2
+        for video_id in group:
+            w, h = tiles[video_id]
+            tile_x = x + (col_width - w) // 2
+            placements[video_id] = {
+                'x': tile_x, 'y': y + label_height, 'w': w, 'h': h,
+                'name_x': tile_x + int(10 * scale), 'name_y': y + int(30 * scale)
+            }
+            y += label_height + h + spacing
+        x += col_width + spacing
+
+    return {
+        'name': "columns " + "+".join(str(len(group)) for group in groups),
+        'width': x - spacing,
+        'height': height + int(60 * scale),
+        'tiles': placements
+    }
+
+def _pad_to_aspect(layout, target_aspect, scale):
+    """Grow the canvas to the target aspect ratio (if any) and to even dimensions"""
+    width, height = layout['width'], layout['height']
+    if target_aspect:
+        if width / height < target_aspect:
+            width = math.ceil(height * target_aspect)
+        else:
+            height = math.ceil(width / target_aspect)
+    width += width % 2
+    height += height % 2
+
+    dx = (width - layout['width']) // 2
+    dy = (height - layout['height']) // 2
+    if dx or dy:
+        for placement in layout['tiles'].values():
+            placement['x'] += dx
+            placement['name_x'] += dx
+            placement['y'] += dy
+            placement['name_y'] += dy
+
+    layout['width'] = width
+    layout['height'] = height
+    layout['timer_y'] = height - int(20 * scale)
+    return layout
@@ -0,0 +1,164 @@
+import cv2
+import numpy as np
+
+from .capture_pool import capture_pool, DEFAULT_BACKENDS
+from .frame_scan import FrameScanner
+from .range_scan import scan_ranges
+
+LOAD_DETECTION_MODES = ('off', 'black', 'template', 'region')
+ANALYSIS_SIZE = (80, 45)
+DEFAULT_LOAD_REGION = (0.0, 0.85, 1.0, 0.15)
+
+def load_predicate_from_settings(settings):
+    """Predicate config for the export settings' load detection mode, or None when it is off"""
+    mode = settings.get('load_detection', 'off')
+    if mode == 'black':
+        predicate = {'type': 'black'}
+    elif mode == 'template':
+        predicate = {'type': 'template', 'image_path': settings.get('load_image')}
+    elif mode == 'region':
+        predicate = {'type': 'region', 'image_path': settings.get('load_image'), 'color': settings.get('load_color'),
+                     'region': list(settings.get('load_region') or DEFAULT_LOAD_REGION)}
+    else:
+        return None
+
+    if settings.get('load_scan') == 'keyframes':
+        predicate['scan'] = 'keyframes'
+    return predicate
+
+def make_predicate(config):
+    """Turn a predicate config into a function of an (N, h, w, 3) batch of analysis frames returning N booleans.
+
+    Configs are plain dicts so they can be saved with the settings and sent to worker processes:
+      {'type': 'black', 'threshold': 24, 'fraction': 0.97}: mostly-black frames
+      {'type': 'template', 'image_path': ..., 'min_score': 0.85}: frames that look like a loading screen image
+      {'type': 'region', 'region': [x, y, w, h], 'color': [b, g, r] or 'image_path': ..., 'tolerance': 12}:
+        frames whose region (fractions of the frame) has a given mean color
+    Any config may add 'scan': 'keyframes' to have scan_loads sample keyframes and bisect instead
+    of classifying every frame.
+    """
+    kind = config.get('type')
+    width, height = ANALYSIS_SIZE
+
+    if kind == 'black':
+        threshold = config.get('threshold', 24)
+        fraction = config.get('fraction', 0.97)
+        return lambda batch: (batch.max(axis=3) <= threshold).mean(axis=(1, 2)) >= fraction
+
+    if kind == 'region':
+        rx, ry, rw, rh = config.get('region') or DEFAULT_LOAD_REGION
+        x0, y0 = int(rx * width), int(ry * height)
+        x1, y1 = max(x0 + 1, int(round((rx + rw) * width))), max(y0 + 1, int(round((ry + rh) * height)))
+        color = config.get('color')
+        if color is None:
+            reference = _load_reference(config.get('image_path'))
+            color = reference[y0:y1, x0:x1].reshape(-1, 3).mean(axis=0)
+        color = np.asarray(color, dtype=np.float32)
+        tolerance = config.get('tolerance', 12)
+
+        def region_predicate(batch):
+            means = batch[:, y0:y1, x0:x1].reshape(len(batch), -1, 3).mean(axis=1)
+            return np.abs(means - color).max(axis=1) <= tolerance
+        return region_predicate
+
+    if kind == 'template':
+        template = _gray(_load_reference(config.get('image_path'))[None])[0].ravel()
+        template -= template.mean()
+        template /= max(np.linalg.norm(template), 1e-6)
+        min_score = config.get('min_score', 0.85)
+
+        def template_predicate(batch):
+            # Whole-frame normalised correlation, one matrix product for the batch
+            frames = _gray(batch).reshape(len(batch), -1)
+            frames -= frames.mean(axis=1, keepdims=True)
+            norms = np.maximum(np.linalg.norm(frames, axis=1), 1e-6)
+            return frames @ template / norms >= min_score
+        return template_predicate
+
+    raise ValueError(f"Unknown load predicate type: {kind!r}")
+
+def _gray(batch):
+    return batch.astype(np.float32) @ np.array([0.114, 0.587, 0.299], dtype=np.float32)
+
+def _load_reference(image_path):
+    if not image_path:
+        raise ValueError("This load detection mode needs a loading screen image")
+    image = cv2.imread(image_path)
+    if image is None:
+        raise ValueError(f"Could not read loading screen image: {image_path}")
+    return cv2.resize(image, ANALYSIS_SIZE, interpolation=cv2.INTER_AREA)
+
+def scan_loads(video_path, start_frame, end_frame, predicate, crop=None, batch_size=64, min_frames=2):
+    """Classify every frame in [start_frame, end_frame) (or keyframe samples, see make_predicate) and return the loading ranges.
+
+    Result is {'frames', 'load_frames', 'loads'} where loads lists [start, end) absolute frame ranges
+    of at least min_frames, so single black transition frames are not counted as loads.
+    """
+    check = make_predicate(predicate)
+    if predicate.get('scan') == 'keyframes':
+        return _scan_loads_coarse(video_path, start_frame, end_frame, check, crop, min_frames)
+
+    cap, backend = capture_pool.acquire(video_path, DEFAULT_BACKENDS[:2])
+    if cap is None:
+        raise ValueError(f"Could not open video for load detection: {video_path}")
+
+    width, height = ANALYSIS_SIZE
+    batch = np.empty((batch_size, height, width, 3), dtype=np.uint8)
+    flags = []
+    try:
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        remaining = end_frame - start_frame
+        while remaining > 0:
+            wanted = min(batch_size, remaining)
+            count = 0
+            while count < wanted:
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                if crop:
+                    x, y, w, h = crop
+                    frame = frame[y:y + h, x:x + w]
+                cv2.resize(frame, ANALYSIS_SIZE, dst=batch[count], interpolation=cv2.INTER_AREA)
+                count += 1
+            if count == 0:
+                break
+            flags.append(np.asarray(check(batch[:count]), dtype=bool))
+            remaining -= count
+            if count < wanted:
+                break
+    finally:
+        capture_pool.release(video_path, backend, cap)
+
+    flags = np.concatenate(flags) if flags else np.zeros(0, dtype=bool)
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+    loads = [[start_frame + int(s), start_frame + int(e)] for s, e in zip(starts, ends) if e - s >= min_frames]
+
+    return {
+        'frames': int(flags.size),
+        'load_frames': sum(end - start for start, end in loads),
+        'loads': loads
+    }
+
+def _scan_loads_coarse(video_path, start_frame, end_frame, check, crop, min_frames):
+    """Loading ranges from keyframe samples and bisection; loads shorter than the sample spacing can be missed"""
+    def is_loading(frame):
+        if crop:
+            x, y, w, h = crop
+            frame = frame[y:y + h, x:x + w]
+        return bool(check(cv2.resize(frame, ANALYSIS_SIZE, interpolation=cv2.INTER_AREA)[None])[0])
+
+    with FrameScanner.open(video_path) as scanner:
+        end_frame = min(end_frame, scanner.player.total_frames)
+        loads = [load for load in scanner.find_ranges(is_loading, start_frame, end_frame)
+                 if load[1] - load[0] >= min_frames]
+
+    return {
+        'frames': max(0, end_frame - start_frame),
+        'load_frames': sum(end - start for start, end in loads),
+        'loads': loads
+    }
+
+def scan_videos(searches, predicate, max_workers=None):
+    """Run scan_loads for {video_id: {'video_path', 'start_frame', 'end_frame', 'crop'}} across processes"""
+    return scan_ranges(scan_loads, searches, predicate, max_workers, extra_files=[predicate.get('image_path')])
@@ -0,0 +1,44 @@
+import collections
+import threading
+import time
+
+LOG_LEVELS = {
+    "debug": 10,
+    "info": 20,
+    "success": 25,
+    "warning": 30,
+    "error": 40
+}
+
+class LogSink:
+    """Thread-safe ring buffer for log lines that a consumer drains in batches"""
+
+    def __init__(self, capacity=2000, level="info"):
+        self._entries = collections.deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._min_level = LOG_LEVELS[level]
+        self.dropped = 0
+
+    def set_level(self, level):
+        self._min_level = LOG_LEVELS.get(level, LOG_LEVELS["info"])
+
+    def is_enabled(self, level):
+        return LOG_LEVELS.get(level, LOG_LEVELS["info"]) >= self._min_level
+
+    def emit(self, message, level="info"):
+        if LOG_LEVELS.get(level, LOG_LEVELS["info"]) < self._min_level:
+            return
+
+        with self._lock:
+            if len(self._entries) == self._entries.maxlen:
+                self.dropped += 1
+            self._entries.append((time.time(), level, message))
+
+    def drain(self):
+        """Return and clear buffered (timestamp, level, message) entries and the count dropped since last drain"""
+        with self._lock:
+            entries = list(self._entries)
+            self._entries.clear()
+            dropped = self.dropped
+            self.dropped = 0
+        return entries, dropped
@@ -0,0 +1,169 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .capture_pool import capture_pool, DEFAULT_BACKENDS
+from .frame_scan import FrameScanner
+
+ANALYSIS_SIZE = (96, 54)
+REFINE_SIZE = (256, 144)
+# Searches longer than this sample keyframes instead of decoding every frame
+KEYFRAME_SCAN_SECONDS = 600
+
+def analysis_image(frame, crop=None, size=ANALYSIS_SIZE):
+    """Downsampled grayscale view of a frame (inside its crop) used for matching"""
+    if crop:
+        x, y, w, h = crop
+        frame = frame[y:y + h, x:x + w]
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(gray, size, interpolation=cv2.INTER_AREA)
+
+def make_template(reference_frame, crop=None, margin=0.08):
+    """Coarse and refine templates: the centre of the downsampled reference, so matching absorbs small shifts and edge overlays"""
+    templates = {}
+    for name, size in (('coarse', ANALYSIS_SIZE), ('refine', REFINE_SIZE)):
+        image = analysis_image(reference_frame, crop, size)
+        height, width = image.shape
+        mx, my = int(width * margin), int(height * margin)
+        templates[name] = image[my:height - my, mx:width - mx]
+
+    if templates['coarse'].std() < 2.0:
+        raise ValueError("The reference frame is too uniform to match reliably; pick a frame with more detail")
+    return templates
+
+def match_score(template, image):
+    return float(cv2.matchTemplate(image, template, cv2.TM_CCOEFF_NORMED).max())
+
+def find_matching_frame(video_path, template, start_frame, end_frame, fps, crop=None,
+                        coarse_seconds=0.25, candidates=8, min_score=0.7, scan='auto'):
+    """Locate the frame in [start_frame, end_frame) that best matches the template, as {'frame', 'score'} or None.
+
+    scan is 'frames' (decode everything, score every coarse_seconds), 'keyframes' (score keyframe
+    samples only, see FrameScanner) or 'auto', which picks keyframes for searches longer than
+    KEYFRAME_SCAN_SECONDS.
+    """
+    if scan == 'auto':
+        scan = 'keyframes' if end_frame - start_frame > fps * KEYFRAME_SCAN_SECONDS else 'frames'
+    if scan == 'keyframes':
+        best = _find_with_scanner(video_path, template, start_frame, end_frame, crop, candidates)
+        return best if best is not None and best['score'] >= min_score else None
+
+    # Coarse pass: decode sequentially but only convert and score every step-th frame.
+    # Refine pass: score every frame around the best few coarse peaks
+    step = max(1, int(round(fps * coarse_seconds)))
+    cap, backend = capture_pool.acquire(video_path, DEFAULT_BACKENDS[:2])
+    if cap is None:
+        raise ValueError(f"Could not open video for mark detection: {video_path}")
+
+    try:
+        coarse = []
+        cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+        for frame_idx in range(start_frame, end_frame):
+            if not cap.grab():
+                break
+            if (frame_idx - start_frame) % step:
+                continue
+            ret, frame = cap.retrieve()
+            if not ret:
+                break
+            image = analysis_image(frame, crop)
+            coarse.append((match_score(template['coarse'], image), frame_idx, image))
+
+        if not coarse:
+            return None
+
+        # Refine around the best samples; overlapping windows are merged so no frame is decoded twice
+        peaks = sorted(coarse, key=lambda item: -item[0])[:candidates]
+        windows = []
+        for score, frame_idx, image in sorted(peaks, key=lambda item: item[1]):
+            window_start = max(start_frame, frame_idx - step)
+            window_end = min(end_frame, frame_idx + step + 1)
+            if windows and window_start <= windows[-1]['end']:
+                windows[-1]['end'] = window_end
+                if score > windows[-1]['anchor_score']:
+                    windows[-1].update(anchor_score=score, anchor_frame=frame_idx, anchor_image=image)
+            else:
+                windows.append({'start': window_start, 'end': window_end, 'anchor_score': score,
+                                'anchor_frame': frame_idx, 'anchor_image': image})
+
+        best = None
+        for window in windows:
+            result = _refine_window(cap, template, window, crop)
+            if result and (best is None or result['score'] > best['score']):
+                best = result
+    finally:
+        capture_pool.release(video_path, backend, cap)
+
+    if best is None or best['score'] < min_score:
+        return None
+    return best
+
+def _refine_window(cap, template, window, crop):
+    window_start, window_end = window['start'], window['end']
+
+    cap.set(cv2.CAP_PROP_POS_FRAMES, window_start)
+    images = []
+    refine_images = []
+    for _ in range(window_end - window_start):
+        ret, frame = cap.read()
+        if not ret:
+            break
+        images.append(analysis_image(frame, crop))
+        refine_images.append(analysis_image(frame, crop, REFINE_SIZE))
+    if not images:
+        return None
+
+    # Container seeks can land a few frames off; a coarse sample is an exact anchor to realign on
+    expected = window['anchor_frame'] - window_start
+    differences = np.array([np.mean(cv2.absdiff(image, window['anchor_image'])) for image in images])
+    anchors = np.flatnonzero(differences <= differences.min() + 0.01)
+    shift = expected - int(anchors[np.argmin(np.abs(anchors - expected))])
+
+    scores = [match_score(template['refine'], image) for image in refine_images]
+    best_index = int(np.argmax(scores))
+    frame_idx = min(max(window_start + best_index + shift, window_start), window_end - 1)
+    return {'frame': frame_idx, 'score': scores[best_index]}
+
+def _find_with_scanner(video_path, template, start_frame, end_frame, crop, candidates):
+    # Samples can be a couple of seconds apart, so each peak is refined over the span between its neighbours.
+    # The scanner's player seeks exactly, so unlike _refine_window there is nothing to realign
+    with FrameScanner.open(video_path) as scanner:
+        samples = scanner.coarse_scan(lambda frame: match_score(template['coarse'], analysis_image(frame, crop)),
+                                      start_frame, end_frame)
+        if not samples:
+            return None
+        end_frame = min(end_frame, samples[-1][0] + 1)
+
+        peaks = sorted(range(len(samples)), key=lambda index: -samples[index][1])[:candidates]
+        windows = []
+        for index in sorted(peaks):
+            window_start = samples[index - 1][0] if index > 0 else start_frame
+            window_end = samples[index + 1][0] + 1 if index + 1 < len(samples) else end_frame
+            if windows and window_start <= windows[-1][1]:
+                windows[-1][1] = window_end
+            else:
+                windows.append([window_start, window_end])
+
+        best = None
+        for window_start, window_end in windows:
+            for frame_idx in range(window_start, window_end):
+                score = scanner.evaluate(
+                    lambda frame: match_score(template['refine'], analysis_image(frame, crop, REFINE_SIZE)), frame_idx)
+                if best is None or score > best['score']:
+                    best = {'frame': frame_idx, 'score': score}
+    return best
+
+def find_in_videos(template, searches, max_workers=None):
+    """Run find_matching_frame for {video_id: kwargs} in parallel, returning {video_id: result or exception}"""
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(searches) or 1,
+                            thread_name_prefix="mark-detect") as executor:
+        futures = {video_id: executor.submit(find_matching_frame, template=template, **kwargs)
+                   for video_id, kwargs in searches.items()}
+        for video_id, future in futures.items():
+            try:
+                results[video_id] = future.result()
+            except Exception as e:
+                results[video_id] = e
+    return results
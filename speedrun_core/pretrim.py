@@ -0,0 +1,106 @@
+import bisect
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import threading
+
+from .frame_scan import find_keyframes
+
+class PretrimCache:
+    """Stream copies of marked ranges, cut at the enclosing keyframes and kept on disk.
+
+    Remuxing only copies packets, so a two minute range of a six hour VOD is written in about the
+    time it takes to read it, and every later decode and scan seeks in a small file instead of
+    the VOD. Only the video stream is copied; audio is muxed from the source, whose timestamps the
+    copy does not share. Files are reused across renders and pruned least recently used first.
+    """
+
+    def __init__(self, cache_dir="pretrim_cache", max_size_mb=4096):
+        self.cache_dir = cache_dir
+        self.max_size = max_size_mb * 1024 * 1024
+        self._lock = threading.Lock()
+
+    def key(self, video_path, first_frame, last_frame):
+        stat = os.stat(video_path)
+        identity = [os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns, int(first_frame),
+                    int(last_frame) if last_frame is not None else None]
+        return hashlib.sha1(json.dumps(identity).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        # Matroska takes any codec pair a recording might use without re-encoding
+        return os.path.join(self.cache_dir, f"{key}.mkv")
+
+    def trim(self, video_path, start_frame, end_frame, fps):
+        """{'path', 'first_frame'} of a copy of [start_frame, end_frame) padded to keyframes, or None without FFmpeg.
+
+        first_frame is the source frame the copy starts at, as listed by the keyframe index; callers
+        should confirm it against the decoded picture (see VideoGenerator._pretrim_videos).
+        """
+        if shutil.which('ffmpeg') is None or fps <= 0:
+            return None
+        keyframes = find_keyframes(video_path, fps)
+        if not keyframes:
+            return None
+
+        first_frame = keyframes[max(0, bisect.bisect_right(keyframes, start_frame) - 1)]
+        following = bisect.bisect_left(keyframes, end_frame)
+        last_frame = keyframes[following] if following < len(keyframes) else None
+
+        path = self._path(self.key(video_path, first_frame, last_frame))
+        if os.path.exists(path):
+            os.utime(path)
+            return {'path': path, 'first_frame': first_frame}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial.mkv"
+        # Seeking half a frame past the keyframe keeps float rounding from snapping to the one before it
+        cmd = [
+            'ffmpeg', '-nostdin', '-v', 'error', '-y',
+            '-ss', f"{(first_frame + 0.5) / fps:.6f}",
+            '-i', video_path
+        ]
+        if last_frame is not None:
+            cmd += ['-t', f"{(last_frame - first_frame + 1) / fps:.6f}"]
+        cmd += [
+            '-map', '0:v:0',
+            '-c', 'copy',
+            '-avoid_negative_ts', 'make_zero',
+            partial_path
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            if os.path.exists(partial_path):
+                os.remove(partial_path)
+            raise ValueError(f"FFmpeg could not copy the range: {result.stderr.strip()}")
+
+        os.replace(partial_path, path)
+        return {'path': path, 'first_frame': first_frame}
+
+    def prune(self, max_size=None):
+        """Delete least recently used copies until the cache fits in max_size bytes"""
+        max_size = self.max_size if max_size is None else max_size
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+                if not name.endswith('.mkv') or name.endswith('.partial.mkv'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= max_size:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    # Copies still open in a running render cannot be removed on every platform
+                    pass
+            return total
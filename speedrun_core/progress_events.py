@@ -0,0 +1,111 @@
+import json
+import queue
+import threading
+import time
+
+class ProgressPublisher:
+    """Fans structured progress events out to callbacks and queues"""
+
+    def __init__(self):
+        self._callbacks = []
+        self._queues = []
+        self._lock = threading.Lock()
+
+    @property
+    def has_subscribers(self):
+        return bool(self._callbacks or self._queues)
+
+    def subscribe(self, callback):
+        with self._lock:
+            self._callbacks.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+        if hasattr(callback, 'close'):
+            callback.close()
+
+    def add_queue(self, event_queue):
+        """Deliver events to a queue; events are dropped rather than blocking when it is full"""
+        with self._lock:
+            self._queues.append(event_queue)
+        return event_queue
+
+    def remove_queue(self, event_queue):
+        with self._lock:
+            if event_queue in self._queues:
+                self._queues.remove(event_queue)
+
+    def publish(self, event):
+        with self._lock:
+            callbacks = list(self._callbacks)
+            queues = list(self._queues)
+
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Progress listener error: {e}")
+
+        for event_queue in queues:
+            try:
+                event_queue.put_nowait(event)
+            except queue.Full:
+                pass
+
+class ProgressTracker:
+    """Derives instantaneous/smoothed fps and ETA from frame counts"""
+
+    def __init__(self, total_frames, smoothing=0.2):
+        self.total_frames = total_frames
+        self.smoothing = smoothing
+        self.start_time = time.monotonic()
+        self._last_time = self.start_time
+        self._last_frames = 0
+        self.fps_instant = 0.0
+        self.fps_smoothed = 0.0
+
+    def update(self, frames_done):
+        now = time.monotonic()
+        interval = now - self._last_time
+        if interval > 0 and frames_done > self._last_frames:
+            self.fps_instant = (frames_done - self._last_frames) / interval
+            if self.fps_smoothed:
+                self.fps_smoothed += self.smoothing * (self.fps_instant - self.fps_smoothed)
+            else:
+                self.fps_smoothed = self.fps_instant
+            self._last_time = now
+            self._last_frames = frames_done
+
+        remaining = max(0, self.total_frames - frames_done)
+        eta = remaining / self.fps_smoothed if self.fps_smoothed > 0 else None
+        return {
+            'elapsed': now - self.start_time,
+            'fps_instant': self.fps_instant,
+            'fps_smoothed': self.fps_smoothed,
+            'eta_seconds': eta
+        }
+
+class JsonLinesWriter:
+    """Progress listener that appends each event as one JSON line"""
+
+    def __init__(self, path_or_file):
+        if hasattr(path_or_file, 'write'):
+            self._file = path_or_file
+            self._owns_file = False
+        else:
+            self._file = open(path_or_file, 'a', encoding='utf-8')
+            self._owns_file = True
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        if self._owns_file:
+            self._file.close()
@@ -0,0 +1,61 @@
+import json
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+_results = {}
+_lock = threading.Lock()
+
+def scan_key(scan_function, search, options, extra_files=()):
+    """Memo key for one scan: the function, the file's identity, the range, crop and options"""
+    stat = os.stat(search['video_path'])
+    extra_mtimes = [os.stat(path).st_mtime_ns for path in extra_files if path]
+    return json.dumps([scan_function.__module__, scan_function.__name__,
+                       os.path.abspath(search['video_path']), stat.st_size, stat.st_mtime_ns,
+                       search['start_frame'], search['end_frame'], list(search.get('crop') or []),
+                       options, extra_mtimes], sort_keys=True)
+
+def scan_ranges(scan_function, searches, options, max_workers=None, extra_files=()):
+    """Call scan_function(video_path, start_frame, end_frame, options, crop) for every search in parallel.
+
+    searches maps video ids to {'video_path', 'start_frame', 'end_frame', 'crop'}. Returns
+    {video_id: result or exception}. Results are remembered per function, file, range and options,
+    so comparing and then rendering the same marks only scans once. extra_files (e.g. a reference
+    image the options point at) are part of the key through their modification times.
+    """
+    results = {}
+    pending = {}
+    for video_id, search in searches.items():
+        try:
+            key = scan_key(scan_function, search, options, extra_files)
+        except OSError as e:
+            results[video_id] = e
+            continue
+        with _lock:
+            if key in _results:
+                results[video_id] = _results[key]
+                continue
+        pending[video_id] = (key, search)
+
+    if pending:
+        # Daemonic processes (render queue workers) may not start children of their own
+        executor_class = ThreadPoolExecutor if multiprocessing.current_process().daemon else ProcessPoolExecutor
+        with executor_class(max_workers=max_workers or min(len(pending), os.cpu_count() or 1)) as executor:
+            futures = {video_id: executor.submit(scan_function, search['video_path'], search['start_frame'],
+                                                 search['end_frame'], options, search.get('crop'))
+                       for video_id, (key, search) in pending.items()}
+            for video_id, future in futures.items():
+                try:
+                    results[video_id] = future.result()
+                except Exception as e:
+                    results[video_id] = e
+                    continue
+                with _lock:
+                    _results[pending[video_id][0]] = results[video_id]
+
+    return results
+
+def clear_scan_results():
+    with _lock:
+        _results.clear()
@@ -0,0 +1,434 @@
+import json
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+JOB_STATES = ('queued', 'running', 'done', 'failed', 'cancelled')
+
+DEFAULT_JOB_SETTINGS = {
+    'fps': 60,
+    'scale': 0.5,
+    'codec': 'auto',
+    'layout': 'auto'
+}
+
+def load_job_specs(path):
+    """Read one job spec or a list of them from a JSON file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        specs = json.load(f)
+    return specs if isinstance(specs, list) else [specs]
+
+def validate_job_spec(spec):
+    if not spec.get('output'):
+        raise ValueError("Job spec needs an 'output' path")
+
+    videos = spec.get('videos') or []
+    if len(videos) < 2:
+        raise ValueError("Job spec needs at least 2 videos")
+
+    for video in videos:
+        if not video.get('path'):
+            raise ValueError("Every video in a job spec needs a 'path'")
+        if int(video.get('start_frame', 0)) >= int(video.get('end_frame', 0)):
+            raise ValueError(f"Invalid frame range for {video['path']}")
+
+def estimate_job_memory(spec):
+    """Rough peak bytes for one render: reader queues, composer caches, output buffers and decoders.
+
+    Each video's frame size comes from its crop or its 'size' ([width, height]); files are only
+    opened for videos that have neither.
+    """
+    import cv2
+
+    scale = float(spec.get('settings', {}).get('scale', DEFAULT_JOB_SETTINGS['scale']))
+    canvas_bytes = 0
+    total = 150 * 1024 * 1024
+    for video in spec['videos']:
+        crop = video.get('crop')
+        if crop:
+            width, height = crop[2], crop[3]
+        elif video.get('size'):
+            width, height = video['size']
+        else:
+            cap = cv2.VideoCapture(video['path'])
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)) or 1920
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)) or 1080
+            cap.release()
+
+        tile_bytes = int(width * scale) * int(height * scale) * 3
+        canvas_bytes += tile_bytes
+        # 100 queued + up to 500 cached frames per reader, plus a few full-size frames in the decoder
+        total += 600 * tile_bytes + 4 * width * height * 3
+
+    return total + 52 * int(canvas_bytes * 1.3)
+
+def _physical_memory():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        pass
+
+    try:
+        import ctypes
+
+        class MEMORYSTATUSEX(ctypes.Structure):
+            _fields_ = [('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                        ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                        ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                        ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                        ('ullAvailExtendedVirtual', ctypes.c_ulonglong)]
+
+        status = MEMORYSTATUSEX()
+        status.dwLength = ctypes.sizeof(MEMORYSTATUSEX)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullTotalPhys
+    except Exception:
+        pass
+    return None
+
+def run_render_job(spec, events=None, cancel_event=None):
+    """Worker entry point: load the job's videos and render it; returns 'done' or 'cancelled'"""
+    from .video_player import VideoPlayer, VideoLoadError
+    from .video_generator import VideoGenerator
+
+    settings = dict(DEFAULT_JOB_SETTINGS)
+    settings.update(spec.get('settings') or {})
+    settings['job_id'] = spec.get('id', spec['output'])
+    if spec.get('cores'):
+        settings['render_cores'] = spec['cores']
+
+    loaded_videos = {}
+    try:
+        for video_id, video in enumerate(spec['videos'], 1):
+            player = VideoPlayer()
+            loaded_videos[video_id] = {
+                'player': player,
+                'start_frame': int(video['start_frame']),
+                'end_frame': int(video['end_frame']),
+                'custom_name': video.get('name') or os.path.splitext(os.path.basename(video['path']))[0],
+                'audio_enabled': bool(video.get('audio', False)),
+                'crop': tuple(video['crop']) if video.get('crop') else None
+            }
+            if not player.load_video(video['path']):
+                raise VideoLoadError(player.load_error or f"Could not load {video['path']}")
+
+        generator = VideoGenerator()
+        if events is not None:
+            generator.add_progress_listener(events.put)
+
+        finished = threading.Event()
+        if cancel_event is not None:
+            def watch_cancel():
+                while not finished.is_set():
+                    try:
+                        cancelled = cancel_event.wait(0.5)
+                    except (EOFError, OSError):
+                        # The queue's manager has gone away with the queue that started this job
+                        cancelled = True
+                    if cancelled:
+                        generator.set_cancel_flag(True)
+                        return
+
+            threading.Thread(target=watch_cancel, daemon=True).start()
+
+        try:
+            generator.generate_comparison_video(spec['output'], loaded_videos, settings)
+        finally:
+            finished.set()
+
+        return 'cancelled' if generator._cancel_generation else 'done'
+    finally:
+        for video_data in loaded_videos.values():
+            video_data['player'].close()
+
+class RenderQueue:
+    """Persistent queue of render jobs executed concurrently in a process pool"""
+
+    def __init__(self, state_file="render_queue.json", max_workers=None, memory_limit_mb=None, log_callback=None):
+        self.state_file = state_file
+        self._log_operation = log_callback or (lambda message, level="info": None)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        if memory_limit_mb:
+            self.memory_limit = int(memory_limit_mb * 1024 * 1024)
+        else:
+            physical = _physical_memory()
+            self.memory_limit = physical // 2 if physical else 4096 * 1024 * 1024
+
+        self.jobs = []
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._executor = None
+        self._manager = None
+        self._events = None
+        self._running = {}
+        self._closed = False
+        self._load_state()
+
+    def subscribe(self, callback):
+        """callback(job) is called from a background thread whenever a job's status or progress changes"""
+        self._listeners.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def add_job(self, spec):
+        validate_job_spec(spec)
+        job = {
+            'id': uuid.uuid4().hex[:8],
+            'spec': spec,
+            'status': 'queued',
+            'progress': 0.0,
+            'eta_seconds': None,
+            'error': None,
+            'memory_estimate': self._estimate_memory(spec),
+            'added_at': time.time(),
+            'started_at': None,
+            'finished_at': None
+        }
+        with self._lock:
+            self.jobs.append(job)
+            self._save_state()
+        self._notify(job)
+        self._schedule()
+        return job
+
+    def add_job_file(self, path):
+        return [self.add_job(spec) for spec in load_job_specs(path)]
+
+    def get_job(self, job_id):
+        with self._lock:
+            return next((job for job in self.jobs if job['id'] == job_id), None)
+
+    def cancel(self, job_id):
+        with self._lock:
+            job = self.get_job(job_id)
+            if job is None or job['status'] not in ('queued', 'running'):
+                return False
+            if job['status'] == 'running':
+                self._running[job_id][1].set()
+                return True
+            job['status'] = 'cancelled'
+            job['finished_at'] = time.time()
+            self._save_state()
+        self._notify(job)
+        return True
+
+    def retry(self, job_id):
+        with self._lock:
+            job = self.get_job(job_id)
+            if job is None or job['status'] not in ('failed', 'cancelled'):
+                return False
+            job.update(status='queued', progress=0.0, eta_seconds=None, error=None,
+                       started_at=None, finished_at=None)
+            self._save_state()
+        self._notify(job)
+        self._schedule()
+        return True
+
+    def remove(self, job_id):
+        with self._lock:
+            job = self.get_job(job_id)
+            if job is None or job['status'] == 'running':
+                return False
+            self.jobs.remove(job)
+            self._save_state()
+        return True
+
+    def clear_finished(self):
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job['status'] not in ('done', 'cancelled')]
+            self._save_state()
+
+    def get_summary(self):
+        with self._lock:
+            counts = {state: 0 for state in JOB_STATES}
+            for job in self.jobs:
+                counts[job['status']] += 1
+            return counts
+
+    def start(self):
+        """Start the pool and begin running queued jobs"""
+        with self._lock:
+            if self._executor is None:
+                self._closed = False
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+                self._manager = multiprocessing.Manager()
+                self._events = self._manager.Queue()
+                threading.Thread(target=self._pump_events, daemon=True).start()
+        self._schedule()
+
+    def shutdown(self):
+        """Stop the pool; running jobs are cancelled and go back to queued so they resume on the next start"""
+        with self._lock:
+            if self._executor is None:
+                return
+            self._closed = True
+            for job_id, (future, cancel_event) in self._running.items():
+                cancel_event.set()
+                job = self.get_job(job_id)
+                job.update(status='queued', progress=0.0, eta_seconds=None, started_at=None)
+            self._running.clear()
+            self._save_state()
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._manager.shutdown()
+            self._manager = None
+            self._events = None
+
+    def _estimate_memory(self, spec):
+        try:
+            return estimate_job_memory(spec)
+        except Exception as e:
+            self._log_operation(f"Could not estimate memory for {spec.get('output')}: {e}", "warning")
+            return 0
+
+    def _schedule(self):
+        # Jobs restored from an older state file may lack an estimate; opening their videos must not
+        # happen under the lock, which listeners on the UI thread also take
+        with self._lock:
+            unestimated = [job for job in self.jobs if job['status'] == 'queued' and job['memory_estimate'] is None]
+        for job in unestimated:
+            estimate = self._estimate_memory(job['spec'])
+            with self._lock:
+                job['memory_estimate'] = estimate
+
+        with self._lock:
+            if self._executor is None or self._closed:
+                return
+
+            running_memory = sum(self.get_job(job_id)['memory_estimate'] or 0 for job_id in self._running)
+            starting = []
+            for job in self.jobs:
+                if len(self._running) + len(starting) >= self.max_workers:
+                    break
+                if job['status'] != 'queued':
+                    continue
+
+                if job['memory_estimate'] is None:
+                    # Queued by another thread since the estimates above; it is picked up on the next pass
+                    break
+                # Jobs start in order; one that would overrun the budget waits for memory to free up,
+                # unless nothing else is running
+                if (self._running or starting) and running_memory + job['memory_estimate'] > self.memory_limit:
+                    break
+                starting.append(job)
+                running_memory += job['memory_estimate']
+
+            # Each job plans its threads for its share of the cores rather than the whole machine;
+            # jobs already running keep the share they started with
+            cores = max(1, (os.cpu_count() or 1) // max(1, len(self._running) + len(starting)))
+            for job in starting:
+                spec = dict(job['spec'], id=job['id'], cores=cores)
+                cancel_event = self._manager.Event()
+                future = self._executor.submit(run_render_job, spec, self._events, cancel_event)
+                self._running[job['id']] = (future, cancel_event)
+                job['status'] = 'running'
+                job['started_at'] = time.time()
+                future.add_done_callback(lambda future, job_id=job['id']: self._on_job_done(job_id, future))
+                self._notify(job)
+
+            self._save_state()
+
+    def _on_job_done(self, job_id, future):
+        with self._lock:
+            if self._closed or job_id not in self._running:
+                return
+            del self._running[job_id]
+
+            job = self.get_job(job_id)
+            try:
+                job['status'] = future.result()
+                if job['status'] == 'done':
+                    job['progress'] = 1.0
+            except Exception as e:
+                job['status'] = 'failed'
+                job['error'] = str(e)
+            job['eta_seconds'] = None
+            job['finished_at'] = time.time()
+            self._save_state()
+
+        self._notify(job)
+        self._schedule()
+
+    def _pump_events(self):
+        events = self._events
+        while not self._closed:
+            try:
+                event = events.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+
+            # _on_job_done and _schedule change and save the same jobs from other threads
+            with self._lock:
+                job = self.get_job(event.get('job'))
+                if job is None or job['status'] != 'running':
+                    continue
+                if 'progress' in event:
+                    job['progress'] = event['progress']
+                job['eta_seconds'] = event.get('eta_seconds')
+            self._notify(job)
+
+    def _notify(self, job):
+        for callback in list(self._listeners):
+            try:
+                callback(job)
+            except Exception as e:
+                self._log_operation(f"Render queue listener error: {e}", "error")
+
+    def _load_state(self):
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                self.jobs = json.load(f).get('jobs', [])
+        except (OSError, ValueError):
+            self.jobs = []
+
+        # Jobs that were running when the app closed start over
+        for job in self.jobs:
+            if job['status'] == 'running':
+                job.update(status='queued', progress=0.0, eta_seconds=None, started_at=None)
+
+    def _save_state(self):
+        temp_path = f"{self.state_file}.tmp"
+        try:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'jobs': self.jobs}, f, indent=2)
+            os.replace(temp_path, self.state_file)
+        except OSError as e:
+            self._log_operation(f"Could not save render queue: {e}", "error")
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Queue comparison renders from JSON job files and run them")
+    parser.add_argument('job_files', nargs='*', help="JSON files holding one job spec or a list of them")
+    parser.add_argument('--state', default="render_queue.json", help="Queue state file")
+    parser.add_argument('--workers', type=int, default=None, help="Maximum concurrent renders")
+    parser.add_argument('--memory-mb', type=int, default=None, help="Memory budget shared by running renders")
+    args = parser.parse_args()
+
+    render_queue = RenderQueue(args.state, args.workers, args.memory_mb,
+                               log_callback=lambda message, level="info": print(f"[{level}] {message}"))
+    for path in args.job_files:
+        render_queue.add_job_file(path)
+
+    render_queue.subscribe(lambda job: print(f"{job['id']} {job['status']:<9} {job['progress'] * 100:5.1f}% "
+                                             f"{job['spec']['output']}{' - ' + job['error'] if job['error'] else ''}"))
+    render_queue.start()
+    try:
+        while True:
+            summary = render_queue.get_summary()
+            if not summary['queued'] and not summary['running']:
+                break
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        render_queue.shutdown()
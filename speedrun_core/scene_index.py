@@ -0,0 +1,191 @@
+import bisect
+import hashlib
+import json
+import os
+import threading
+
+import cv2
+import numpy as np
+
+from .capture_pool import capture_pool, DEFAULT_BACKENDS
+
+ANALYSIS_SIZE = (64, 36)
+
+class SceneIndex:
+    """Frames where a video's picture changes significantly, built in the background and kept on disk.
+
+    Each frame is compared with the one `gap` frames earlier so fades and wipes register as well
+    as hard cuts. A run of scores above `threshold` (mean gray difference), and above `baseline_ratio`
+    times the median score of the preceding second so busy gameplay does not fire constantly,
+    is one event at least `min_gap_seconds` apart from the next. The event is placed on the frame
+    with the largest single-frame change around the run's peak.
+    """
+
+    def __init__(self, video_path, cache_dir="scene_index", threshold=12.0, baseline_ratio=2.0, gap=3,
+                 min_gap_seconds=0.5):
+        self.video_path = video_path
+        self.cache_dir = cache_dir
+        self.threshold = threshold
+        self.baseline_ratio = baseline_ratio
+        self.gap = gap
+        self.min_gap_seconds = min_gap_seconds
+
+        self.events = []
+        self.scores = []
+        self.scanned_frames = 0
+        self.total_frames = 0
+        self.complete = False
+        self.error = None
+
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def progress(self):
+        if self.complete:
+            return 1.0
+        return self.scanned_frames / self.total_frames if self.total_frames else 0.0
+
+    @property
+    def building(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _path(self):
+        stat = os.stat(self.video_path)
+        identity = [os.path.abspath(self.video_path), stat.st_size, stat.st_mtime_ns,
+                    list(ANALYSIS_SIZE), self.threshold, self.baseline_ratio, self.gap, self.min_gap_seconds]
+        key = hashlib.sha1(json.dumps(identity).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self):
+        """Load a complete index saved by an earlier build; returns whether one was found"""
+        try:
+            with np.load(self._path()) as data:
+                events, scores, total_frames = data['events'], data['scores'], int(data['total_frames'])
+        except (OSError, KeyError, ValueError):
+            return False
+
+        with self._lock:
+            self.events = events.tolist()
+            self.scores = scores.astype(np.float32).tolist()
+            self.total_frames = self.scanned_frames = total_frames
+            self.complete = True
+        return True
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path()
+        partial_path = f"{path}.{os.getpid()}.partial.npz"
+        with self._lock:
+            np.savez_compressed(partial_path, events=np.asarray(self.events, dtype=np.int32),
+                                scores=np.asarray(self.scores, dtype=np.float16),
+                                total_frames=np.int64(self.total_frames))
+        os.replace(partial_path, path)
+
+    def start(self, on_progress=None):
+        """Build the index on a daemon thread unless it is complete or already building"""
+        if self.complete or self.building:
+            return
+        self._cancel.clear()
+        self._thread = threading.Thread(target=self.build, args=(on_progress,), daemon=True,
+                                        name="scene-index")
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def build(self, on_progress=None):
+        """Scan the whole video; events become visible to next_event/previous_event as they are found"""
+        cap, backend = capture_pool.acquire(self.video_path, DEFAULT_BACKENDS[:2])
+        if cap is None:
+            self.error = f"Could not open video for scene indexing: {self.video_path}"
+            return
+
+        try:
+            self.total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+            fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+            min_gap = max(1, int(fps * self.min_gap_seconds))
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+
+            history = []
+            single_diffs = []
+            baseline = []
+            peak = None
+
+            frame_idx = 0
+            while not self._cancel.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                image = cv2.resize(gray, ANALYSIS_SIZE, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+                single_diffs.append(float(np.abs(image - history[-1]).mean()) if history else 0.0)
+                scored = len(history) == self.gap
+                score = float(np.abs(image - history[0]).mean()) if scored else 0.0
+                history.append(image)
+                if len(history) > self.gap:
+                    history.pop(0)
+                if len(single_diffs) > self.gap:
+                    single_diffs.pop(0)
+
+                if not scored:
+                    frame_idx += 1
+                    continue
+
+                threshold = max(self.threshold, self.baseline_ratio * float(np.median(baseline))) \
+                    if len(baseline) >= self.gap else float('inf')
+                if score >= threshold:
+                    if peak is None or score > peak[1]:
+                        # The change happened on the frame with the biggest jump from its predecessor
+                        offset = int(np.argmax(single_diffs))
+                        peak = (frame_idx - (len(single_diffs) - 1 - offset), score)
+                baseline.append(score)
+                if len(baseline) > fps:
+                    baseline.pop(0)
+                # A fade keeps the score high for many frames; it is one event, closed once the picture settles
+                if peak is not None and score < threshold and frame_idx - peak[0] >= min_gap:
+                    self._add_event(*peak)
+                    peak = None
+
+                frame_idx += 1
+                self.scanned_frames = frame_idx
+                if on_progress and frame_idx % 300 == 0:
+                    on_progress(self)
+
+            if peak is not None:
+                self._add_event(*peak)
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            capture_pool.release(self.video_path, backend, cap)
+
+        if self._cancel.is_set() or self.error:
+            return
+
+        self.total_frames = max(self.total_frames, self.scanned_frames)
+        self.complete = True
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save scene index: {e}")
+        if on_progress:
+            on_progress(self)
+
+    def _add_event(self, frame_idx, score):
+        with self._lock:
+            if self.events and frame_idx <= self.events[-1]:
+                return
+            self.events.append(frame_idx)
+            self.scores.append(score)
+
+    def next_event(self, frame_idx):
+        with self._lock:
+            position = bisect.bisect_right(self.events, frame_idx)
+            return self.events[position] if position < len(self.events) else None
+
+    def previous_event(self, frame_idx):
+        with self._lock:
+            position = bisect.bisect_left(self.events, frame_idx)
+            return self.events[position - 1] if position > 0 else None
@@ -0,0 +1,234 @@
+import hashlib
+import json
+import os
+import threading
+import zipfile
+
+import numpy as np
+
+# Largest share of the cache one segment may take, so caching a long range never evicts everything
+MAX_SEGMENT_SHARE = 0.5
+
+# Frames are compressed in chunks of about this many raw bytes
+CHUNK_BYTES = 16 * 1024 * 1024
+
+class SegmentCache:
+    """Disk cache of decoded, cropped and resized frame ranges.
+
+    A segment is an .npz archive of losslessly compressed chunks of frames. Each chunk stores its
+    first frame and then the difference to the previous frame, so static scenes and repeated
+    frames take next to nothing and minutes of gameplay fit where raw frames would take gigabytes.
+    """
+
+    def __init__(self, cache_dir="segment_cache", max_size_mb=4096):
+        self.cache_dir = cache_dir
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, video_path, start_frame, frame_count, width, height, crop=None, skip_ranges=None,
+            duplicate_options=None):
+        """Cache key for a range; the file's size and mtime are part of it so edited files miss.
+
+        duplicate_options are the thresholds of a duplicate-frame index the frames were read with:
+        repeats then hold the previous frame, so such a segment is not the exact decode.
+        """
+        stat = os.stat(video_path)
+        identity = [os.path.abspath(video_path), stat.st_size, stat.st_mtime_ns,
+                    int(start_frame), int(frame_count), int(width), int(height), list(crop) if crop else None]
+        if skip_ranges:
+            identity.append([[int(start), int(end)] for start, end in skip_ranges])
+        if duplicate_options is not None:
+            identity.append({'duplicates': duplicate_options})
+        return hashlib.sha1(json.dumps(identity).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def open(self, key):
+        """A SegmentReader for a complete segment, or None on a miss"""
+        path = self._path(key)
+        try:
+            frames = SegmentReader(path)
+            os.utime(path)
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self.hits += 1
+        return frames
+
+    def contains(self, key):
+        """Whether a complete segment is cached, without counting a hit or miss"""
+        return os.path.exists(self._path(key))
+
+    def segment_size(self, frame_count, width, height):
+        """Uncompressed size of a segment, for comparison with what it took on disk"""
+        return int(frame_count) * int(width) * int(height) * 3
+
+    def writer(self, key, frame_count, width, height):
+        """A SegmentWriter for the range; it gives up once the compressed segment passes MAX_SEGMENT_SHARE of the cache.
+
+        Older segments are pruned as each segment is published, so the cache never grows past
+        max_size by more than the segments still being written.
+        """
+        os.makedirs(self.cache_dir, exist_ok=True)
+        return SegmentWriter(self, self._path(key), (int(frame_count), int(height), int(width), 3),
+                             int(self.max_size * MAX_SEGMENT_SHARE))
+
+    def prune(self, max_size=None):
+        """Delete least recently used segments until the cache fits in max_size bytes"""
+        max_size = self.max_size if max_size is None else max_size
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.cache_dir) if os.path.isdir(self.cache_dir) else []:
+                if not name.endswith('.npz'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= max_size:
+                    break
+                try:
+                    os.remove(path)
+                    total -= size
+                except OSError:
+                    # Segments still mapped by a running render cannot be removed on every platform
+                    pass
+            return total
+
+    def clear(self):
+        self.prune(max_size=0)
+
+    def get_stats(self):
+        files = [name for name in os.listdir(self.cache_dir) if name.endswith('.npz')] \
+            if os.path.isdir(self.cache_dir) else []
+        size = sum(os.path.getsize(os.path.join(self.cache_dir, name)) for name in files)
+        return {
+            'segments': len(files),
+            'size_mb': size / (1024 * 1024),
+            'max_size_mb': self.max_size / (1024 * 1024),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+def _chunk_frames(shape):
+    return max(1, CHUNK_BYTES // int(np.prod(shape[1:])))
+
+class SegmentReader:
+    """Frames of a cached segment, decompressed a chunk at a time.
+
+    Reading in order decompresses each chunk once; a frame identical to the one before it comes
+    back as the same array, as it does from the readers.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._archive = np.load(path)
+        frame_count, height, width, chunk_frames = (int(v) for v in self._archive['shape'])
+        self.shape = (frame_count, height, width, 3)
+        self.chunk_frames = chunk_frames
+        self._chunk_index = None
+        self._chunk = []
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.shape[0]:
+            raise IndexError(index)
+        chunk_index = index // self.chunk_frames
+        if chunk_index != self._chunk_index:
+            previous = self._chunk[-1] if self._chunk and self._chunk_index == chunk_index - 1 else None
+            self._chunk = self._decode_chunk(self._archive[f'chunk_{chunk_index:05d}'], previous)
+            self._chunk_index = chunk_index
+        return self._chunk[index % self.chunk_frames]
+
+    @staticmethod
+    def _decode_chunk(deltas, previous):
+        frames = np.cumsum(deltas, axis=0, dtype=np.uint8)
+        repeated = ~deltas[1:].reshape(len(deltas) - 1, -1).any(axis=1)
+        chunk = [previous if previous is not None and np.array_equal(previous, frames[0]) else frames[0]]
+        for frame, repeat in zip(frames[1:], repeated):
+            chunk.append(chunk[-1] if repeat else frame)
+        return chunk
+
+    def close(self):
+        self._chunk = []
+        self._archive.close()
+
+class SegmentWriter:
+    """Fills a segment frame by frame, in order; it only becomes visible to readers once every frame is written"""
+
+    def __init__(self, cache, path, shape, max_bytes):
+        self._cache = cache
+        self.path = path
+        self.shape = shape
+        self.max_bytes = max_bytes
+        self.chunk_frames = _chunk_frames(shape)
+        self.frames_written = 0
+        self.bytes_written = 0
+        self.too_large = False
+        self._partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+        self._archive = zipfile.ZipFile(self._partial_path, 'w', zipfile.ZIP_DEFLATED, compresslevel=1)
+        self._chunk = np.empty((min(self.chunk_frames, shape[0]),) + shape[1:], dtype=np.uint8)
+        self._chunk_index = 0
+
+    def write(self, index, frame):
+        if self._archive is None:
+            return
+        self._chunk[index % self.chunk_frames] = frame
+        self.frames_written = max(self.frames_written, index + 1)
+        if self.frames_written % self.chunk_frames == 0 or self.frames_written == self.shape[0]:
+            self._flush_chunk((self.frames_written - 1) % self.chunk_frames + 1)
+
+    def _flush_chunk(self, frame_count):
+        chunk = self._chunk[:frame_count]
+        deltas = chunk.copy()
+        np.subtract(chunk[1:], chunk[:-1], out=deltas[1:])
+        self._write_member(f'chunk_{self._chunk_index:05d}', deltas)
+        self._chunk_index += 1
+
+        self.bytes_written = os.path.getsize(self._partial_path)
+        if self.bytes_written > self.max_bytes:
+            self.too_large = True
+            self.discard()
+
+    def _write_member(self, name, array):
+        with self._archive.open(f'{name}.npy', 'w', force_zip64=True) as member:
+            np.lib.format.write_array(member, array)
+
+    def commit(self):
+        """Publish the segment if it is complete, otherwise throw it away; returns whether it was kept"""
+        if self._archive is None:
+            return False
+        if self.frames_written != self.shape[0]:
+            self.discard()
+            return False
+
+        self._write_member('shape', np.array(self.shape[:3] + (self.chunk_frames,), dtype=np.int64))
+        self._archive.close()
+        self._archive = None
+        self._chunk = None
+        os.replace(self._partial_path, self.path)
+        self._cache.prune()
+        return True
+
+    def discard(self):
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+        self._chunk = None
+        try:
+            os.remove(self._partial_path)
+        except OSError:
+            pass
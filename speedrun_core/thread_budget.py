@@ -0,0 +1,65 @@
+import os
+import time
+
+THREAD_MODES = ('auto', 'tune', 'off')
+
+def plan_thread_budget(num_inputs, cores=None, encoder_share=0.25):
+    """Split the cores between per-input FFmpeg decoders, OpenCV's shared pool and the encoder"""
+    cores = cores or os.cpu_count() or 1
+    num_inputs = max(1, num_inputs)
+
+    encoder_threads = max(1, int(cores * encoder_share))
+    remaining = max(1, cores - encoder_threads)
+    decoder_threads = max(1, remaining // num_inputs)
+    # Every reader already resizes on its own thread, so the pool only needs a fraction of a reader's share
+    opencv_threads = max(1, remaining // (2 * num_inputs))
+
+    return {
+        'cores': cores,
+        'decoder_threads': decoder_threads,
+        'opencv_threads': opencv_threads,
+        'encoder_threads': encoder_threads
+    }
+
+class ThreadTuner:
+    """Tries a few OpenCV pool sizes against measured output fps during a render and settles on the fastest"""
+
+    def __init__(self, initial, max_threads, window_frames=90, warmup_frames=30):
+        trials = [initial, max(1, initial // 2), min(max_threads, initial * 2)]
+        self.trials = list(dict.fromkeys(trials))
+        self.window_frames = window_frames
+        self.warmup_frames = warmup_frames
+        self.results = {}
+        self.best = initial
+        self.settled = len(self.trials) == 1
+        self._index = 0
+        self._window_start = None
+
+    @property
+    def current(self):
+        return self.best if self.settled else self.trials[self._index]
+
+    def update(self, frames_written):
+        """Feed the running output frame count; returns a new pool size to switch to, or None"""
+        if self.settled or frames_written < self.warmup_frames:
+            return None
+
+        now = time.monotonic()
+        if self._window_start is None:
+            self._window_start = (now, frames_written)
+            return None
+
+        start_time, start_frames = self._window_start
+        if frames_written - start_frames < self.window_frames:
+            return None
+
+        self.results[self.trials[self._index]] = (frames_written - start_frames) / max(now - start_time, 1e-6)
+        self._window_start = (now, frames_written)
+        self._index += 1
+
+        if self._index < len(self.trials):
+            return self.trials[self._index]
+
+        self.settled = True
+        self.best = max(self.results, key=self.results.get)
+        return self.best
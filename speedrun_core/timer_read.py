@@ -0,0 +1,183 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from .frame_scan import FrameScanner
+
+ROI_HEIGHT = 32
+GLYPH_SIZE = (12, 20)
+DEFAULT_TIMER_REGION = (0.75, 0.0, 0.25, 0.1)
+MAX_VARIANTS = 4
+
+def timer_roi(frame, region, crop=None):
+    """Grayscale timer area scaled to ROI_HEIGHT; region is (x, y, w, h) as fractions of the (cropped) frame"""
+    if crop:
+        x, y, w, h = crop
+        frame = frame[y:y + h, x:x + w]
+    height, width = frame.shape[:2]
+    rx, ry, rw, rh = region
+    x0, y0 = int(rx * width), int(ry * height)
+    x1, y1 = max(x0 + 1, int(round((rx + rw) * width))), max(y0 + 1, int(round((ry + rh) * height)))
+    roi = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_BGR2GRAY)
+    scale = ROI_HEIGHT / roi.shape[0]
+    return cv2.resize(roi, (max(1, int(round(roi.shape[1] * scale))), ROI_HEIGHT), interpolation=cv2.INTER_AREA)
+
+def segment_glyphs(roi, min_ink=3):
+    """Split a timer area into characters, left to right, as (glyph, width) pairs.
+
+    Text is taken to be whichever Otsu class covers less of the area, so light-on-dark and
+    dark-on-light timers both work. Characters are connected components, with components that
+    share most of their columns (the dots of ':', pieces of a broken stroke) joined. Glyphs keep
+    the full area height, so '.' and ':' differ from digits by position as well as shape.
+    """
+    _, mask = cv2.threshold(roi, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    text = roi.astype(np.float32)
+    if (mask > 0).mean() > 0.5:
+        mask = 255 - mask
+        text = 255.0 - text
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=4)
+    spans = []
+    for left, _, width, _, area in sorted(stats[1:count].tolist()):
+        right = left + width
+        if spans and min(right, spans[-1][1]) - left >= 0.5 * min(width, spans[-1][1] - spans[-1][0]):
+            spans[-1] = [spans[-1][0], max(right, spans[-1][1]), spans[-1][2] + area]
+        else:
+            spans.append([left, right, area])
+
+    glyphs = []
+    for start, end, area in spans:
+        if area < min_ink:
+            continue
+        glyph = cv2.resize(text[:, start:end], GLYPH_SIZE, interpolation=cv2.INTER_AREA)
+        glyph -= glyph.mean()
+        glyph /= max(float(np.linalg.norm(glyph)), 1e-6)
+        glyphs.append((glyph, (end - start) / ROI_HEIGHT))
+    return glyphs
+
+def learn_glyphs(templates, frame, text, region, crop=None):
+    """Add the characters of a frame whose timer shows `text` to templates ({symbol: [(glyph, width)]})"""
+    symbols = [character for character in text if not character.isspace()]
+    glyphs = segment_glyphs(timer_roi(frame, region, crop))
+    if len(glyphs) != len(symbols):
+        raise ValueError(f"Found {len(glyphs)} characters in the timer region but {text!r} has {len(symbols)}; "
+                         f"check the timer region covers only the timer")
+
+    for symbol, glyph in zip(symbols, glyphs):
+        variants = templates.setdefault(symbol, [])
+        variants.append(glyph)
+        del variants[:-MAX_VARIANTS]
+    return templates
+
+def save_templates(templates, path):
+    symbols = [symbol for symbol, variants in templates.items() for _ in variants]
+    glyphs = [glyph for variants in templates.values() for glyph, _ in variants]
+    widths = [width for variants in templates.values() for _, width in variants]
+    partial_path = f"{path}.{os.getpid()}.partial.npz"
+    np.savez_compressed(partial_path, symbols=np.array(symbols, dtype=str),
+                        glyphs=np.array(glyphs, dtype=np.float32).reshape(-1, GLYPH_SIZE[1], GLYPH_SIZE[0]),
+                        widths=np.array(widths, dtype=np.float32))
+    os.replace(partial_path, path)
+
+def load_templates(path):
+    """Templates saved by save_templates, or {} if there are none yet"""
+    try:
+        with np.load(path) as data:
+            symbols, glyphs, widths = data['symbols'], data['glyphs'], data['widths']
+    except (OSError, KeyError, ValueError):
+        return {}
+
+    templates = {}
+    for symbol, glyph, width in zip(symbols.tolist(), glyphs, widths.tolist()):
+        templates.setdefault(symbol, []).append((glyph, width))
+    return templates
+
+def parse_timer(text):
+    """Seconds shown by a timer string such as '1:23:45.6', '12:34.56' or '59.9'"""
+    parts = text.strip().split(':')
+    if not 1 <= len(parts) <= 3 or not all(parts):
+        raise ValueError(f"Not a timer value: {text!r}")
+    try:
+        values = [float(part) for part in parts]
+    except ValueError:
+        raise ValueError(f"Not a timer value: {text!r}") from None
+    seconds = 0.0
+    for value in values:
+        seconds = seconds * 60 + value
+    return seconds
+
+class TimerReader:
+    """Reads an on-screen timer by matching each character against learned glyph templates"""
+
+    def __init__(self, templates, region, crop=None, min_score=0.6, max_width_ratio=1.6):
+        if not templates:
+            raise ValueError("No timer digits learned yet")
+        self.region = region
+        self.crop = crop
+        self.min_score = min_score
+        self.max_width_ratio = max_width_ratio
+        self._symbols = [symbol for symbol, variants in templates.items() for _ in variants]
+        self._glyphs = np.array([glyph.ravel() for variants in templates.values() for glyph, _ in variants])
+        self._widths = np.array([width for variants in templates.values() for _, width in variants])
+
+    def read(self, frame):
+        """The timer text in a frame, or None if any character is not recognised"""
+        glyphs = segment_glyphs(timer_roi(frame, self.region, self.crop))
+        if not glyphs:
+            return None
+
+        scores = np.array([glyph.ravel() for glyph, _ in glyphs]) @ self._glyphs.T
+        widths = np.array([width for _, width in glyphs])
+        ratios = np.maximum(widths[:, None], self._widths) / np.maximum(np.minimum(widths[:, None], self._widths), 1e-6)
+        scores[ratios > self.max_width_ratio] = -1.0
+
+        best = scores.argmax(axis=1)
+        if scores[np.arange(len(glyphs)), best].min() < self.min_score:
+            return None
+        return ''.join(self._symbols[index] for index in best)
+
+    def seconds(self, frame):
+        text = self.read(frame)
+        if text is None:
+            return None
+        try:
+            return parse_timer(text)
+        except ValueError:
+            return None
+
+def find_timer_value(video_path, templates, region, target_seconds, start_frame=0, end_frame=None, crop=None,
+                     min_score=0.6):
+    """First frame in the range whose timer reads at least target_seconds, as {'frame', 'reading'} or None.
+
+    Samples keyframes and bisects (see FrameScanner), which assumes the timer does not go back
+    within the range. Frames where the timer cannot be read count as before the target.
+    """
+    reader = TimerReader(templates, region, crop, min_score)
+
+    def reached(frame):
+        seconds = reader.seconds(frame)
+        return seconds is not None and seconds >= target_seconds - 1e-6
+
+    with FrameScanner.open(video_path) as scanner:
+        frame_idx = scanner.find_first(reached, start_frame, end_frame)
+        if frame_idx is None:
+            return None
+        return {'frame': frame_idx, 'reading': reader.read(scanner.player.get_frame_fast(frame_idx))}
+
+def find_in_videos(templates, region, target_seconds, searches, max_workers=None):
+    """Run find_timer_value for {video_id: {'video_path', 'start_frame', 'end_frame', 'crop'}} in parallel"""
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers or len(searches) or 1,
+                            thread_name_prefix="timer-read") as executor:
+        futures = {video_id: executor.submit(find_timer_value, search['video_path'], templates, region,
+                                             target_seconds, search.get('start_frame', 0),
+                                             search.get('end_frame'), search.get('crop'))
+                   for video_id, search in searches.items()}
+        for video_id, future in futures.items():
+            try:
+                results[video_id] = future.result()
+            except Exception as e:
+                results[video_id] = e
+    return results
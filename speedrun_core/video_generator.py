@@ -0,0 +1,1365 @@
+import cv2
+import multiprocessing
+import numpy as np
+import threading
+import time
+import queue
+import os
+
+from .capture_pool import capture_pool, DEFAULT_BACKENDS
+from .frame_ring import FrameRing, RING_SLOTS
+from .layout_planner import plan_layout
+from .load_detect import load_predicate_from_settings, scan_videos
+from . import duplicate_detect
+from .pretrim import PretrimCache
+from .progress_events import ProgressPublisher, ProgressTracker, JsonLinesWriter
+from .segment_cache import SegmentCache
+from .thread_budget import plan_thread_budget, ThreadTuner
+from .video_player import VideoPlayer
+
+# Frames a shared reader may hold for tiles that start earlier in the file than the others in their group
+SHARED_READ_BUFFER_MB = 256
+READER_MODES = ('threads', 'processes')
+
+def _run_reader_process(read_specs, writers, segment_cache_settings=None, decoder_threads=None, opencv_threads=None):
+    """Reader process entry point: the threaded readers, putting into FrameRingWriters instead of queues"""
+    if opencv_threads:
+        cv2.setNumThreads(opencv_threads)
+    log_writer = next(iter(writers.values()))
+    generator = VideoGenerator(log_callback=log_writer.log)
+
+    def watch_cancel():
+        # The rendering process cancels every ring when it stops, so watching one is enough
+        while not log_writer.cancelled:
+            time.sleep(0.05)
+        generator.set_cancel_flag(True)
+    threading.Thread(target=watch_cancel, daemon=True).start()
+
+    segment_cache = SegmentCache(*segment_cache_settings) if segment_cache_settings else None
+    processing_state = {'cancel': False}
+    try:
+        if len(read_specs) > 1:
+            generator._read_shared_frames(read_specs, writers, processing_state, segment_cache, decoder_threads)
+        else:
+            video_id, spec = next(iter(read_specs.items()))
+            generator._read_video_frames(video_id, spec['video_path'], spec['start_frame'], spec['max_frames'],
+                                         writers[video_id], spec['target_width'], spec['target_height'],
+                                         processing_state, spec['crop'], segment_cache, decoder_threads,
+                                         spec['skip_ranges'], spec['duplicates'])
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+class VideoGenerator:
+    def __init__(self, log_callback=None, progress_callback=None):
+        self._log_operation = log_callback or (lambda message, level="info": None)
+        self._update_generation_progress = progress_callback or (lambda current, total, operation="", extra_info="": None)
+        self._cancel_generation = False
+        self._pause_generation = False
+        self.progress_events = ProgressPublisher()
+        self.progress_event_interval = 15
+        self.tuned_opencv_threads = {}
+
+    def set_cancel_flag(self, value):
+        self._cancel_generation = value
+
+    def set_pause_flag(self, value):
+        self._pause_generation = value
+
+    def add_progress_listener(self, callback):
+        """Subscribe to structured progress events (dicts); see progress_events.JsonLinesWriter"""
+        return self.progress_events.subscribe(callback)
+
+    def remove_progress_listener(self, callback):
+        self.progress_events.unsubscribe(callback)
+
+    def generate_comparison_video(self, output_path, loaded_videos, compression_settings):
+        jsonl_path = compression_settings.get('progress_jsonl')
+        jsonl_writer = self.progress_events.subscribe(JsonLinesWriter(jsonl_path)) if jsonl_path else None
+        opencv_threads = cv2.getNumThreads()
+        pretrim_cache = None
+        trimmed_players = []
+
+        try:
+            if compression_settings.get('pretrim'):
+                pretrim_cache = PretrimCache(compression_settings.get('pretrim_cache_dir', 'pretrim_cache'),
+                                             compression_settings.get('pretrim_cache_mb', 4096))
+                loaded_videos, trimmed_players = self._pretrim_videos(loaded_videos, pretrim_cache)
+            self._generate_comparison_video(output_path, loaded_videos, compression_settings)
+        except Exception as e:
+            self.progress_events.publish({'event': 'error', 'job': compression_settings.get('job_id', output_path),
+                                          'time': time.time(), 'error': str(e)})
+            raise
+        finally:
+            cv2.setNumThreads(opencv_threads)
+            if jsonl_writer:
+                self.progress_events.unsubscribe(jsonl_writer)
+            for player in trimmed_players:
+                player.close()
+            if pretrim_cache is not None:
+                pretrim_cache.prune()
+
+    def _pretrim_videos(self, loaded_videos, pretrim_cache):
+        """Swap each video for a stream copy of its marked range; videos that cannot be trimmed keep their source.
+
+        Returns the substituted loaded_videos (marks shifted into the copy) and the players to close.
+        """
+        self._log_operation("Copying marked ranges to small files...", "info")
+        trim_start = time.time()
+        trimmed_videos = {}
+        trimmed_players = []
+        for video_id, video_data in loaded_videos.items():
+            player = video_data['player']
+            video_name = video_data['custom_name']
+            trimmed_videos[video_id] = video_data
+            try:
+                trimmed = pretrim_cache.trim(player.video_path, video_data['start_frame'], video_data['end_frame'],
+                                             player.fps)
+            except (OSError, ValueError) as e:
+                self._log_operation(f"{video_name}: pre-trim failed, reading the source ({e})", "warning")
+                continue
+            if trimmed is None:
+                self._log_operation(f"{video_name}: pre-trim needs FFmpeg and ffprobe; reading the source", "warning")
+                continue
+
+            trimmed_player = self._private_player()
+            offset = None
+            if trimmed_player.load_video(trimmed['path']):
+                # Times come from the source's frame rate, not the copy's container
+                trimmed_player.fps = player.fps
+                offset = self._find_trim_offset(player.video_path, trimmed_player, video_data['start_frame'],
+                                                trimmed['first_frame'])
+            if offset is None:
+                trimmed_player.close()
+                self._log_operation(f"{video_name}: pre-trimmed copy does not line up with the source; "
+                                    f"reading the source", "warning")
+                continue
+
+            trimmed_players.append(trimmed_player)
+            # Audio is still read from the source: the copy's video need not start at t=0, so
+            # seeking its audio by frame number would drift from the picture
+            trimmed_videos[video_id] = dict(video_data, player=trimmed_player,
+                                            start_frame=video_data['start_frame'] - offset,
+                                            end_frame=video_data['end_frame'] - offset,
+                                            audio_source=video_data)
+            size_mb = os.path.getsize(trimmed['path']) / (1024 * 1024)
+            self._log_operation(f"{video_name}: reading {size_mb:.1f} MB copy starting at frame {offset}", "debug")
+
+        self._log_operation(f"Pre-trim finished in {time.time() - trim_start:.1f}s", "debug")
+        return trimmed_videos, trimmed_players
+
+    def _private_player(self):
+        """An uncached player of its own, so reads never move or share a player that is on screen"""
+        player = VideoPlayer()
+        player.warm_spare_capture = False
+        player.configure_cache(compression=None, raw_frames=8)
+        return player
+
+    def _find_trim_offset(self, source_path, trimmed_player, start_frame, first_frame, search=3):
+        """Source frame number of the copy's first frame, checked by decoding the start mark from both.
+
+        Open GOPs can drop or keep leading frames differently from what the keyframe index says,
+        so a few frames either side of first_frame are tried. None if nothing matches.
+        """
+        source_player = self._private_player()
+        try:
+            reference = source_player.get_frame_fast(start_frame) if source_player.load_video(source_path) else None
+        finally:
+            source_player.close()
+        if reference is None:
+            return None
+
+        best = None
+        for delta in sorted(range(-search, search + 1), key=abs):
+            index = start_frame - first_frame + delta
+            if index < 0:
+                continue
+            candidate = trimmed_player.get_frame_fast(index)
+            if candidate is None or candidate.shape != reference.shape:
+                continue
+            difference = float(np.mean(cv2.absdiff(candidate, reference)))
+            if best is None or difference < best[0]:
+                best = (difference, first_frame - delta)
+            if difference == 0:
+                break
+        return best[1] if best is not None and best[0] < 2.0 else None
+
+    def _generate_comparison_video(self, output_path, loaded_videos, compression_settings):
+        self._log_operation("Starting video generation process", "info")
+
+        settings = compression_settings
+
+        if len(loaded_videos) < 2:
+            raise ValueError("At least 2 videos must be loaded and marked")
+
+        audio_enabled_videos = [vid for vid, data in loaded_videos.items() 
+                              if data.get('audio_enabled', False)]
+
+        if audio_enabled_videos:
+            self._log_operation(f"Audio enabled for videos: {audio_enabled_videos}", "info")
+        else:
+            self._log_operation("No audio will be included in output", "info")
+
+        self._log_operation("Calculating video parameters...", "info")
+
+        load_ranges = self._scan_loads(loaded_videos, settings) if settings.get('skip_loads') else {}
+        if load_ranges and audio_enabled_videos:
+            self._log_operation("Audio is not load-removed and will drift from the video after the first load", "warning")
+
+        duplicate_index = self._scan_duplicates(loaded_videos) if settings.get('dedupe_frames') else {}
+
+        video_durations = {}
+        video_duration_frames = {}
+
+        for video_id, video_data in loaded_videos.items():
+            player = video_data['player']
+            start_frame = video_data['start_frame']
+            end_frame = video_data['end_frame']
+
+            if start_frame >= end_frame:
+                raise ValueError(f"Video {video_id} has invalid frame range")
+
+            duration_frames = end_frame - start_frame
+            duration_frames -= sum(end - start for start, end in load_ranges.get(video_id, []))
+            duration_time = duration_frames / player.fps
+
+            video_durations[video_id] = duration_time
+            video_duration_frames[video_id] = duration_frames
+
+            video_name = video_data['custom_name']
+            self._log_operation(f"{video_name}: {duration_frames} frames ({duration_time:.2f}s)", "debug")
+
+        max_duration_time = max(video_durations.values())
+
+        video_ids = list(loaded_videos.keys())
+        base_video_id = video_ids[0]
+        base_duration = video_durations[base_video_id]
+        base_name = loaded_videos[base_video_id]['custom_name']
+
+        for video_id in video_ids[1:]:
+            video_name = loaded_videos[video_id]['custom_name']
+            time_diff = video_durations[video_id] - base_duration
+            self._log_operation(f"{video_name} vs {base_name}: {time_diff:.3f}s difference", "debug")
+
+        max_duration = max_duration_time + 3.0  
+        output_fps = float(settings['fps'])  
+        total_output_frames = int(max_duration * output_fps)
+
+        self._log_operation(f"Output duration: {max_duration:.2f}s at {output_fps} fps", "info")
+        self._log_operation(f"Total output frames: {total_output_frames}", "info")
+        self._log_operation(f"Compression: {settings['scale']}x scale", "info")
+
+        self._log_operation("Reading test frames for dimension calculation...", "info")
+
+        video_dimensions = {}
+        for video_id, video_data in loaded_videos.items():
+            player = video_data['player']
+            start_frame = video_data['start_frame']
+            test_frame = player.get_frame_fast(start_frame)
+
+            if test_frame is None:
+                raise ValueError(f"Could not read test frame from video {video_id}")
+
+            h, w = test_frame.shape[:2]
+            crop = self._clamp_crop(video_data.get('crop'), w, h)
+            if crop:
+                w, h = crop[2], crop[3]
+            scale = settings['scale']
+            w_scaled = int(w * scale)
+            h_scaled = int(h * scale)
+
+            video_dimensions[video_id] = {
+                'original': (w, h),
+                'scaled': (w_scaled, h_scaled),
+                'crop': crop
+            }
+
+            video_name = video_data['custom_name']
+            crop_info = f" (crop {crop[0]},{crop[1]} {crop[2]}x{crop[3]})" if crop else ""
+            self._log_operation(f"{video_name} dimensions: {w}x{h}{crop_info} -> {w_scaled}x{h_scaled}", "debug")
+
+        layout = plan_layout({video_id: dims['scaled'] for video_id, dims in video_dimensions.items()},
+                             settings['scale'], mode=settings.get('layout', 'auto'),
+                             target_aspect=settings.get('layout_aspect'))
+        output_width = layout['width']
+        output_height = layout['height']
+
+        self._log_operation(f"Layout: {layout['name']} (best of {layout['candidates_evaluated']} candidates)", "info")
+        self._log_operation(f"Output dimensions: {output_width}x{output_height}", "info")
+        if layout['pixels_saved'] > 0:
+            self._log_operation(f"Layout saves {layout['pixels_saved']} pixels per frame "
+                                f"({layout['savings'] * 100:.1f}% vs uniform grid)", "success")
+
+        thread_mode = settings.get('threads', 'auto')
+        budget = None
+        tuner = None
+        if thread_mode != 'off':
+            # Render queue jobs get their share of the cores from the queue
+            budget = plan_thread_budget(len(loaded_videos), settings.get('render_cores'))
+            budget_key = (len(loaded_videos), budget['cores'])
+            opencv_threads = self.tuned_opencv_threads.get(budget_key, budget['opencv_threads'])
+            if thread_mode == 'tune':
+                tuner = ThreadTuner(opencv_threads, budget['cores'])
+            cv2.setNumThreads(opencv_threads)
+            self._log_operation(f"Thread budget on {budget['cores']} cores: {budget['decoder_threads']} decoder threads "
+                                f"per video, {opencv_threads} OpenCV threads, {budget['encoder_threads']} encoder threads", "info")
+
+            if settings.get('readers', 'threads') == 'threads':
+                # Readers borrow captures opened with their decoder thread count, a different pool key
+                # from the players' spares, so open theirs while the writer starts
+                spares = {}
+                for video_data in loaded_videos.values():
+                    player = video_data['player']
+                    if player.backend in [backend for backend, _ in DEFAULT_BACKENDS[:2]]:
+                        key = (player.video_path, player.backend)
+                        spares[key] = min(spares.get(key, 0) + 1, capture_pool.max_idle_per_key)
+                for (video_path, backend), count in spares.items():
+                    capture_pool.warm_async(video_path, backend, count, budget['decoder_threads'])
+
+        self._log_operation("Initializing video writer...", "info")
+
+        out = self._initialize_video_writer(output_path, output_fps, output_width, output_height, settings,
+                                            budget['encoder_threads'] if budget else None)
+
+        segment_cache = None
+        if settings.get('segment_cache'):
+            segment_cache = SegmentCache(settings.get('segment_cache_dir', 'segment_cache'),
+                                         settings.get('segment_cache_mb', 4096))
+
+        read_specs = {}
+        for video_id, video_data in loaded_videos.items():
+            w_scaled, h_scaled = video_dimensions[video_id]['scaled']
+            read_specs[video_id] = {
+                'video_path': video_data['player'].video_path,
+                'start_frame': video_data['start_frame'],
+                'end_frame': video_data['end_frame'],
+                'max_frames': video_duration_frames[video_id],
+                'target_width': w_scaled,
+                'target_height': h_scaled,
+                'crop': video_dimensions[video_id]['crop'],
+                'skip_ranges': load_ranges.get(video_id),
+                'duplicates': duplicate_index.get(video_id)
+            }
+        read_groups = self._plan_shared_reads(read_specs, segment_cache)
+
+        processing_state = {
+            'cancel': False,
+            'frames_composed': 0,
+            'frames_written': 0,
+            'composition_complete': False
+        }
+
+        for video_id in loaded_videos.keys():
+            processing_state[f'frames_read_{video_id}'] = 0
+            processing_state[f'reading_complete_{video_id}'] = False
+            processing_state[f'frames_composed_{video_id}'] = 0
+            processing_state[f'tiles_redrawn_{video_id}'] = 0
+
+        reader_mode = settings.get('readers', 'threads')
+        if reader_mode == 'processes' and multiprocessing.current_process().daemon:
+            # Daemonic processes may not start children of their own
+            self._log_operation("Reader processes cannot be started from a daemonic process; reading on threads",
+                                "warning")
+            reader_mode = 'threads'
+
+        # A tile that starts earlier than others sharing its reader runs ahead of them by the difference.
+        # Cached segments are only copied out of the page cache, so they are read on threads in either mode
+        frame_queues = {}
+        for group in read_groups:
+            group_start = max(read_specs[video_id]['start_frame'] for video_id in group)
+            in_process = reader_mode == 'processes' and not self._segment_cached(read_specs[group[0]], segment_cache)
+            for video_id in group:
+                lead = group_start - read_specs[video_id]['start_frame']
+                if in_process:
+                    frame_queues[video_id] = FrameRing(RING_SLOTS + lead, read_specs[video_id]['target_width'],
+                                                       read_specs[video_id]['target_height'], video_id,
+                                                       processing_state, self._log_operation)
+                else:
+                    frame_queues[video_id] = queue.Queue(maxsize=100 + lead)
+        frame_rings = [frame_queue for frame_queue in frame_queues.values() if isinstance(frame_queue, FrameRing)]
+        composition_queue = queue.Queue(maxsize=50)
+        free_canvases = queue.Queue()
+
+        reader_threads = []
+        reader_processes = []
+        decoder_threads = budget['decoder_threads'] if budget else None
+        segment_cache_settings = (segment_cache.cache_dir, segment_cache.max_size / (1024 * 1024)) \
+            if segment_cache is not None else None
+        for group in read_groups:
+            if len(group) > 1:
+                names = ", ".join(loaded_videos[video_id]['custom_name'] for video_id in group)
+                self._log_operation(f"{names} share a source file; decoding it once for all of them", "info")
+
+            if isinstance(frame_queues[group[0]], FrameRing):
+                process = multiprocessing.Process(target=_run_reader_process, args=(
+                    {video_id: read_specs[video_id] for video_id in group},
+                    {video_id: frame_queues[video_id].writer() for video_id in group},
+                    segment_cache_settings, decoder_threads, budget['opencv_threads'] if budget else None),
+                    daemon=True)
+                for video_id in group:
+                    frame_queues[video_id].process = process
+                reader_processes.append(process)
+                continue
+
+            if len(group) > 1:
+                thread = threading.Thread(target=self._read_shared_frames, args=(
+                    {video_id: read_specs[video_id] for video_id in group}, frame_queues, processing_state,
+                    segment_cache, decoder_threads))
+                reader_threads.append(thread)
+                continue
+
+            video_id = group[0]
+            spec = read_specs[video_id]
+            thread = threading.Thread(target=self._read_video_frames, args=(
+                video_id, spec['video_path'], spec['start_frame'], spec['max_frames'], 
+                frame_queues[video_id], spec['target_width'], spec['target_height'], processing_state, spec['crop'],
+                segment_cache, decoder_threads, spec['skip_ranges'], spec['duplicates']))
+            reader_threads.append(thread)
+
+        if reader_processes:
+            self._log_operation(f"Reading {len(frame_rings)} videos in {len(reader_processes)} processes "
+                                f"through shared memory", "info")
+            for process in reader_processes:
+                process.start()
+
+        composer_thread = threading.Thread(target=self._compose_frames, args=(
+            loaded_videos, video_durations, layout, settings, 
+            total_output_frames, output_fps, frame_queues, composition_queue, processing_state, free_canvases))
+
+        for thread in reader_threads + [composer_thread]:
+            thread.daemon = True
+            thread.start()
+
+        job_id = settings.get('job_id', output_path)
+        tracker = ProgressTracker(total_output_frames)
+
+        def publish_progress(event_type, **extra):
+            if not self.progress_events.has_subscribers:
+                return
+            event = {
+                'event': event_type,
+                'job': job_id,
+                'time': time.time(),
+                'frames_written': processing_state['frames_written'],
+                'frames_composed': processing_state['frames_composed'],
+                'total_frames': total_output_frames,
+                'progress': processing_state['frames_written'] / total_output_frames if total_output_frames else 1.0,
+                'videos': {
+                    str(video_id): {
+                        'frames_read': processing_state[f'frames_read_{video_id}'],
+                        'frames_composed': processing_state[f'frames_composed_{video_id}'],
+                        'tiles_redrawn': processing_state[f'tiles_redrawn_{video_id}'],
+                        'total_frames': video_duration_frames[video_id],
+                        'reading_complete': processing_state[f'reading_complete_{video_id}'],
+                        'buffered': frame_queues[video_id].qsize()
+                    } for video_id in loaded_videos.keys()
+                },
+                'composition_buffer': composition_queue.qsize(),
+                'composition_buffer_size': composition_queue.maxsize
+            }
+            event.update(tracker.update(processing_state['frames_written']))
+            event.update(extra)
+            self.progress_events.publish(event)
+
+        publish_progress('start', output_path=output_path, width=output_width, height=output_height, fps=output_fps)
+
+        self._log_operation("Starting video writer loop...", "info")
+        frame_composition_start = time.time()
+        frames_written = 0
+
+        while frames_written < total_output_frames and not self._cancel_generation:
+            while self._pause_generation and not self._cancel_generation:
+                time.sleep(0.1)
+
+            try:
+                frame_data = composition_queue.get(timeout=10.0)
+                if frame_data is None:
+                    break
+
+                frame_idx, output_frame = frame_data
+                out.write(output_frame)
+                free_canvases.put(output_frame)
+                frames_written += 1
+                processing_state['frames_written'] = frames_written
+
+                if frames_written % self.progress_event_interval == 0:
+                    publish_progress('progress')
+
+                if tuner and not tuner.settled:
+                    opencv_threads = tuner.update(frames_written)
+                    if opencv_threads is not None:
+                        cv2.setNumThreads(opencv_threads)
+                        if tuner.settled:
+                            self.tuned_opencv_threads[budget_key] = opencv_threads
+                            rates = ", ".join(f"{threads}: {fps:.1f} fps" for threads, fps in tuner.results.items())
+                            self._log_operation(f"Tuned OpenCV threads to {opencv_threads} ({rates})", "info")
+
+                if frames_written % 15 == 0:  
+                    read_stats = []
+                    for video_id in loaded_videos.keys():
+                        read_count = processing_state[f'frames_read_{video_id}']
+                        read_stats.append(f"{video_id}:{read_count}")
+                    cache_info = "R[" + ",".join(read_stats) + "]"
+
+                    self._update_generation_progress(frames_written, total_output_frames, 
+                                                   f"Writing frame {frames_written}/{total_output_frames}", 
+                                                   cache_info)
+
+                if frames_written % 300 == 0: 
+                    elapsed = time.time() - frame_composition_start
+                    write_fps = frames_written / elapsed if elapsed > 0 else 0
+                    self._log_operation(f"Written {frames_written} frames at {write_fps:.1f} fps", "debug")
+
+            except queue.Empty:
+                if processing_state['composition_complete']:
+                    self._log_operation("Composition complete but no more frames in queue", "debug")
+                    break
+                else:
+                    self._log_operation(f"Waiting for frame {frames_written}, composition at {processing_state['frames_composed']}", "debug")
+                continue
+            except Exception as e:
+                self._log_operation(f"Error writing frame: {str(e)}", "error")
+                break
+
+        processing_state['cancel'] = True
+        for frame_ring in frame_rings:
+            frame_ring.cancel()
+        self._log_operation("Waiting for threads to complete...", "info")
+
+        for thread in reader_threads + [composer_thread]:
+            thread.join(timeout=3.0)
+        for process in reader_processes:
+            process.join(timeout=3.0)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for frame_ring in frame_rings:
+            frame_ring.close()
+
+        out.release()
+
+        if segment_cache is not None:
+            cache_stats = segment_cache.get_stats()
+            self._log_operation(f"Segment cache: {cache_stats['hits']} of {len(loaded_videos)} videos read from cache, "
+                                f"{cache_stats['segments']} segments using {cache_stats['size_mb']:.0f} MB", "info")
+
+        if audio_enabled_videos and not self._cancel_generation:
+            self._add_multiple_audio_tracks(output_path, loaded_videos, audio_enabled_videos, 
+                                          video_durations, max_duration)
+
+        if not self._cancel_generation:
+            composition_time = time.time() - frame_composition_start
+            avg_fps = frames_written / composition_time if composition_time > 0 else 0
+            self._log_operation(f"Video generation completed in {composition_time:.1f}s", "success")
+            self._log_operation(f"Average processing speed: {avg_fps:.1f} fps", "success")
+            self._update_generation_progress(total_output_frames, total_output_frames, "Generation Complete!")
+            publish_progress('complete', output_path=output_path)
+        else:
+            publish_progress('cancelled')
+            self._log_operation("Generation cancelled - cleaning up...", "warning")
+            if os.path.exists(output_path):
+                os.remove(output_path)
+                self._log_operation("Cancelled file removed", "info")
+
+    def _scan_loads(self, loaded_videos, settings):
+        """Loading ranges per video for the settings' load predicate, logged; videos that fail keep their loads"""
+        predicate = load_predicate_from_settings(settings)
+        if predicate is None:
+            self._log_operation("Skip loads is on but load detection is off; keeping loads", "warning")
+            return {}
+
+        self._log_operation(f"Scanning marked ranges for loads ({predicate['type']})...", "info")
+        scan_start = time.time()
+        searches = {video_id: {
+            'video_path': video_data['player'].video_path,
+            'start_frame': video_data['start_frame'],
+            'end_frame': video_data['end_frame'],
+            'crop': video_data.get('crop')
+        } for video_id, video_data in loaded_videos.items()}
+
+        load_ranges = {}
+        for video_id, result in scan_videos(searches, predicate).items():
+            video_name = loaded_videos[video_id]['custom_name']
+            if isinstance(result, Exception):
+                self._log_operation(f"Load detection failed for {video_name}: {result}", "warning")
+                continue
+            load_ranges[video_id] = result['loads']
+            fps = loaded_videos[video_id]['player'].fps
+            self._log_operation(f"{video_name}: {len(result['loads'])} loads, "
+                                f"{result['load_frames'] / fps:.2f}s removed", "info")
+
+        self._log_operation(f"Load scan finished in {time.time() - scan_start:.1f}s", "debug")
+        return load_ranges
+
+    def _scan_duplicates(self, loaded_videos):
+        """Duplicate-frame index per video; readers reuse the previous resized frame for repeats"""
+        self._log_operation("Scanning marked ranges for duplicate frames...", "info")
+        searches = {video_id: {
+            'video_path': video_data['player'].video_path,
+            'start_frame': video_data['start_frame'],
+            'end_frame': video_data['end_frame'],
+            'crop': video_data.get('crop')
+        } for video_id, video_data in loaded_videos.items()}
+
+        duplicate_index = {}
+        for video_id, result in duplicate_detect.scan_videos(searches).items():
+            video_name = loaded_videos[video_id]['custom_name']
+            if isinstance(result, Exception):
+                self._log_operation(f"Duplicate detection failed for {video_name}: {result}", "warning")
+                continue
+            duplicate_index[video_id] = result
+            self._log_operation(f"{video_name}: {result['frames'] - result['unique_frames']} of {result['frames']} "
+                                f"frames repeat the previous one", "info")
+        return duplicate_index
+
+    def _initialize_video_writer(self, output_path, output_fps, output_width, output_height, settings, encoder_threads=None):
+        preferred_codec = settings.get('codec', 'auto')
+
+        if preferred_codec == 'auto':
+            codecs_to_try = [
+                ('h264', 'H.264 (best web compatibility)'),
+                ('avc1', 'AVC1 (H.264 variant)'),
+                ('mp4v', 'MPEG-4 (good compatibility)'),
+                ('XVID', 'Xvid (fallback)'),
+                ('MJPG', 'Motion JPEG (universal fallback)')
+            ]
+        else:
+            codec_map = {
+                'h264': [('h264', 'H.264 (user selected)'), ('avc1', 'AVC1 fallback')],
+                'mp4v': [('mp4v', 'MPEG-4 (user selected)')],
+                'xvid': [('XVID', 'Xvid (user selected)')]
+            }
+
+            codecs_to_try = codec_map.get(preferred_codec, [])
+            codecs_to_try.extend([
+                ('h264', 'H.264 (fallback)'),
+                ('mp4v', 'MPEG-4 (fallback)'),
+                ('XVID', 'Xvid (fallback)'),
+                ('MJPG', 'Motion JPEG (universal fallback)')
+            ])
+            seen = set()
+            codecs_to_try = [(c, d) for c, d in codecs_to_try if not (c in seen or seen.add(c))]
+
+        out = None
+        used_codec = None
+
+        # The FFmpeg writer only takes codec options from the environment, read when the writer opens
+        writer_options = os.environ.get('OPENCV_FFMPEG_WRITER_OPTIONS')
+        if encoder_threads:
+            os.environ['OPENCV_FFMPEG_WRITER_OPTIONS'] = "|".join(filter(None, [writer_options, f"threads;{encoder_threads}"]))
+
+        try:
+            for codec, description in codecs_to_try:
+                try:
+                    fourcc = cv2.VideoWriter_fourcc(*codec)
+                    out = cv2.VideoWriter(output_path, fourcc, output_fps, (output_width, output_height))
+
+                    if out and out.isOpened():
+                        used_codec = codec
+                        self._log_operation(f"Using codec: {codec} ({description})", "success")
+                        break
+                    else:
+                        if out:
+                            out.release()
+                        self._log_operation(f"Codec {codec} failed, trying next...", "warning")
+                except Exception as e:
+                    self._log_operation(f"Codec {codec} error: {str(e)}", "warning")
+                    if out:
+                        out.release()
+                        out = None
+        finally:
+            if encoder_threads:
+                if writer_options is None:
+                    os.environ.pop('OPENCV_FFMPEG_WRITER_OPTIONS', None)
+                else:
+                    os.environ['OPENCV_FFMPEG_WRITER_OPTIONS'] = writer_options
+
+        if not out or not out.isOpened():
+            raise ValueError("Could not initialize video writer with any codec. Please check output path and try again.")
+
+        self._log_operation(f"Video writer initialized successfully with {used_codec} codec", "success")
+        return out
+
+    def _clamp_crop(self, crop, frame_width, frame_height):
+        """Clip a (x, y, w, h) crop to the frame, returning None when it is unset or empty"""
+        if not crop:
+            return None
+        x, y, w, h = (int(v) for v in crop)
+        x = max(0, min(x, frame_width - 1))
+        y = max(0, min(y, frame_height - 1))
+        w = min(w, frame_width - x)
+        h = min(h, frame_height - y)
+        if w <= 0 or h <= 0:
+            return None
+        return x, y, w, h
+
+    def _read_video_frames(self, video_id, video_path, start_frame, max_frames, frame_queue, target_width, target_height, processing_state, crop=None, segment_cache=None, decoder_threads=None, skip_ranges=None, duplicates=None):
+        cap = None
+        segment_writer = None
+        try:
+            if segment_cache is not None:
+                segment_key = segment_cache.key(video_path, start_frame, max_frames, target_width, target_height, crop,
+                                                skip_ranges, duplicates['options'] if duplicates is not None else None)
+                cached_frames = segment_cache.open(segment_key)
+                if cached_frames is not None:
+                    self._read_cached_frames(video_id, cached_frames, frame_queue, processing_state)
+                    return
+                segment_writer = segment_cache.writer(segment_key, max_frames, target_width, target_height)
+
+            cap, backend = capture_pool.acquire(video_path, DEFAULT_BACKENDS[:2], decoder_threads)
+
+            if cap is None:
+                self._log_operation(f"Failed to open video {video_id} for reading", "error")
+                if segment_writer:
+                    segment_writer.discard()
+                frame_queue.put(None)
+                return
+
+            cap.set(cv2.CAP_PROP_POS_FRAMES, start_frame)
+
+            frames_read = 0
+            batch_size = 10
+            position = start_frame
+            skip_ranges = list(skip_ranges or [])
+            frame_resized = None
+            frames_reused = 0
+
+            while frames_read < max_frames and not self._cancel_generation and not processing_state['cancel']:
+                batch = []
+
+                for _ in range(min(batch_size, max_frames - frames_read)):
+                    # Loading frames are grabbed without being converted so the output only holds gameplay
+                    while skip_ranges and skip_ranges[0][1] <= position:
+                        skip_ranges.pop(0)
+                    if skip_ranges and skip_ranges[0][0] <= position:
+                        while position < skip_ranges[0][1] and cap.grab():
+                            position += 1
+                        if position < skip_ranges[0][1]:
+                            break
+
+                    # A repeat of the previous frame is only grabbed; the composer sees the same array and keeps the tile
+                    offset = position - duplicates['start_frame'] if duplicates is not None else -1
+                    if frame_resized is not None and 0 <= offset < len(duplicates['duplicate']) \
+                            and duplicates['duplicate'][offset]:
+                        if not cap.grab():
+                            break
+                        position += 1
+                        frames_reused += 1
+                    else:
+                        ret, frame = cap.read()
+                        if not ret:
+                            break
+                        position += 1
+
+                        if crop:
+                            x, y, w, h = crop
+                            frame = frame[y:y + h, x:x + w]
+
+                        frame_resized = cv2.resize(frame, (target_width, target_height), interpolation=cv2.INTER_AREA)
+                    if segment_writer:
+                        segment_writer.write(frames_read, frame_resized)
+                    batch.append((frames_read, frame_resized))
+                    frames_read += 1
+
+                if not batch:
+                    break
+
+                for frame_data in batch:
+                    frame_queue.put(frame_data)
+
+                processing_state[f'frames_read_{video_id}'] = frames_read
+
+            capture_pool.release(video_path, backend, cap, decoder_threads)
+            if segment_writer:
+                self._commit_segment(video_id, segment_cache, segment_writer)
+            frame_queue.put(None)
+            processing_state[f'reading_complete_{video_id}'] = True
+            reuse_info = f" ({frames_reused} repeats reused)" if frames_reused else ""
+            self._log_operation(f"Completed reading {frames_read} frames from video {video_id}{reuse_info}", "success")
+
+        except Exception as e:
+            self._log_operation(f"Error reading video {video_id}: {str(e)}", "error")
+            if segment_writer:
+                segment_writer.discard()
+            capture_pool.discard(cap)
+            frame_queue.put(None)
+
+    def _commit_segment(self, video_id, segment_cache, segment_writer):
+        if segment_writer.commit():
+            raw_mb = segment_cache.segment_size(*segment_writer.shape[:3]) / (1024 * 1024)
+            self._log_operation(f"Cached {segment_writer.frames_written} decoded frames of video {video_id} "
+                                f"({segment_writer.bytes_written / (1024 * 1024):.0f} MB, {raw_mb:.0f} MB raw)",
+                                "debug")
+        elif segment_writer.too_large:
+            self._log_operation(f"Video {video_id}'s range passed {segment_writer.max_bytes / (1024 * 1024):.0f} MB "
+                                f"compressed after {segment_writer.frames_written} of {segment_writer.shape[0]} frames, "
+                                f"the most one range may take of the {segment_cache.max_size / (1024 * 1024):.0f} MB "
+                                f"render cache; not caching it (raise the render cache size in settings)", "warning")
+
+    def _plan_shared_reads(self, read_specs, segment_cache=None):
+        """Group tiles that can be read in one forward pass: same file, overlapping ranges and close starts.
+
+        Within a group every tile but the last to start is read ahead of the composer by the
+        difference in start frames, so starts are only grouped while those frames fit in
+        SHARED_READ_BUFFER_MB. Tiles with a cached segment are read on their own.
+        """
+        budget = SHARED_READ_BUFFER_MB * 1024 * 1024
+        by_path = {}
+        for video_id, spec in read_specs.items():
+            by_path.setdefault(os.path.abspath(spec['video_path']), []).append(video_id)
+
+        groups = []
+        for video_ids in by_path.values():
+            group = []
+            for video_id in sorted(video_ids, key=lambda vid: read_specs[vid]['start_frame']):
+                spec = read_specs[video_id]
+                if self._segment_cached(spec, segment_cache):
+                    groups.append([video_id])
+                    continue
+
+                if group:
+                    group_end = max(read_specs[vid]['end_frame'] for vid in group)
+                    buffered = sum((spec['start_frame'] - read_specs[vid]['start_frame']) *
+                                   read_specs[vid]['target_width'] * read_specs[vid]['target_height'] * 3
+                                   for vid in group)
+                    if spec['start_frame'] < group_end and buffered <= budget:
+                        group.append(video_id)
+                        continue
+                    groups.append(group)
+                group = [video_id]
+            if group:
+                groups.append(group)
+        return groups
+
+    def _segment_cached(self, spec, segment_cache):
+        return segment_cache is not None and segment_cache.contains(segment_cache.key(
+            spec['video_path'], spec['start_frame'], spec['max_frames'], spec['target_width'],
+            spec['target_height'], spec['crop'], spec['skip_ranges'],
+            spec['duplicates']['options'] if spec['duplicates'] is not None else None))
+
+    def _read_shared_frames(self, read_specs, frame_queues, processing_state, segment_cache=None,
+                            decoder_threads=None):
+        """One forward pass over a file feeding every tile in read_specs ({video_id: spec}).
+
+        Each tile follows the same rules as _read_video_frames (load skipping, duplicate reuse,
+        segment caching). A source frame is decoded once for all tiles showing it, and resized
+        once per distinct crop and size.
+        """
+        video_path = next(iter(read_specs.values()))['video_path']
+        tiles = {}
+        for video_id, spec in read_specs.items():
+            segment_writer = None
+            if segment_cache is not None:
+                segment_key = segment_cache.key(video_path, spec['start_frame'], spec['max_frames'],
+                                                spec['target_width'], spec['target_height'], spec['crop'],
+                                                spec['skip_ranges'],
+                                                spec['duplicates']['options'] if spec['duplicates'] is not None else None)
+                segment_writer = segment_cache.writer(segment_key, spec['max_frames'], spec['target_width'],
+                                                      spec['target_height'])
+            tiles[video_id] = dict(spec, skip_ranges=list(spec['skip_ranges'] or []), segment_writer=segment_writer,
+                                   frames_read=0, frame=None, frames_reused=0, done=False)
+
+        def finish(video_id, complete):
+            tile = tiles[video_id]
+            tile['done'] = True
+            if tile['segment_writer']:
+                if complete and tile['frames_read'] == tile['max_frames']:
+                    self._commit_segment(video_id, segment_cache, tile['segment_writer'])
+                else:
+                    tile['segment_writer'].discard()
+            frame_queues[video_id].put(None)
+            processing_state[f'reading_complete_{video_id}'] = True
+            if complete:
+                reuse_info = f" ({tile['frames_reused']} repeats reused)" if tile['frames_reused'] else ""
+                self._log_operation(f"Completed reading {tile['frames_read']} frames from video {video_id}{reuse_info}",
+                                    "success")
+
+        cap = None
+        try:
+            cap, backend = capture_pool.acquire(video_path, DEFAULT_BACKENDS[:2], decoder_threads)
+            if cap is None:
+                self._log_operation(f"Failed to open {os.path.basename(video_path)} for reading", "error")
+                for video_id in tiles:
+                    finish(video_id, False)
+                return
+
+            position = min(tile['start_frame'] for tile in tiles.values())
+            cap.set(cv2.CAP_PROP_POS_FRAMES, position)
+            frames_decoded = 0
+
+            while not self._cancel_generation and not processing_state['cancel']:
+                actions = {}
+                for video_id, tile in tiles.items():
+                    if tile['done'] or position < tile['start_frame']:
+                        continue
+                    if tile['frames_read'] >= tile['max_frames']:
+                        finish(video_id, True)
+                        continue
+
+                    skip_ranges = tile['skip_ranges']
+                    while skip_ranges and skip_ranges[0][1] <= position:
+                        skip_ranges.pop(0)
+                    duplicates = tile['duplicates']
+                    offset = position - duplicates['start_frame'] if duplicates is not None else -1
+                    if skip_ranges and skip_ranges[0][0] <= position:
+                        actions[video_id] = 'skip'
+                    elif tile['frame'] is not None and 0 <= offset < len(duplicates['duplicate']) \
+                            and duplicates['duplicate'][offset]:
+                        actions[video_id] = 'reuse'
+                    else:
+                        actions[video_id] = 'decode'
+
+                if all(tile['done'] for tile in tiles.values()):
+                    break
+
+                # Frames no tile shows (before a later tile starts, loads, repeats) are only grabbed
+                if 'decode' in actions.values():
+                    ret, frame = cap.read()
+                    frames_decoded += 1
+                else:
+                    ret, frame = cap.grab(), None
+                if not ret:
+                    break
+                position += 1
+
+                resized = {}
+                for video_id, action in actions.items():
+                    tile = tiles[video_id]
+                    if action == 'skip':
+                        continue
+                    if action == 'reuse':
+                        tile['frames_reused'] += 1
+                    else:
+                        resize_key = (tile['crop'], tile['target_width'], tile['target_height'])
+                        if resize_key not in resized:
+                            source = frame
+                            if tile['crop']:
+                                x, y, w, h = tile['crop']
+                                source = frame[y:y + h, x:x + w]
+                            resized[resize_key] = cv2.resize(source, (tile['target_width'], tile['target_height']),
+                                                             interpolation=cv2.INTER_AREA)
+                        tile['frame'] = resized[resize_key]
+
+                    if tile['segment_writer']:
+                        tile['segment_writer'].write(tile['frames_read'], tile['frame'])
+                    frame_queues[video_id].put((tile['frames_read'], tile['frame']))
+                    tile['frames_read'] += 1
+                    processing_state[f'frames_read_{video_id}'] = tile['frames_read']
+
+            capture_pool.release(video_path, backend, cap, decoder_threads)
+            self._log_operation(f"Decoded {frames_decoded} frames of {os.path.basename(video_path)} "
+                                f"for {len(tiles)} videos", "debug")
+            for video_id, tile in tiles.items():
+                if not tile['done']:
+                    finish(video_id, True)
+
+        except Exception as e:
+            self._log_operation(f"Error reading {os.path.basename(video_path)}: {str(e)}", "error")
+            capture_pool.discard(cap)
+            for video_id, tile in tiles.items():
+                if not tile['done']:
+                    finish(video_id, False)
+
+    def _read_cached_frames(self, video_id, cached_frames, frame_queue, processing_state):
+        """Feed a reader queue from a decoded segment instead of the source video"""
+        frames_read = 0
+        for frame_idx in range(len(cached_frames)):
+            if self._cancel_generation or processing_state['cancel']:
+                break
+            frame_queue.put((frame_idx, cached_frames[frame_idx]))
+            frames_read += 1
+            if frames_read % 10 == 0:
+                processing_state[f'frames_read_{video_id}'] = frames_read
+
+        cached_frames.close()
+        processing_state[f'frames_read_{video_id}'] = frames_read
+        frame_queue.put(None)
+        processing_state[f'reading_complete_{video_id}'] = True
+        self._log_operation(f"Completed reading {frames_read} cached frames from video {video_id}", "success")
+
+    def _compose_frames(self, loaded_videos, video_durations, layout, settings, 
+                    total_output_frames, output_fps, frame_queues, composition_queue, processing_state,
+                    free_canvases=None):
+        try:
+            output_width = layout['width']
+            output_height = layout['height']
+
+            video_frame_caches = {video_id: {} for video_id in loaded_videos.keys()}
+            cache_limit = 500
+
+            scale = settings['scale']
+            font_scale_base = 1.2 * scale  
+            font_thickness = max(1, int(2 * scale))
+            time_font_scale = 2.0 * scale 
+            time_thickness = max(2, int(3 * scale))
+            timer_font_scale = 2.5 * scale
+            timer_thickness = max(2, int(4 * scale))
+            outline_thickness = max(3, int(6 * scale))
+            timer_y = layout['timer_y']
+
+            # Everything except the timer lives on one reused canvas. Tiles are only redrawn when
+            # the source frame they show changes, and output buffers handed back by the writer are
+            # refreshed in full only if the canvas changed since they were last filled
+            canvas = np.zeros((output_height, output_width, 3), dtype=np.uint8)
+            canvas_version = 0
+            buffer_versions = {}
+            tile_keys = {video_id: None for video_id in loaded_videos.keys()}
+            tile_sources = {video_id: None for video_id in loaded_videos.keys()}
+
+            name_boxes = {}
+            for video_id, video_data in loaded_videos.items():
+                tile = layout['tiles'][video_id]
+                cv2.putText(canvas, video_data['custom_name'], (tile['name_x'], tile['name_y']),
+                            cv2.FONT_HERSHEY_SIMPLEX, font_scale_base, (255, 255, 255), font_thickness)
+                name_boxes[video_id] = self._text_bounds(video_data['custom_name'], tile['name_x'], tile['name_y'],
+                                                         font_scale_base, font_thickness)
+
+            # An empty tile shows the names underneath it; a playing tile hides its own and earlier
+            # names but later names are still drawn over it, as when each frame was built from scratch
+            background = canvas.copy()
+            video_order = list(loaded_videos.keys())
+            names_over_tile = {}
+            for index, video_id in enumerate(video_order):
+                tile = layout['tiles'][video_id]
+                tile_box = (tile['x'], tile['y'], tile['x'] + tile['w'], tile['y'] + tile['h'])
+                names_over_tile[video_id] = [other for other in video_order[index + 1:]
+                                             if self._boxes_overlap(name_boxes[other], tile_box)]
+
+            timer_height = cv2.getTextSize("0", cv2.FONT_HERSHEY_SIMPLEX, timer_font_scale, outline_thickness)
+            timer_top = max(0, timer_y - timer_height[0][1] - outline_thickness)
+            timer_bottom = min(output_height, timer_y + timer_height[1] + outline_thickness)
+
+            fastest_duration = min(video_durations.values())
+            processing_state['frames_static'] = 0
+
+            for frame_idx in range(total_output_frames):
+                if self._cancel_generation or processing_state['cancel']:
+                    break
+
+                current_time = frame_idx / output_fps
+
+                video_states = {}
+                for video_id, video_data in loaded_videos.items():
+                    player = video_data['player']
+                    duration_time = video_durations[video_id]
+
+                    video_active = current_time <= duration_time
+                    relative_frame = int(current_time * player.fps) if video_active else -1
+
+                    video_states[video_id] = {
+                        'active': video_active,
+                        'relative_frame': relative_frame,
+                        'duration': duration_time
+                    }
+
+                max_wait_time = 5.0  
+                wait_start = time.time()
+
+                waiting_for_frames = True
+                while waiting_for_frames and not self._cancel_generation:
+                    waiting_for_frames = False
+
+                    for video_id, state in video_states.items():
+                        if (state['active'] and state['relative_frame'] >= 0 and 
+                            state['relative_frame'] not in video_frame_caches[video_id] and 
+                            not processing_state[f'reading_complete_{video_id}']):
+                            waiting_for_frames = True
+                            break
+
+                    if not waiting_for_frames:
+                        break
+
+                    for video_id in loaded_videos.keys():
+                        self._update_frame_cache(frame_queues[video_id], video_frame_caches[video_id], 
+                                            video_states[video_id]['relative_frame'], cache_limit)
+
+                    if time.time() - wait_start > max_wait_time:
+                        self._log_operation(f"Timeout waiting for frames at output frame {frame_idx}", "warning")
+                        break
+
+                    time.sleep(0.001)
+
+                for video_id in loaded_videos.keys():
+                    self._update_frame_cache(frame_queues[video_id], video_frame_caches[video_id], 
+                                        video_states[video_id]['relative_frame'], cache_limit)
+
+                for video_id, video_data in loaded_videos.items():
+                    state = video_states[video_id]
+                    tile = layout['tiles'][video_id]
+                    x_offset, y_offset = tile['x'], tile['y']
+                    w_scaled, h_scaled = tile['w'], tile['h']
+
+                    frame = None
+                    if not state['active']:
+                        tile_key = ('final',)
+                    elif state['relative_frame'] in video_frame_caches[video_id]:
+                        frame = video_frame_caches[video_id][state['relative_frame']]
+                        tile_key = ('frame', state['relative_frame'])
+                        if frame is tile_sources[video_id]:
+                            tile_key = tile_keys[video_id]
+                    else:
+                        tile_key = ('missing',)
+
+                    # Counted per output frame shown, whether or not the tile needs redrawing
+                    if frame is not None:
+                        processing_state[f'frames_composed_{video_id}'] += 1
+
+                    if tile_key == tile_keys[video_id]:
+                        continue
+                    tile_keys[video_id] = tile_key
+                    tile_sources[video_id] = frame
+                    canvas_version += 1
+
+                    tile_view = canvas[y_offset:y_offset + h_scaled, x_offset:x_offset + w_scaled]
+                    if frame is not None:
+                        tile_view[:] = frame
+                        processing_state[f'tiles_redrawn_{video_id}'] += 1
+                        # Later names are drawn clipped to the tile so text outside it is not inked twice
+                        for other_id in names_over_tile[video_id]:
+                            other_tile = layout['tiles'][other_id]
+                            cv2.putText(tile_view, loaded_videos[other_id]['custom_name'],
+                                        (other_tile['name_x'] - x_offset, other_tile['name_y'] - y_offset),
+                                        cv2.FONT_HERSHEY_SIMPLEX, font_scale_base, (255, 255, 255), font_thickness)
+                    else:
+                        tile_view[:] = background[y_offset:y_offset + h_scaled, x_offset:x_offset + w_scaled]
+
+                    if not state['active']:
+                        time_text = f"{state['duration']:6.3f}s"  
+                        text_size = cv2.getTextSize(time_text, cv2.FONT_HERSHEY_SIMPLEX, time_font_scale, time_thickness)[0]
+                        time_x = x_offset + (w_scaled - text_size[0]) // 2
+                        time_y = y_offset + h_scaled // 2
+
+                        cv2.putText(canvas, time_text, (time_x, time_y),
+                                    cv2.FONT_HERSHEY_SIMPLEX, time_font_scale, (255, 255, 255), time_thickness)
+
+                        if state['duration'] != fastest_duration:
+                            time_diff = state['duration'] - fastest_duration
+                            diff_text = f"+{time_diff:5.3f}s"  
+                            diff_font_scale = 1.0 * scale
+                            diff_thickness = max(1, int(2 * scale))
+                            diff_size = cv2.getTextSize(diff_text, cv2.FONT_HERSHEY_SIMPLEX, diff_font_scale, diff_thickness)[0]
+
+                            diff_x = x_offset + (w_scaled - diff_size[0]) // 2
+                            diff_y = y_offset + h_scaled // 2 + int(40 * scale)
+                            cv2.putText(canvas, diff_text, (diff_x, diff_y),
+                                        cv2.FONT_HERSHEY_SIMPLEX, diff_font_scale, (0, 0, 255), diff_thickness)
+
+                output_frame = None
+                if free_canvases is not None:
+                    try:
+                        output_frame = free_canvases.get_nowait()
+                    except queue.Empty:
+                        pass
+
+                if output_frame is None:
+                    output_frame = canvas.copy()
+                elif buffer_versions.get(id(output_frame)) == canvas_version:
+                    output_frame[timer_top:timer_bottom] = canvas[timer_top:timer_bottom]
+                    processing_state['frames_static'] += 1
+                else:
+                    np.copyto(output_frame, canvas)
+                buffer_versions[id(output_frame)] = canvas_version
+
+                timer_text = f"{current_time:.2f}s"
+                timer_size = cv2.getTextSize(timer_text, cv2.FONT_HERSHEY_SIMPLEX, timer_font_scale, timer_thickness)[0]
+                timer_x = (output_width - timer_size[0]) // 2
+
+                cv2.putText(output_frame, timer_text,
+                        (timer_x, timer_y),
+                        cv2.FONT_HERSHEY_SIMPLEX, timer_font_scale, (0, 0, 0), outline_thickness)  
+
+                cv2.putText(output_frame, timer_text,
+                        (timer_x, timer_y),
+                        cv2.FONT_HERSHEY_SIMPLEX, timer_font_scale, (255, 255, 255), timer_thickness)  
+
+                composition_queue.put((frame_idx, output_frame))
+                processing_state['frames_composed'] = frame_idx + 1
+
+            composition_queue.put(None) 
+            processing_state['composition_complete'] = True
+            self._log_operation(f"Frame composition thread completed "
+                                f"({processing_state['frames_static']} frames only needed the timer redrawn)", "success")
+
+        except Exception as e:
+            self._log_operation(f"Error in composition: {str(e)}", "error")
+            composition_queue.put(None)
+
+    def _text_bounds(self, text, x, y, font_scale, thickness):
+        """Pixel box (x0, y0, x1, y1) that cv2.putText covers for text drawn at baseline (x, y)"""
+        (width, height), baseline = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, font_scale, thickness)
+        return x - thickness, y - height - thickness, x + width + thickness, y + baseline + thickness
+
+    def _boxes_overlap(self, a, b):
+        return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+    def _update_frame_cache(self, frame_queue, cache_dict, needed_frame, cache_limit):
+        try:
+            while not frame_queue.empty():
+                frame_data = frame_queue.get_nowait()
+                if frame_data is None:
+                    break
+                frame_idx, frame = frame_data
+                cache_dict[frame_idx] = frame
+
+                if len(cache_dict) > cache_limit:
+                    if needed_frame >= 0:
+                        frames_to_remove = [idx for idx in cache_dict.keys() 
+                                          if idx < needed_frame - 50]
+                        for idx in frames_to_remove[:len(frames_to_remove)//2]:
+                            del cache_dict[idx]
+        except queue.Empty:
+            pass
+
+        # A ring reuses a slot only once the frames in it are released; frames behind the one
+        # needed now are never shown again
+        if isinstance(frame_queue, FrameRing):
+            frame_queue.release_before(needed_frame, cache_dict)
+
+    def _add_multiple_audio_tracks(self, output_path, all_videos, audio_video_ids, video_durations, max_duration):
+        """Add audio tracks from multiple videos to the output"""
+        try:
+            import subprocess
+
+            self._log_operation("Adding audio tracks...", "info")
+
+            temp_output = output_path.replace('.mp4', '_temp.mp4')
+            os.rename(output_path, temp_output)
+
+            if len(audio_video_ids) == 1:
+
+                video_id = audio_video_ids[0]
+                video_data = all_videos[video_id]
+                self._add_single_audio_track(temp_output, output_path, video_data, max_duration)
+            else:
+
+                self._mix_multiple_audio_tracks(temp_output, output_path, all_videos, 
+                                              audio_video_ids, max_duration)
+
+            if os.path.exists(output_path):
+                os.remove(temp_output)
+                self._log_operation("Audio tracks added successfully", "success")
+            else:
+                os.rename(temp_output, output_path)  
+                self._log_operation("Failed to add audio tracks", "warning")
+
+        except Exception as e:
+            self._log_operation(f"Error adding audio: {str(e)}", "warning")
+            if os.path.exists(temp_output):
+                os.rename(temp_output, output_path)  
+
+    def _audio_source(self, video_data):
+        """(path, start time) to read a video's audio from; pre-trimmed videos use their source file"""
+        source = video_data.get('audio_source', video_data)
+        player = source['player']
+        return player.video_path, source['start_frame'] / player.fps
+
+    def _add_single_audio_track(self, temp_output, output_path, video_data, max_duration):
+        """Add a single audio track"""
+        import subprocess
+
+        audio_path, start_time = self._audio_source(video_data)
+
+        cmd = [
+            'ffmpeg', '-y',
+            '-i', temp_output,  
+            '-i', audio_path,  
+            '-ss', str(start_time),  
+            '-t', str(max_duration),  
+            '-c:v', 'copy',  
+            '-c:a', 'aac',  
+            '-map', '0:v:0',  
+            '-map', '1:a:0',  
+            '-shortest',  
+            output_path
+        ]
+
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0:
+            raise Exception(f"FFmpeg error: {result.stderr}")
+
+    def _mix_multiple_audio_tracks(self, temp_output, output_path, all_videos, audio_video_ids, max_duration):
+        """Mix multiple audio tracks together"""
+        import subprocess
+        import tempfile
+
+        temp_audio_files = []
+
+        try:
+            for i, video_id in enumerate(audio_video_ids):
+                audio_path, start_time = self._audio_source(all_videos[video_id])
+
+                temp_audio = tempfile.NamedTemporaryFile(delete=False, suffix=f'_audio_{i}.wav')
+                temp_audio_files.append(temp_audio.name)
+                temp_audio.close()
+
+                cmd = [
+                    'ffmpeg', '-y',
+                    '-i', audio_path,
+                    '-ss', str(start_time),
+                    '-t', str(max_duration),
+                    '-vn',  
+                    '-acodec', 'pcm_s16le',  
+                    '-ar', '44100',  
+                    '-ac', '2',  
+                    temp_audio.name
+                ]
+
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    self._log_operation(f"Failed to extract audio from video {video_id}: {result.stderr}", "warning")
+                    continue
+
+            if len(temp_audio_files) == 0:
+                raise Exception("No audio tracks could be extracted")
+
+            if len(temp_audio_files) == 1:
+                mixed_audio = temp_audio_files[0]
+            else:
+                mixed_audio = tempfile.NamedTemporaryFile(delete=False, suffix='_mixed.wav')
+                mixed_audio.close()
+
+                inputs = []
+                filter_inputs = []
+                for i, audio_file in enumerate(temp_audio_files):
+                    inputs.extend(['-i', audio_file])
+                    filter_inputs.append(f'[{i}:a]')
+
+                filter_complex = f"{''.join(filter_inputs)}amix=inputs={len(temp_audio_files)}:duration=longest[a]"
+
+                cmd = ['ffmpeg', '-y'] + inputs + [
+                    '-filter_complex', filter_complex,
+                    '-map', '[a]',
+                    '-acodec', 'pcm_s16le',
+                    mixed_audio.name
+                ]
+
+                result = subprocess.run(cmd, capture_output=True, text=True)
+                if result.returncode != 0:
+                    raise Exception(f"Audio mixing failed: {result.stderr}")
+
+                mixed_audio = mixed_audio.name
+
+            cmd = [
+                'ffmpeg', '-y',
+                '-i', temp_output,  
+                '-i', mixed_audio,  
+                '-c:v', 'copy',  
+                '-c:a', 'aac',  
+                '-map', '0:v:0',  
+                '-map', '1:a:0',  
+                '-shortest',
+                output_path
+            ]
+
+            result = subprocess.run(cmd, capture_output=True, text=True)
+            if result.returncode != 0:
+                raise Exception(f"Final audio mixing failed: {result.stderr}")
+
+        finally:
+
+            for temp_file in temp_audio_files:
+                if os.path.exists(temp_file):
+                    os.remove(temp_file)
+            if 'mixed_audio' in locals() and mixed_audio != temp_audio_files[0] and os.path.exists(mixed_audio):
+                os.remove(mixed_audio)
+                os.remove(mixed_audio)
\ No newline at end of file
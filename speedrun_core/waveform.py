@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from .audio_align import stream_audio
+
+WAVEFORM_SAMPLE_RATE = 8000
+BUCKETS_PER_SECOND = 100
+
+class WaveformEnvelope:
+    """Min/max envelope of a video's audio for drawing under the timeline, built in the background and kept on disk.
+
+    The audio is streamed from FFmpeg once at sample_rate and reduced to the minimum and maximum of
+    every 1/bucket_rate seconds, stored as int8, so an hour of audio takes about 700 KB and any zoom
+    level is drawn from memory. Buckets become visible to view() as they are decoded.
+    """
+
+    def __init__(self, video_path, duration=None, cache_dir="waveform_cache", sample_rate=WAVEFORM_SAMPLE_RATE,
+                 bucket_rate=BUCKETS_PER_SECOND):
+        self.video_path = video_path
+        self.duration = duration
+        self.cache_dir = cache_dir
+        self.sample_rate = sample_rate
+        self.bucket_rate = bucket_rate
+
+        self.buckets = 0
+        self.complete = False
+        self.error = None
+
+        capacity = int(duration * bucket_rate) + 1 if duration else bucket_rate * 60
+        self._mins = np.zeros(capacity, dtype=np.int8)
+        self._maxs = np.zeros(capacity, dtype=np.int8)
+        self._lock = threading.Lock()
+        self._cancel = threading.Event()
+        self._thread = None
+
+    @property
+    def progress(self):
+        if self.complete:
+            return 1.0
+        return min(1.0, self.buckets / (self.duration * self.bucket_rate)) if self.duration else 0.0
+
+    @property
+    def building(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _path(self):
+        stat = os.stat(self.video_path)
+        identity = [os.path.abspath(self.video_path), stat.st_size, stat.st_mtime_ns, self.sample_rate, self.bucket_rate]
+        key = hashlib.sha1(json.dumps(identity).encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def load(self):
+        """Load a complete envelope saved by an earlier build; returns whether one was found"""
+        try:
+            with np.load(self._path()) as data:
+                mins, maxs = data['mins'].astype(np.int8), data['maxs'].astype(np.int8)
+        except (OSError, KeyError, ValueError):
+            return False
+
+        with self._lock:
+            self._mins, self._maxs = mins, maxs
+            self.buckets = mins.size
+            self.complete = True
+        return True
+
+    def save(self):
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path()
+        partial_path = f"{path}.{os.getpid()}.partial.npz"
+        with self._lock:
+            np.savez_compressed(partial_path, mins=self._mins[:self.buckets], maxs=self._maxs[:self.buckets])
+        os.replace(partial_path, path)
+
+    def start(self, on_progress=None):
+        """Build the envelope on a daemon thread unless it is complete or already building"""
+        if self.complete or self.building:
+            return
+        self._cancel.clear()
+        self._thread = threading.Thread(target=self.build, args=(on_progress,), daemon=True,
+                                        name="waveform")
+        self._thread.start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def build(self, on_progress=None):
+        """Decode the audio and reduce it to buckets; on_progress(self) is called about once per minute of audio"""
+        bucket = max(1, self.sample_rate // self.bucket_rate)
+        report_every = self.bucket_rate * 60
+        next_report = report_every
+        carry = np.zeros(0, dtype=np.float32)
+
+        blocks = stream_audio(self.video_path, self.sample_rate)
+        try:
+            for block in blocks:
+                if self._cancel.is_set():
+                    break
+                data = np.concatenate((carry, block))
+                whole = data.size - data.size % bucket
+                carry = data[whole:]
+                if whole:
+                    self._append(data[:whole].reshape(-1, bucket))
+                if on_progress and self.buckets >= next_report:
+                    next_report = self.buckets + report_every
+                    on_progress(self)
+            else:
+                if carry.size:
+                    self._append(carry[None])
+        except Exception as e:
+            self.error = str(e)
+        finally:
+            blocks.close()
+
+        if self._cancel.is_set() or self.error:
+            return
+        if self.buckets == 0:
+            self.error = "No audio"
+            if on_progress:
+                on_progress(self)
+            return
+
+        self.complete = True
+        try:
+            self.save()
+        except OSError as e:
+            print(f"Could not save waveform: {e}")
+        if on_progress:
+            on_progress(self)
+
+    def _append(self, frames):
+        mins = np.round(np.clip(frames.min(axis=1), -1.0, 1.0) * 127).astype(np.int8)
+        maxs = np.round(np.clip(frames.max(axis=1), -1.0, 1.0) * 127).astype(np.int8)
+        with self._lock:
+            end = self.buckets + mins.size
+            if end > self._mins.size:
+                capacity = max(end, self._mins.size * 2)
+                self._mins = np.concatenate((self._mins[:self.buckets], np.zeros(capacity - self.buckets, np.int8)))
+                self._maxs = np.concatenate((self._maxs[:self.buckets], np.zeros(capacity - self.buckets, np.int8)))
+            self._mins[self.buckets:end] = mins
+            self._maxs[self.buckets:end] = maxs
+            self.buckets = end
+
+    def view(self, start_time, end_time, columns):
+        """Per-column (mins, maxs) in [-1, 1] for `columns` equal slices of [start_time, end_time).
+
+        Columns past the audio decoded so far are NaN.
+        """
+        with self._lock:
+            mins, maxs, buckets = self._mins, self._maxs, self.buckets
+
+        columns = max(1, int(columns))
+        edges = np.linspace(start_time * self.bucket_rate, end_time * self.bucket_rate, columns + 1)
+        starts = np.floor(edges[:-1]).astype(np.int64)
+        valid = (starts >= 0) & (starts < buckets)
+
+        column_mins = np.full(columns, np.nan, dtype=np.float32)
+        column_maxs = np.full(columns, np.nan, dtype=np.float32)
+        if not valid.any():
+            return column_mins, column_maxs
+
+        # Each column reduces the buckets from its start to the next column's start; zoomed in
+        # far enough, neighbouring columns repeat the same bucket
+        first = int(starts[valid][0])
+        last = min(buckets, max(int(np.ceil(edges[-1])), int(starts[valid][-1]) + 1))
+        offsets = starts[valid] - first
+        column_mins[valid] = np.minimum.reduceat(mins[first:last], offsets) / 127.0
+        column_maxs[valid] = np.maximum.reduceat(maxs[first:last], offsets) / 127.0
+        return column_mins, column_maxs
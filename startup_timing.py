@@ -0,0 +1,29 @@
+import time
+
+class StartupTimer:
+    """Records named startup milestones, in seconds since this module was first imported"""
+
+    def __init__(self):
+        self.start_time = time.perf_counter()
+        self.marks = {}
+
+    def mark(self, name):
+        if name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.start_time
+        return self.marks[name]
+
+    def elapsed(self, name):
+        return self.marks.get(name)
+
+    def report(self):
+        """Return the milestones in the order they were reached"""
+        return dict(sorted(self.marks.items(), key=lambda item: item[1]))
+
+    def format_report(self):
+        lines = ["Startup timing:"]
+        for name, seconds in self.report().items():
+            lines.append(f"  {name:<24} {seconds * 1000:8.1f} ms")
+        return "\n".join(lines)
+
+
+startup_timer = StartupTimer()